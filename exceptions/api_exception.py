@@ -7,17 +7,20 @@ class ApiException(Exception):
         self.status_code = status_code
         self.detail = detail
     
+    def content(self):
+        return {
+            "status_code": self.status_code,
+            "exception_case": self.exception_case,
+            "detail": self.detail
+        }
+
     def __str__(self):
         return f"ApiException(status_code={self.status_code}, detail={self.detail})"
 
 async def api_exception_handler(request, exc: ApiException):
     json_exc= JSONResponse(
         status_code=exc.status_code,
-        content={
-            "status_code": exc.status_code,
-            "exception_case": exc.exception_case,
-            "detail": exc.detail
-        },
+        content=exc.content(),
     )
     logging.error(f"API Exception: {exc}", exc_info=True)
     return json_exc
\ No newline at end of file
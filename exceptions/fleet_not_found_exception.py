@@ -0,0 +1,6 @@
+from exceptions.api_exception import ApiException
+from fastapi import status
+
+class FleetNotFoundException(ApiException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
@@ -0,0 +1,6 @@
+from exceptions.api_exception import ApiException
+from fastapi import status
+
+class InvalidUpdateException(ApiException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=detail)
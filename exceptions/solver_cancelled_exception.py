@@ -0,0 +1,8 @@
+from exceptions.api_exception import ApiException
+
+# nginx convention for a request abandoned by the client
+CLIENT_CLOSED_REQUEST = 499
+
+class SolverCancelledException(ApiException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=CLIENT_CLOSED_REQUEST, detail=detail)
@@ -0,0 +1,6 @@
+from exceptions.api_exception import ApiException
+from fastapi import status
+
+class SolverTimeoutException(ApiException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=detail)
@@ -2,5 +2,14 @@ from exceptions.api_exception import ApiException
 from fastapi import status
 
 class UnfeasibleException(ApiException):
-    def __init__(self, detail: str):
-        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
\ No newline at end of file
+    def __init__(self, detail: str, nearest_loads: tuple = None):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+        # (below, above) feasible loads in MW, either may be None
+        self.nearest_loads = nearest_loads
+
+    def content(self):
+        content = super().content()
+        if self.nearest_loads is not None:
+            below, above = self.nearest_loads
+            content["nearest_feasible_loads"] = {"below": below, "above": above}
+        return content
\ No newline at end of file
@@ -1,20 +1,37 @@
+from contextlib import asynccontextmanager
 import logging
 from fastapi import APIRouter, FastAPI
 from fastapi.responses import JSONResponse
 import uvicorn
 
 from exceptions.api_exception import ApiException, api_exception_handler
-from routers import plant
+from routers import dispatch, fleet, metrics, plant
+from services.fleet_registry import FleetRegistry
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight
+from services.solver_pool import SolverPool
 
 #should be /api or /api/v1, but to comply with the challenge requirements, it is left empty
 prefix = ""
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.solver_pool = SolverPool.from_env()
+    app.state.solver_pool.start()
+    app.state.result_cache = ResultCache.from_env()
+    app.state.single_flight = SingleFlight()
+    app.state.fleet_registry = FleetRegistry()
+    yield
+    app.state.result_cache.close()
+    app.state.solver_pool.shutdown()
+
 app = FastAPI(
     title="Powerplant SMT API",
     description="API for managing powerplant data in the SMT system. Coding Challenge for ENGIE.",
     version="1.0.0",
     docs_url= prefix + "/docs",
     redoc_url= prefix + "/redoc",
+    lifespan=lifespan,
 )
 
 app.add_exception_handler(ApiException, api_exception_handler)
@@ -35,6 +52,9 @@ async def generic_exception_handler(request, exc: Exception):
 api_router = APIRouter(prefix=prefix)
 
 api_router.include_router(plant.router)
+api_router.include_router(fleet.router)
+api_router.include_router(metrics.router)
+api_router.include_router(dispatch.router)
 
 app.include_router(api_router)
 
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+from starlette.websockets import WebSocketState
+
+from exceptions.api_exception import ApiException
+from routers.plant import Engine
+from schemas.dispatch_schema import DispatchSessionSchema
+from services.dispatch_session import DispatchSession, validation_detail
+from services.plant_service import PlantService
+
+router = APIRouter(prefix="/ws")
+
+async def receive_updates(websocket: WebSocket, session: DispatchSession):
+    # merges every update as soon as it arrives, invalid ones are answered and dropped
+    while True:
+        try:
+            update = json.loads(await websocket.receive_text())
+        except json.JSONDecodeError as exc:
+            await websocket.send_json({"type": "error", "status_code": 400, "exception_case": "JSONDecodeError", "detail": str(exc)})
+            continue
+        try:
+            session.update(update)
+        except ApiException as exc:
+            await websocket.send_json({"type": "error", **exc.content()})
+
+async def solve_updates(websocket: WebSocket, session: DispatchSession, engine: str):
+    # one solve at a time, always of the latest update: updates received meanwhile supersede each other
+    solver_pool = websocket.app.state.solver_pool
+    while True:
+        seq, load, fuels = await session.latest()
+        try:
+            result = await solver_pool.run(
+                PlantService.selected_production_plan, session.fleet, load, fuels, engine, session.resolution,
+                affinity=session.fleet.key,
+            )
+            await websocket.send_json({"type": "plan", "seq": seq, "load": load, **result})
+        except ApiException as exc:
+            await websocket.send_json({"type": "error", "seq": seq, **exc.content()})
+
+@router.websocket("/productionplan")
+async def production_plan_session(websocket: WebSocket, engine: Engine = "auto"):
+    await websocket.accept()
+    try:
+        session_request = DispatchSessionSchema.model_validate(await websocket.receive_json())
+    except (ValidationError, ValueError) as exc:
+        detail = validation_detail(exc) if isinstance(exc, ValidationError) else str(exc)
+        await websocket.send_json({"type": "error", "status_code": 422, "exception_case": exc.__class__.__name__, "detail": detail})
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    except WebSocketDisconnect:
+        return
+
+    resolution = session_request.resolution if "resolution" in session_request.model_fields_set else None
+    session = DispatchSession(session_request.powerplants, resolution)
+    await websocket.send_json({"type": "ready", "powerplants": len(session.fleet.powerplants)})
+    tasks = {
+        asyncio.create_task(receive_updates(websocket, session)),
+        asyncio.create_task(solve_updates(websocket, session, engine)),
+    }
+    # the session ends when the client leaves, or when solving fails unexpectedly
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+    for task in done:
+        exc = task.exception()
+        if exc is not None and not isinstance(exc, WebSocketDisconnect):
+            logging.error(f"Dispatch session failed: {exc}", exc_info=exc)
+            if websocket.client_state == WebSocketState.CONNECTED:
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
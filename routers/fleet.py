@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Header, Request, Response, status
+
+from routers.plant import Engine, cached_solve, requested_engine, set_engine_headers
+from schemas.fleet_schema import FleetResponseSchema, FleetSchema
+from schemas.power_grid_batch_schema import ScenarioSchema
+from schemas.power_plant_schema import PowerPlantResponseSchema
+from services.plant_service import PlantService
+from services.result_cache import canonical_key
+
+router = APIRouter(prefix="/fleets")
+
+def _fleet_response(fleet):
+    fleet_id, version = fleet.key
+    return {"fleet_id": fleet_id, "version": version, "powerplants": fleet.powerplants}
+
+@router.post(
+    "",
+    summary="Register a fleet of powerplants",
+    response_model=FleetResponseSchema,
+    status_code=status.HTTP_201_CREATED
+)
+async def register_fleet(request: Request, fleet: FleetSchema):
+    return _fleet_response(request.app.state.fleet_registry.register(fleet.powerplants))
+
+@router.get(
+    "/{fleet_id}",
+    summary="Get a registered fleet",
+    response_model=FleetResponseSchema
+)
+async def get_fleet(request: Request, fleet_id: str):
+    return _fleet_response(request.app.state.fleet_registry.get(fleet_id))
+
+@router.put(
+    "/{fleet_id}",
+    summary="Replace the powerplants of a registered fleet",
+    response_model=FleetResponseSchema
+)
+async def replace_fleet(request: Request, fleet_id: str, fleet: FleetSchema):
+    return _fleet_response(request.app.state.fleet_registry.replace(fleet_id, fleet.powerplants))
+
+@router.delete(
+    "/{fleet_id}",
+    summary="Delete a registered fleet",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_fleet(request: Request, fleet_id: str):
+    request.app.state.fleet_registry.delete(fleet_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post(
+    "/{fleet_id}/productionplan",
+    summary="Get best production plan of a registered fleet",
+    response_model=list[PowerPlantResponseSchema]
+)
+async def get_fleet_production_plan(
+    request: Request,
+    response: Response,
+    fleet_id: str,
+    scenario: ScenarioSchema,
+    engine: Engine | None = None,
+    x_solver_engine: Engine | None = Header(default=None),
+):
+    engine, forced_reason = requested_engine(engine, x_solver_engine)
+    fleet = request.app.state.fleet_registry.get(fleet_id)
+    cache_key = canonical_key(scenario, *fleet.key, "selected", engine)
+    result = await cached_solve(
+        request, cache_key, PlantService.selected_production_plan, fleet, scenario.load, scenario.fuels, engine,
+        affinity=fleet.key,
+    )
+    set_engine_headers(response, engine, forced_reason, result)
+    return result["plan"]
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Request
+
+router = APIRouter(prefix="")
+
+@router.get(
+    "/metrics",
+    summary="Get solver cache and request coalescing counters"
+)
+async def get_metrics(request: Request):
+    return {
+        "result_cache": request.app.state.result_cache.stats(),
+        "single_flight": request.app.state.single_flight.stats(),
+    }
@@ -1,17 +1,215 @@
-from fastapi import APIRouter
+import asyncio
+import itertools
+import time
+from typing import Literal
 
+from fastapi import APIRouter, Header, Request, Response
+from fastapi.responses import StreamingResponse
+
+from exceptions.api_exception import ApiException
+
+from schemas.fleet_schema import FleetSchema
+from schemas.pareto_schema import ParetoRequestSchema, ParetoResponseSchema
+from schemas.power_grid_batch_schema import BatchEntryResponseSchema, PowerGridBatchSchema
 from schemas.power_grid_schema import PowerGridSchema
+from schemas.power_grid_sweep_schema import PowerGridSweepSchema, SweepEntryResponseSchema
 from schemas.power_plant_schema import PowerPlantResponseSchema
+from schemas.supply_curve_schema import SupplyCurveRequestSchema, SupplyCurveResponseSchema
 from services.plant_service import PlantService
+from services.prepared_fleet import PreparedFleet
+from services.result_cache import canonical_key
+from services.solver_registry import ENGINE_NAMES
+from services.sweep import merit_order_groups
 
 #should be /plant, but to comply with the challenge requirements, it is left empty
 router = APIRouter(prefix="")
 
+# scenarios per worker job of a streamed response, so the first lines are written while the rest is solved
+STREAM_CHUNK_SIZE = 16
+# sweeps reuse commitments within a job, they get longer jobs
+SWEEP_CHUNK_SIZE = 64
+# share of the pool timeout a deadline may use: the greedy plan must come back before the pool gives up
+POOL_DEADLINE_SHARE = 0.9
+
+# every engine of the registry can be forced, "auto" picks one per request
+Engine = Literal[("auto", *ENGINE_NAMES)]
+
+def requested_engine(engine: Engine | None, header_engine: Engine | None):
+    # the query parameter wins over the header, without either the engine is picked per request
+    if engine is not None:
+        return engine, "forced by the engine query parameter"
+    if header_engine is not None:
+        return header_engine, "forced by the X-Solver-Engine header"
+    return "auto", None
+
+def set_engine_headers(response: Response, engine: str, forced_reason: str | None, result: dict):
+    response.headers["X-Solver-Engine"] = result["engine"]
+    # a forced engine that ran is reported as forced, a selection or a fallback by its own reason
+    forced = engine != "auto" and result["engine"] == engine
+    response.headers["X-Solver-Reason"] = forced_reason if forced else result["reason"]
+
+def accepts_ndjson(request: Request):
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+async def ndjson_lines(jobs, max_in_flight: int, schema, ordered: bool):
+    # jobs is an iterator of coroutines returning lists of entries, started at most max_in_flight at a time;
+    # lines follow the job order when ordered, otherwise they are written as soon as their job completes
+    running = []
+    try:
+        while True:
+            while len(running) < max_in_flight and (job := next(jobs, None)) is not None:
+                running.append(asyncio.ensure_future(job))
+            if not running:
+                break
+            await asyncio.wait(running[:1] if ordered else running, return_when=asyncio.FIRST_COMPLETED)
+            finished = list(itertools.takewhile(lambda task: task.done(), running)) if ordered else [task for task in running if task.done()]
+            for task in finished:
+                running.remove(task)
+                for entry in task.result():
+                    yield schema(**entry).model_dump_json() + "\n"
+    finally:
+        for task in running:
+            task.cancel()
+
+def fleet_affinity(powerplants, resolution):
+    # repeats of a fleet are routed to the worker holding its warm DP state
+    return canonical_key(FleetSchema.model_construct(powerplants=powerplants), resolution)
+
+async def cached_solve(request: Request, cache_key: str, function, *args, affinity=None):
+    result_cache = request.app.state.result_cache
+    response = result_cache.get(cache_key)
+    if response is None:
+        async def solve():
+            plan = await request.app.state.solver_pool.run(function, *args, request=request, affinity=affinity)
+            result_cache.set(cache_key, plan)
+            return plan
+        # concurrent identical requests share one solve
+        response = await request.app.state.single_flight.run(cache_key, solve)
+    return response
+
 @router.post(
     "/productionplan",
     summary="Get best production plan for a list of powerplants",
     response_model=list[PowerPlantResponseSchema]  
 )
-async def get_production_plan(power_grid: PowerGridSchema):
-    response = PlantService().simple_production_plan(power_grid)
-    return response
\ No newline at end of file
+async def get_production_plan(
+    request: Request,
+    response: Response,
+    power_grid: PowerGridSchema,
+    engine: Engine | None = None,
+    x_solver_engine: Engine | None = Header(default=None),
+):
+    engine, forced_reason = requested_engine(engine, x_solver_engine)
+    response.headers["X-Solver-Resolution"] = str(power_grid.resolution)
+    if power_grid.deadline_ms is not None:
+        # time-bound plans depend on the load of the machine, they are neither cached nor shared
+        solver_pool = request.app.state.solver_pool
+        deadline = time.time() + min(power_grid.deadline_ms / 1000, POOL_DEADLINE_SHARE * solver_pool.timeout)
+        result = await solver_pool.run(
+            PlantService.anytime_production_plan, power_grid, engine, deadline, request=request
+        )
+        response.headers["X-Solver-Optimal"] = "true" if result["optimal"] else "false"
+        response.headers["X-Solver-Lower-Bound"] = str(result["lower_bound"])
+    else:
+        cache_key = canonical_key(power_grid, "selected", engine)
+        result = await cached_solve(
+            request, cache_key, PlantService.selected_production_plan,
+            PreparedFleet(power_grid.powerplants), power_grid.load, power_grid.fuels, engine, power_grid.resolution,
+            affinity=fleet_affinity(power_grid.powerplants, power_grid.resolution),
+        )
+    set_engine_headers(response, engine, forced_reason, result)
+    return result["plan"]
+
+@router.post(
+    "/productionplan/batch",
+    summary="Get best production plans for many load/fuel scenarios of one list of powerplants",
+    response_model=list[BatchEntryResponseSchema],
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "With Accept: application/x-ndjson, one BatchEntryResponseSchema per line"}},
+)
+async def get_batch_production_plan(request: Request, batch: PowerGridBatchSchema, engine: Engine = "auto"):
+    solver_pool = request.app.state.solver_pool
+    fleet = PreparedFleet(batch.powerplants)
+
+    async def solve(chunk):
+        # a chunk the pool could not solve (busy, timed out, ...) fails its own entries only
+        try:
+            return await solver_pool.run(PlantService.batch_production_plan, fleet, chunk, engine, request=request)
+        except ApiException as exc:
+            return [exc.content()] * len(chunk)
+
+    if accepts_ndjson(request):
+        # one line per scenario, in order, written as soon as it and the scenarios before it are solved
+        chunks = [batch.scenarios[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(batch.scenarios), STREAM_CHUNK_SIZE)]
+        jobs = (solve(chunk) for chunk in chunks)
+        return StreamingResponse(
+            ndjson_lines(jobs, solver_pool.max_workers, BatchEntryResponseSchema, ordered=True),
+            media_type="application/x-ndjson",
+        )
+    # contiguous chunks, one per worker: each worker reuses the fleet precomputation across its chunk
+    chunk_size = -(-len(batch.scenarios) // solver_pool.max_workers)
+    chunks = [batch.scenarios[start:start + chunk_size] for start in range(0, len(batch.scenarios), chunk_size)]
+    jobs = [asyncio.ensure_future(solve(chunk)) for chunk in chunks]
+    try:
+        results = await asyncio.gather(*jobs)
+    except BaseException:
+        # an unexpected error fails the whole request: the other chunks are not left running for nobody
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+        raise
+    return [entry for chunk_results in results for entry in chunk_results]
+
+@router.post(
+    "/productionplan/sweep",
+    summary="Stream the best production plans of one list of powerplants and one load under many fuel scenarios",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One SweepEntryResponseSchema per line"}},
+)
+async def get_sweep_production_plan(request: Request, sweep: PowerGridSweepSchema):
+    solver_pool = request.app.state.solver_pool
+    fleet = PreparedFleet(sweep.powerplants)
+    costs = fleet.columns.unit_cost_matrix(sweep.fuels)
+    # scenarios sharing a merit order are kept adjacent so each worker reuses their commitment
+    scenarios = [
+        (index, sweep.fuels[index], order, costs[index, order].tolist())
+        for order, indices in merit_order_groups(fleet.columns, costs)
+        for index in indices
+    ]
+    chunk_size = max(1, min(SWEEP_CHUNK_SIZE, -(-len(scenarios) // solver_pool.max_workers)))
+    chunks = [scenarios[start:start + chunk_size] for start in range(0, len(scenarios), chunk_size)]
+
+    async def solve(chunk):
+        try:
+            return await solver_pool.run(
+                PlantService.sweep_production_plans, fleet, sweep.load, chunk, sweep.resolution, request=request
+            )
+        except ApiException as exc:
+            return [{"index": index, **exc.content()} for index, *_ in chunk]
+
+    jobs = (solve(chunk) for chunk in chunks)
+    return StreamingResponse(
+        ndjson_lines(jobs, solver_pool.max_workers, SweepEntryResponseSchema, ordered=False),
+        media_type="application/x-ndjson",
+    )
+
+@router.post(
+    "/productionplan/curve",
+    summary="Get the minimum cost and marginal cost of every reachable production level",
+    response_model=SupplyCurveResponseSchema
+)
+async def get_supply_curve(request: Request, curve_request: SupplyCurveRequestSchema):
+    solver_pool = request.app.state.solver_pool
+    response = await solver_pool.run(PlantService.supply_curve_plan, curve_request, request=request)
+    return response
+
+@router.post(
+    "/productionplan/pareto",
+    summary="Get the plans trading fuel cost against CO2 emissions for a load",
+    response_model=ParetoResponseSchema
+)
+async def get_pareto_front(request: Request, pareto_request: ParetoRequestSchema):
+    solver_pool = request.app.state.solver_pool
+    # the worker stops at the pool's timeout instead of running on after the request has failed
+    deadline = time.time() + solver_pool.timeout
+    response = await solver_pool.run(PlantService.pareto_front, pareto_request, deadline, request=request)
+    return response
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+from schemas.power_plant_schema import PowerPlantSchema
+
+class DispatchSessionSchema(BaseModel):
+    # first message of a /ws/productionplan session
+    model_config = ConfigDict(from_attributes=True)
+    powerplants: list[PowerPlantSchema] = Field(min_length=1)
+    resolution: float = Field(default=0.1, ge=0.1, le=10, multiple_of=0.1)
+
+class FuelUpdateSchema(BaseModel):
+    # fuels that changed since the previous update, the others are kept
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
+    gasfired: float | None = Field(default=None, alias="gas(euro/MWh)", gt=0)
+    turbojet: float | None = Field(default=None, alias="kerosine(euro/MWh)", gt=0)
+    co2: float | None = Field(default=None, alias="co2(euro/ton)", gt=0)
+    windturbine: float | None = Field(default=None, alias="wind(%)", ge=0, le=100)
+
+class DispatchUpdateSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
+    load: float | None = Field(default=None, gt=0)
+    fuels: FuelUpdateSchema | None = None
@@ -27,3 +27,185 @@ POST_PRODUCTIONPLAN_EXAMPLE = {
             }
         }
     }
+
+POST_PRODUCTIONPLAN_BATCH_EXAMPLE = {
+        "example1": {
+            "value": {
+                "powerplants": [
+                    {
+                        "name": "gasfired1",
+                        "type": "gasfired",
+                        "efficiency": 0.53,
+                        "pmin": 100,
+                        "pmax": 460,
+                    },
+                    {
+                        "name": "windplant1",
+                        "type": "windturbine",
+                        "efficiency": 1,
+                        "pmin": 0,
+                        "pmax": 100,
+                    }
+                ],
+                "scenarios": [
+                    {
+                        "load": 480,
+                        "fuels": {
+                            "gas(euro/MWh)": 13.4,
+                            "kerosine(euro/MWh)": 50.8,
+                            "co2(euro/ton)": 20,
+                            "wind(%)": 60
+                        }
+                    },
+                    {
+                        "load": 510,
+                        "fuels": {
+                            "gas(euro/MWh)": 13.9,
+                            "kerosine(euro/MWh)": 50.8,
+                            "co2(euro/ton)": 20,
+                            "wind(%)": 45
+                        }
+                    }
+                ]
+            }
+        }
+    }
+
+POST_PRODUCTIONPLAN_SWEEP_EXAMPLE = {
+        "example1": {
+            "value": {
+                "load": 480,
+                "powerplants": [
+                    {
+                        "name": "gasfired1",
+                        "type": "gasfired",
+                        "efficiency": 0.53,
+                        "pmin": 100,
+                        "pmax": 460,
+                    },
+                    {
+                        "name": "tj1",
+                        "type": "turbojet",
+                        "efficiency": 0.3,
+                        "pmin": 0,
+                        "pmax": 16,
+                    },
+                    {
+                        "name": "windplant1",
+                        "type": "windturbine",
+                        "efficiency": 1,
+                        "pmin": 0,
+                        "pmax": 100,
+                    }
+                ],
+                "fuels": [
+                    {
+                        "gas(euro/MWh)": 13.4,
+                        "kerosine(euro/MWh)": 50.8,
+                        "co2(euro/ton)": 20,
+                        "wind(%)": 60
+                    },
+                    {
+                        "gas(euro/MWh)": 25.1,
+                        "kerosine(euro/MWh)": 50.8,
+                        "co2(euro/ton)": 80,
+                        "wind(%)": 30
+                    }
+                ]
+            }
+        }
+    }
+
+POST_PRODUCTIONPLAN_CURVE_EXAMPLE = {
+        "example1": {
+            "value": {
+                "fuels": {
+                    "gas(euro/MWh)": 13.4,
+                    "kerosine(euro/MWh)": 50.8,
+                    "co2(euro/ton)": 20,
+                    "wind(%)": 60
+                },
+                "powerplants": [
+                    {
+                        "name": "gasfired1",
+                        "type": "gasfired",
+                        "efficiency": 0.53,
+                        "pmin": 100,
+                        "pmax": 460,
+                    },
+                    {
+                        "name": "windplant1",
+                        "type": "windturbine",
+                        "efficiency": 1,
+                        "pmin": 0,
+                        "pmax": 100,
+                    }
+                ],
+                "start": 0,
+                "stop": 520,
+                "step": 10,
+                "plans_at": [250, 480]
+            }
+        }
+    }
+
+POST_PRODUCTIONPLAN_PARETO_EXAMPLE = {
+        "example1": {
+            "value": {
+                "load": 480,
+                "fuels": {
+                    "gas(euro/MWh)": 13.4,
+                    "kerosine(euro/MWh)": 50.8,
+                    "co2(euro/ton)": 20,
+                    "wind(%)": 60
+                },
+                "powerplants": [
+                    {
+                        "name": "gasfired1",
+                        "type": "gasfired",
+                        "efficiency": 0.53,
+                        "pmin": 100,
+                        "pmax": 460,
+                    },
+                    {
+                        "name": "tj1",
+                        "type": "turbojet",
+                        "efficiency": 0.3,
+                        "pmin": 0,
+                        "pmax": 500,
+                    },
+                    {
+                        "name": "windplant1",
+                        "type": "windturbine",
+                        "efficiency": 1,
+                        "pmin": 0,
+                        "pmax": 150,
+                    }
+                ],
+                "max_points": 10
+            }
+        }
+    }
+
+POST_FLEETS_EXAMPLE = {
+        "example1": {
+            "value": {
+                "powerplants": [
+                    {
+                        "name": "gasfired1",
+                        "type": "gasfired",
+                        "efficiency": 0.53,
+                        "pmin": 100,
+                        "pmax": 460,
+                    },
+                    {
+                        "name": "windplant1",
+                        "type": "windturbine",
+                        "efficiency": 1,
+                        "pmin": 0,
+                        "pmax": 100,
+                    }
+                ]
+            }
+        }
+    }
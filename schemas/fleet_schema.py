@@ -0,0 +1,14 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+from schemas.examples import POST_FLEETS_EXAMPLE
+from schemas.power_plant_schema import PowerPlantSchema
+
+class FleetSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, json_schema_extra=POST_FLEETS_EXAMPLE)
+    powerplants: list[PowerPlantSchema] = Field(min_length=1)
+
+class FleetResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    fleet_id: str
+    version: int
+    powerplants: list[PowerPlantSchema]
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from schemas.examples import POST_PRODUCTIONPLAN_PARETO_EXAMPLE
+from schemas.power_grid_schema import FuelSchema, check_load_step
+from schemas.power_plant_schema import PowerPlantResponseSchema, PowerPlantSchema
+
+# points times levels the front DP holds per layer: about 20 points over 10 GW at 0.1 MW
+MAX_FRONT_CELLS = 2_000_000
+
+class ParetoRequestSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, json_schema_extra=POST_PRODUCTIONPLAN_PARETO_EXAMPLE)
+    load: float = Field(gt=0)
+    fuels: FuelSchema
+    powerplants: list[PowerPlantSchema]
+    resolution: float = Field(default=0.1, ge=0.1, le=10, multiple_of=0.1)
+    max_points: int = Field(default=20, ge=2, le=100, description="Most points returned, evenly spread along the front")
+
+    @model_validator(mode="after")
+    def load_is_a_multiple_of_resolution(self):
+        if "resolution" in self.model_fields_set:
+            check_load_step(self.load, self.resolution)
+        return self
+
+    @model_validator(mode="after")
+    def front_fits_the_budget(self):
+        # every DP layer holds up to max_points points per level up to the load
+        cells = self.max_points * round(self.load / self.resolution)
+        if cells > MAX_FRONT_CELLS:
+            raise ValueError(
+                f"max_points * load / resolution ({cells}) exceeds {MAX_FRONT_CELLS}: "
+                "ask for fewer points or a coarser resolution."
+            )
+        return self
+
+class ParetoPointSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    cost: float = Field(description="Fuel cost of the plan, in euro, CO2 excluded")
+    co2: float = Field(description="CO2 emitted by the plan, in tons")
+    total_cost: float = Field(description="Fuel cost plus the CO2 at the requested price, in euro")
+    plan: list[PowerPlantResponseSchema]
+
+class ParetoResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    # cheapest first, each point emitting less than the previous one
+    points: list[ParetoPointSchema]
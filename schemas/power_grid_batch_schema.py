@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+from schemas.examples import POST_PRODUCTIONPLAN_BATCH_EXAMPLE
+from schemas.power_grid_schema import FuelSchema
+from schemas.power_plant_schema import PowerPlantResponseSchema, PowerPlantSchema
+
+class ScenarioSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    load: float = Field(gt=0)
+    fuels: FuelSchema
+
+class PowerGridBatchSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, json_schema_extra=POST_PRODUCTIONPLAN_BATCH_EXAMPLE)
+    powerplants: list[PowerPlantSchema]
+    scenarios: list[ScenarioSchema] = Field(min_length=1)
+
+class NearestLoadsSchema(BaseModel):
+    below: float | None = None
+    above: float | None = None
+
+class BatchEntryResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    status_code: int
+    plan: list[PowerPlantResponseSchema] | None = None
+    exception_case: str | None = None
+    detail: str | None = None
+
+    nearest_feasible_loads: NearestLoadsSchema | None = None
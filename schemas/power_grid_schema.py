@@ -1,8 +1,15 @@
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from schemas.examples import POST_PRODUCTIONPLAN_EXAMPLE
 from schemas.power_plant_schema import PowerPlantSchema
 
+def check_load_step(load, resolution):
+    # plans are served in steps of the resolution, any other load would be silently rounded: only checked
+    # when the client asked for a resolution, requests without one keep the load rounded to 0.1 MW
+    steps = load / resolution
+    if abs(steps - round(steps)) > 1e-6:
+        raise ValueError(f"The load ({load} MW) is not a multiple of the resolution ({resolution} MW).")
+
 class FuelSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     gasfired: float = Field(alias="gas(euro/MWh)", gt=0)
@@ -14,4 +21,14 @@ class PowerGridSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True, json_schema_extra=POST_PRODUCTIONPLAN_EXAMPLE)
     load: float = Field(gt=0)
     fuels: FuelSchema
-    powerplants: list[PowerPlantSchema]
\ No newline at end of file
+    powerplants: list[PowerPlantSchema]
+    # MW step of every production value, coarser steps solve faster
+    resolution: float = Field(default=0.1, ge=0.1, le=10, multiple_of=0.1)
+    # answer within this many milliseconds with the best plan found so far
+    deadline_ms: int | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def load_is_a_multiple_of_resolution(self):
+        if "resolution" in self.model_fields_set:
+            check_load_step(self.load, self.resolution)
+        return self
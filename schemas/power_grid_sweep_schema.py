@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from schemas.examples import POST_PRODUCTIONPLAN_SWEEP_EXAMPLE
+from schemas.power_grid_batch_schema import NearestLoadsSchema
+from schemas.power_grid_schema import FuelSchema, check_load_step
+from schemas.power_plant_schema import PowerPlantResponseSchema, PowerPlantSchema
+
+class PowerGridSweepSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, json_schema_extra=POST_PRODUCTIONPLAN_SWEEP_EXAMPLE)
+    load: float = Field(gt=0)
+    powerplants: list[PowerPlantSchema]
+    # one fuel vector per scenario
+    fuels: list[FuelSchema] = Field(min_length=1)
+    resolution: float = Field(default=0.1, ge=0.1, le=10, multiple_of=0.1)
+
+    @model_validator(mode="after")
+    def load_is_a_multiple_of_resolution(self):
+        if "resolution" in self.model_fields_set:
+            check_load_step(self.load, self.resolution)
+        return self
+
+class SweepEntryResponseSchema(BaseModel):
+    # one NDJSON line of the sweep response
+    model_config = ConfigDict(from_attributes=True)
+    index: int
+    status_code: int
+    plan: list[PowerPlantResponseSchema] | None = None
+    engine: str | None = None
+    exception_case: str | None = None
+    detail: str | None = None
+
+    nearest_feasible_loads: NearestLoadsSchema | None = None
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from schemas.examples import POST_PRODUCTIONPLAN_CURVE_EXAMPLE
+from schemas.power_grid_schema import FuelSchema
+from schemas.power_plant_schema import PowerPlantResponseSchema, PowerPlantSchema
+
+class SupplyCurveRequestSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True, json_schema_extra=POST_PRODUCTIONPLAN_CURVE_EXAMPLE)
+    fuels: FuelSchema
+    powerplants: list[PowerPlantSchema]
+    start: float = Field(default=0, ge=0, description="First level of the curve, in MW")
+    stop: float | None = Field(default=None, gt=0, description="Last level of the curve, in MW (default: total capacity)")
+    step: float = Field(default=0.1, ge=0.1, description="Distance between curve levels, in MW")
+    plans_at: list[float] = Field(default_factory=list, max_length=100, description="Levels, in MW, whose allocation is returned")
+
+    @model_validator(mode="after")
+    def cap_levels_at_capacity(self):
+        # the DP runs up to the highest level asked for: nothing above the fleet's capacity is reachable
+        capacity = sum(
+            powerplant.pmax * self.fuels.windturbine / 100.0 if powerplant.type == "windturbine" else powerplant.pmax
+            for powerplant in self.powerplants
+        )
+        if self.stop is not None:
+            self.stop = min(self.stop, capacity)
+        above = [load for load in self.plans_at if load > capacity]
+        if above:
+            raise ValueError(f"plans_at levels {above} exceed the total capacity of the fleet ({capacity} MW).")
+        return self
+
+class SupplyCurvePointSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    load: float
+    cost: float
+    marginal_cost: float | None = Field(description="Cost per MWh of the last 0.1 MW below this level, null if that level is unreachable")
+
+class SupplyCurvePlanSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    load: float
+    plan: list[PowerPlantResponseSchema] | None
+
+class SupplyCurveResponseSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    points: list[SupplyCurvePointSchema]
+    plans: list[SupplyCurvePlanSchema]
@@ -0,0 +1,57 @@
+"""
+Aggregation of identical plants into a single DP layer.
+
+Portfolios often hold many identical units (same type, efficiency, pmin and
+pmax). Committing ``k`` of ``N`` such units produces any total in
+``[k * pmin, k * pmax]`` at the same unit cost, so the whole group is one
+layer whose allowed production is the union of those ranges. The ranges
+overlap from some ``k`` on, after which the union is a single interval: the
+number of intervals, and so the cost of the layer, stops growing with the
+number of copies. The group total is split back evenly over as few units as
+possible.
+"""
+
+
+def committed_intervals(min_units, max_units, count, limit):
+    """Merged ranges of non-zero production of ``count`` identical units, capped at ``limit``."""
+    intervals = []
+    for committed in range(1, count + 1):
+        lo, hi = max(committed * min_units, 1), min(committed * max_units, limit)
+        if lo > hi:
+            break
+        if intervals and lo <= intervals[-1][1] + 1:
+            # consecutive ranges overlap from here on, the rest of the union is contiguous
+            intervals[-1] = (intervals[-1][0], min(count * max_units, limit))
+            break
+        intervals.append((lo, hi))
+    return intervals
+
+
+def split_units(total, count, max_units):
+    """Production of each of ``count`` identical units summing to ``total``, as few units as possible on."""
+    if total == 0:
+        return [0] * count
+    # total lies in [k * pmin, k * pmax] for some k, so the smallest k covering it also respects pmin
+    committed = -(-total // max_units)
+    base, extra = divmod(total, committed)
+    return [base + 1] * extra + [base] * (committed - extra) + [0] * (count - committed)
+
+
+class PlantGroups():
+
+    def __init__(self, bounds, unit_costs, groups, limit):
+        self.groups = groups
+        self.size = len(bounds)
+        self._max_units = [bounds[group[0]][1] for group in groups]
+        self.layers = [
+            (committed_intervals(*bounds[group[0]], len(group), limit), unit_costs[group[0]])
+            for group in groups
+        ]
+
+    def expand(self, group_alloc):
+        """Per-plant allocation from the allocation of every group."""
+        alloc = [0] * self.size
+        for group, max_units, total in zip(self.groups, self._max_units, group_alloc):
+            for index, units in zip(group, split_units(total, len(group), max_units)):
+                alloc[index] = units
+        return alloc
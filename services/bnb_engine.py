@@ -0,0 +1,108 @@
+"""
+Branch-and-bound over unit commitment.
+
+Once every layer is known to be off or within one of its production ranges,
+the cheapest dispatch is a merit-order fill: each committed layer starts at
+the bottom of its range and the remaining load goes to the cheapest layers
+first. The only combinatorial choice is therefore the commitment, which is
+searched depth first in merit order.
+
+The bound of a partial commitment is its continuous relaxation: layers not
+decided yet may produce anything between zero and their largest output.
+All bounds are integer numbers of units, so the merit-order fill of the
+relaxation is itself integral, and at a leaf it is the exact dispatch. The
+work depends on the number of layers and on how well the bounds prune, not
+on the load or the granularity.
+"""
+import math
+
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.deadline import check
+from services.presolve import is_flexible
+
+
+def relaxation(ranges, merit_order, load):
+    """Merit-order fill of ``load`` with every layer within ``(lo, hi)``: ``(cost, alloc)`` or ``None``."""
+    alloc = [lo for lo, _, _ in ranges]
+    residual = load - sum(alloc)
+    if residual < 0:
+        return None
+    cost = sum(lo * unit_cost for lo, _, unit_cost in ranges)
+    for index in merit_order:
+        if residual == 0:
+            break
+        lo, hi, unit_cost = ranges[index]
+        units = min(hi - lo, residual)
+        alloc[index] += units
+        cost += units * unit_cost
+        residual -= units
+    if residual > 0:
+        return None
+    return cost, alloc
+
+
+def commitment_ranges(layers, alloc):
+    """Ranges fixing every layer to the commitment of ``alloc``, ``None`` when ``alloc`` fits no range."""
+    ranges = []
+    for (intervals, unit_cost), units in zip(layers, alloc):
+        if is_flexible(intervals):
+            ranges.append((0, intervals[-1][1] if intervals else 0, unit_cost))
+        elif units == 0:
+            ranges.append((0, 0, unit_cost))
+        else:
+            committed = next(((lo, hi) for lo, hi in intervals if lo <= units <= hi), None)
+            if committed is None:
+                return None
+            ranges.append((*committed, unit_cost))
+    return ranges
+
+
+def solve(layers, load, deadline=None, incumbent=None):
+    """
+    Minimum cost allocation of ``load`` units over ``layers``.
+
+    ``incumbent`` is an allocation of the same layers, typically solved for
+    nearby costs; its commitment, dispatched again, is the first solution
+    and prunes the search from the root. Same layer format and result as
+    ``numpy_engine.solve``.
+    """
+    merit_order = sorted(range(len(layers)), key=lambda index: layers[index][1])
+    # undecided layers are relaxed to [0, largest output], flexible ones never need a decision
+    ranges = [
+        (0, intervals[-1][1] if intervals else 0, unit_cost)
+        for intervals, unit_cost in layers
+    ]
+    decisions = [index for index in merit_order if not is_flexible(layers[index][0])]
+
+    best_cost, best_alloc = math.inf, None
+    if incumbent is not None:
+        fixed = commitment_ranges(layers, incumbent)
+        start = relaxation(fixed, merit_order, load) if fixed is not None else None
+        if start is not None:
+            best_cost, best_alloc = start
+    root = relaxation(ranges, merit_order, load)
+    stack = [(0, ranges, root)] if root is not None else []
+    while stack:
+        check(deadline)
+        depth, node_ranges, (bound, alloc) = stack.pop()
+        if bound >= best_cost - 1e-9 * max(1.0, abs(best_cost)):
+            continue
+        if depth == len(decisions):
+            best_cost, best_alloc = bound, alloc
+            continue
+
+        index = decisions[depth]
+        intervals, unit_cost = layers[index]
+        children = []
+        for lo, hi in [(0, 0), *intervals]:
+            child_ranges = node_ranges[:index] + [(lo, hi, unit_cost)] + node_ranges[index + 1:]
+            child = relaxation(child_ranges, merit_order, load)
+            if child is not None and child[0] < best_cost:
+                children.append((depth + 1, child_ranges, child))
+        # the child with the lowest bound is explored first
+        children.sort(key=lambda child: -child[2][0])
+        stack.extend(children)
+
+    if best_alloc is None:
+        raise UnfeasibleException("No feasible solution for the requested load.")
+    return best_alloc
@@ -0,0 +1,18 @@
+"""
+Cooperative deadlines for long solves.
+
+A deadline is an absolute ``time.time()`` value, so it can be computed when
+the request arrives and still be checked in a worker process. Solvers call
+``check`` between layers and give up with ``DeadlineExceeded``.
+"""
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Raised by a solver that ran out of time."""
+
+
+def check(deadline):
+    """Raise ``DeadlineExceeded`` once ``deadline`` (``None`` for no deadline) has passed."""
+    if deadline is not None and time.time() > deadline:
+        raise DeadlineExceeded()
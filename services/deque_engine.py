@@ -0,0 +1,97 @@
+"""
+Sliding-window minimum kernel for the production plan dynamic programme.
+
+A plant producing ``k`` units in ``[lo, hi]`` at a constant unit cost ``c``
+reaches level ``t`` from level ``j = t - k`` at cost ``cost[j] + (t - j) * c``,
+so its best predecessor is the argmin of ``cost[j] - j * c`` over the window
+``[t - hi, t - lo]``. Walking ``t`` upwards, that window only slides, and a
+monotone deque yields its minimum in amortised O(1). Each layer is therefore
+O(LOAD) and the whole solve O(n * LOAD), whatever the plant ranges. A group
+of identical plants allows several disjoint ranges and runs one deque per
+range. Layers without a minimum output are left to the merit-order tail of
+``services.presolve``.
+"""
+from array import array
+from collections import deque
+import math
+
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.deadline import check
+from services.presolve import Presolve
+
+
+def solve_layers(layers, load, deadline=None):
+    """
+    Run the DP over ``layers`` for every level in ``0..load``.
+
+    Returns the final cost list (``inf`` where a level is unreachable) and
+    the predecessor array of every layer. Raises ``DeadlineExceeded`` once
+    ``deadline`` has passed.
+    """
+    costs = [math.inf] * (load + 1)
+    costs[0] = 0.0
+    predecessors = []
+
+    for intervals, unit_cost in layers:
+        check(deadline)
+        new_costs = costs[:]
+        predecessor = array("i", range(load + 1))
+        reduced = [cost - level * unit_cost for level, cost in enumerate(costs)]
+
+        for lo, hi in intervals:
+            lo, hi = max(lo, 1), min(hi, load)
+            if lo > hi:
+                continue
+            window = deque()
+            for target in range(lo, load + 1):
+                # level target - lo enters the window, target - hi - 1 leaves it
+                entering = target - lo
+                if costs[entering] != math.inf:
+                    while window and reduced[window[-1]] >= reduced[entering]:
+                        window.pop()
+                    window.append(entering)
+                while window and window[0] < target - hi:
+                    window.popleft()
+                if window:
+                    source = window[0]
+                    cost = costs[source] + (target - source) * unit_cost
+                    if cost < new_costs[target]:
+                        new_costs[target] = cost
+                        predecessor[target] = source
+
+        costs = new_costs
+        predecessors.append(predecessor)
+
+    return costs, predecessors
+
+
+def solve(layers, load, deadline=None):
+    """
+    Minimum cost allocation of ``load`` units over ``layers``.
+
+    ``layers`` holds one ``(intervals, unit_cost)`` tuple per plant (or group
+    of identical plants) in merit order, ``intervals`` being the ranges of
+    non-zero production allowed for that layer; the result is the number of
+    units produced by each layer, in the same order.
+    """
+    presolve = Presolve(layers)
+    costs, predecessors = solve_layers(presolve.layers, load, deadline)
+
+    # tail_costs[r]: cheapest cost of r units from the flexible layers
+    tail_costs = [0.0]
+    for capacity, unit_cost in presolve.tail_segments():
+        for _ in range(min(capacity, load + 1 - len(tail_costs))):
+            tail_costs.append(tail_costs[-1] + unit_cost)
+    tail_costs.extend([math.inf] * (load + 1 - len(tail_costs)))
+
+    level = min(range(load + 1), key=lambda level: costs[level] + tail_costs[load - level])
+    if costs[level] + tail_costs[load - level] == math.inf:
+        raise UnfeasibleException("No feasible solution for the requested load.")
+
+    alloc = [0] * len(presolve.layers)
+    acc_load = level
+    for i in range(len(presolve.layers) - 1, -1, -1):
+        stopping_point = predecessors[i][acc_load]
+        alloc[i] = acc_load - stopping_point
+        acc_load = stopping_point
+    return presolve.expand(alloc, load - level)
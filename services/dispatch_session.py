@@ -0,0 +1,72 @@
+"""
+State of a real-time ``/ws/productionplan`` session.
+
+The client sends its fleet once, then partial ``{load, fuels}`` updates.
+Updates are merged in order as they arrive, whatever the solver is doing,
+so the session always holds the latest complete load and fuels; the
+solver only ever solves that latest state and the states it skipped are
+never solved (``seq`` tells the client which update a plan answers).
+"""
+import asyncio
+import uuid
+
+from pydantic import ValidationError
+
+from exceptions.invalid_update_exception import InvalidUpdateException
+from schemas.dispatch_schema import DispatchUpdateSchema
+from schemas.power_grid_schema import FuelSchema, check_load_step
+from services.prepared_fleet import PreparedFleet
+
+
+def validation_detail(exc: ValidationError):
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+
+class DispatchSession():
+
+    def __init__(self, powerplants, resolution=None):
+        # a key of its own keeps the fleet precomputation warm in the workers for the whole session
+        self.fleet = PreparedFleet(powerplants, key=(f"session-{uuid.uuid4().hex}", 1))
+        # loads must be multiples of a resolution the client chose, they are rounded to the default one
+        self.resolution = resolution if resolution is not None else 0.1
+        self.exact_loads = resolution is not None
+        self.seq = 0
+        self.load = None
+        self.fuels = {}
+        self.solved_seq = 0
+        self._changed = asyncio.Event()
+
+    def update(self, message):
+        """Merge one update, rejected as a whole when invalid or when it leaves the load or a fuel unset."""
+        try:
+            update = DispatchUpdateSchema.model_validate(message)
+        except ValidationError as exc:
+            raise InvalidUpdateException(validation_detail(exc))
+        if update.load is not None and self.exact_loads:
+            try:
+                check_load_step(update.load, self.resolution)
+            except ValueError as exc:
+                raise InvalidUpdateException(str(exc))
+        load = update.load if update.load is not None else self.load
+        fuels = dict(self.fuels)
+        if update.fuels is not None:
+            fuels.update(update.fuels.model_dump(by_alias=True, exclude_none=True))
+        try:
+            FuelSchema.model_validate(fuels)
+        except ValidationError as exc:
+            raise InvalidUpdateException(f"Fuels are not all set yet: {validation_detail(exc)}")
+        if load is None:
+            raise InvalidUpdateException("The load is not set yet.")
+
+        self.seq += 1
+        self.load, self.fuels = load, fuels
+        self._changed.set()
+        return self.seq
+
+    async def latest(self):
+        """Wait for an update not solved yet and return ``(seq, load, fuels)`` of the latest one."""
+        while self.seq == self.solved_seq:
+            self._changed.clear()
+            await self._changed.wait()
+        self.solved_seq = self.seq
+        return self.seq, self.load, FuelSchema.model_validate(self.fuels)
@@ -0,0 +1,111 @@
+"""
+Fixed-point variant of the dense DP of ``services.numpy_engine``.
+
+Float costs make near-equal plans compare by rounding noise: two
+commitments a fraction of a cent apart can swap from one request to the
+next when a price moves in its last digits, which shows up as flapping
+plans and defeats caching. This engine scales every unit cost to an integer
+number of milli-euro per unit of the granularity (``scale_layers``) and
+runs the same sliding-window DP over int64 arrays, where sums are exact and
+ties are real ties, broken by a fixed rule:
+
+- within the DP, a layer produces the fewest units among the cheapest ways
+  to reach a level (off before on, the lowest range first, the highest
+  predecessor level in a range), so the layers late in merit order produce
+  as little as possible;
+- between the DP and the merit-order tail of flexible layers
+  (``services.presolve``), the tail takes as much as possible.
+
+The plan is therefore a function of the integer costs alone, the same on
+every run and machine. It is optimal for the costs rounded to the
+milli-euro, which can differ from the float optimum by at most half a
+milli-euro per unit produced.
+"""
+import numpy as np
+
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.deadline import check
+from services.numpy_engine import backtrack, sliding_window_min
+from services.presolve import Presolve
+
+# integer unit costs are milli-euro per unit of the granularity
+COST_SCALE = 1000
+# cost of an unreachable level, far above any reachable cost (see solve)
+UNREACHABLE = 2 ** 61
+
+
+def scale_layers(layers, granularity):
+    """``layers`` with every unit cost, in euro per MWh, as milli-euro per unit of ``granularity``."""
+    return [(intervals, round(unit_cost * granularity * COST_SCALE)) for intervals, unit_cost in layers]
+
+
+def solve_layers(layers, load, deadline=None):
+    """
+    Run the DP over ``layers``, with integer unit costs, for every level in
+    ``0..load``. Returns the final int64 cost array (``UNREACHABLE`` where a
+    level is unreachable) and the predecessor array of every layer. Raises
+    ``DeadlineExceeded`` once ``deadline`` has passed.
+    """
+    levels = np.arange(load + 1, dtype=np.int64)
+    costs = np.full(load + 1, UNREACHABLE, dtype=np.int64)
+    costs[0] = 0
+    predecessors = []
+
+    for intervals, unit_cost in layers:
+        check(deadline)
+        new_costs = costs.copy()
+        predecessor = levels.astype(np.int32)
+        # unreachable levels stay above every reachable one once reduced
+        reduced = costs - levels * unit_cost
+
+        for lo, hi in intervals:
+            lo, hi = max(lo, 1), min(hi, load)
+            if lo > hi:
+                continue
+            _, window_arg = sliding_window_min(reduced, hi - lo + 1, fill=UNREACHABLE, latest=True)
+            # window e ends at source e and reaches target e + lo
+            sources = np.maximum(window_arg[:load + 1 - lo], 0)
+            targets = levels[lo:]
+            reachable = costs[sources] < UNREACHABLE
+            candidates = costs[sources] + (targets - sources) * unit_cost
+            # strict: on equal cost, being off or in a lower range wins
+            better = reachable & (candidates < new_costs[lo:])
+            new_costs[lo:][better] = candidates[better]
+            predecessor[lo:][better] = sources[better]
+
+        costs = new_costs
+        predecessors.append(predecessor)
+    return costs, predecessors
+
+
+def tail_costs(presolve, load):
+    """Cheapest integer cost of ``r`` units from the flexible layers of ``presolve``, for every ``r`` in ``0..load``."""
+    costs = np.full(load + 1, UNREACHABLE, dtype=np.int64)
+    unit_costs = np.repeat(
+        np.array([unit_cost for _, unit_cost in presolve.tail_segments()], dtype=np.int64),
+        [capacity for capacity, _ in presolve.tail_segments()],
+    )[:load]
+    costs[0] = 0
+    costs[1:len(unit_costs) + 1] = np.cumsum(unit_costs)
+    return costs
+
+
+def solve(layers, load, deadline=None):
+    """
+    Minimum cost allocation of ``load`` units over ``layers``, whose unit
+    costs are integers (see ``scale_layers``), ties broken as described in
+    the module docstring. Same layer format and result as
+    ``numpy_engine.solve``.
+    """
+    max_unit_cost = max((unit_cost for _, unit_cost in layers), default=0)
+    if max_unit_cost * load >= UNREACHABLE // 4:
+        raise OverflowError("Unit costs too large for fixed-point costs at this load.")
+    presolve = Presolve(layers)
+    costs, predecessors = solve_layers(presolve.layers, load, deadline)
+
+    totals = np.minimum(costs + tail_costs(presolve, load)[::-1], UNREACHABLE)
+    # the first minimum is the lowest DP level: the tail takes as much as it can
+    level = int(np.argmin(totals))
+    if totals[level] >= UNREACHABLE:
+        raise UnfeasibleException("No feasible solution for the requested load.")
+    return presolve.expand(backtrack(predecessors, level), load - level)
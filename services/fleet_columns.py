@@ -0,0 +1,168 @@
+"""
+Columnar fleet representation for the solvers.
+
+``PowerPlantSchema`` objects are convenient at the API boundary but slow in
+the solvers: every unit cost, bound or merit order read a handful of
+pydantic attributes per plant and request, and converted pmin and pmax to
+units of the granularity again each time. A ``FleetColumns`` is built once
+per fleet (by ``PreparedFleet``) and holds the fuel-independent data as
+parallel arrays:
+
+- the type code, efficiency, pmin and pmax of every plant, and the id of
+  its group of identical plants;
+- pmin and pmax in units, converted once per granularity.
+
+``dispatch`` turns it into the ``DispatchColumns`` of one request: the
+merit order (one argsort of the vectorized unit costs) and the unit cost,
+pmin and wind-capped pmax of every plant, in that order. Every engine takes
+its bounds, unit costs and plant groups from there.
+
+Conversions keep the rounding of the per-plant code exactly
+(``ceil``/``floor`` of the ratio rounded to 6 decimals), so the plans are
+the same to the last bit.
+"""
+import math
+
+import numpy as np
+
+from services.aggregation import PlantGroups
+
+TYPE_CODES = ("gasfired", "turbojet", "windturbine")
+GASFIRED, TURBOJET, WINDTURBINE = range(len(TYPE_CODES))
+
+# tons of CO2 per MWh of a gas-fired plant
+CO2_EMISSION_PER_MWH = 0.3
+
+
+class FleetColumns():
+
+    __slots__ = (
+        "size", "type_codes", "efficiency", "emissions", "pmin", "pmax", "group_ids",
+        "_gas", "_wind", "_wind_tie_break", "_units", "_max_units",
+    )
+
+    def __init__(self, powerplants):
+        self.size = len(powerplants)
+        self.type_codes = np.array([TYPE_CODES.index(powerplant.type) for powerplant in powerplants], dtype=np.int8)
+        self.efficiency = np.array([powerplant.efficiency for powerplant in powerplants], dtype=float)
+        # MW bounds stay Python numbers: their conversions round like the per-plant code
+        self.pmin = [powerplant.pmin for powerplant in powerplants]
+        self.pmax = [powerplant.pmax for powerplant in powerplants]
+        groups = {}
+        self.group_ids = [
+            groups.setdefault((powerplant.type, powerplant.efficiency, powerplant.pmin, powerplant.pmax), len(groups))
+            for powerplant in powerplants
+        ]
+        self._gas = self.type_codes == GASFIRED
+        self._wind = self.type_codes == WINDTURBINE
+        # tons of CO2 per MWh produced
+        self.emissions = np.where(self._gas, CO2_EMISSION_PER_MWH, 0.0)
+        # free wind turbines are dispatched by decreasing efficiency
+        self._wind_tie_break = np.where(self._wind, -self.efficiency, 0.0)
+        self._units = {}
+        # wind-capped pmax units of the last granularity and wind, feasibility and dispatch share it
+        self._max_units = (None, None)
+
+    def units(self, granularity):
+        """``(pmin_units, pmax_units)`` of every plant at ``granularity``, pmax before the wind cap."""
+        cached = self._units.get(granularity)
+        if cached is None:
+            cached = self._units[granularity] = (
+                np.array([int(math.ceil(round(pmin / granularity, 6))) for pmin in self.pmin], dtype=np.int64),
+                np.array([int(math.floor(round(pmax / granularity, 6))) for pmax in self.pmax], dtype=np.int64),
+            )
+        return cached
+
+    def max_units(self, fuels, granularity):
+        """pmax of every plant in units of ``granularity``, wind turbines capped by the wind of ``fuels``."""
+        key, max_units = self._max_units
+        if key != (granularity, fuels.windturbine):
+            max_units = self.units(granularity)[1].copy()
+            for index in np.flatnonzero(self._wind).tolist():
+                # pmax depends on wind
+                capacity = self.pmax[index] * fuels.windturbine / 100.0
+                max_units[index] = int(math.floor(round(capacity / granularity, 6)))
+            self._max_units = ((granularity, fuels.windturbine), max_units)
+        return max_units
+
+    def bounds(self, fuels, granularity, limit):
+        """``(min_units, max_units)`` of every plant, production capped at ``limit`` units."""
+        min_units = self.units(granularity)[0]
+        return list(zip(min_units.tolist(), np.minimum(self.max_units(fuels, granularity), limit).tolist()))
+
+    def capacities(self, fuels):
+        """Maximum output of every plant under ``fuels``, in MW."""
+        return [
+            pmax * fuels.windturbine / 100.0 if type_code == WINDTURBINE else pmax
+            for pmax, type_code in zip(self.pmax, self.type_codes.tolist())
+        ]
+
+    def unit_costs(self, fuels):
+        """Unit cost of every plant under ``fuels``, as ``PlantService._get_unit_cost``."""
+        return self.unit_cost_matrix([fuels])[0]
+
+    def fuel_cost_matrix(self, fuels):
+        """Fuel cost per MWh of every plant (columns) under every fuel scenario (rows), CO2 excluded."""
+        prices = np.array([(scenario.gasfired, scenario.turbojet, 0.0) for scenario in fuels], dtype=float)
+        return prices[:, self.type_codes] / self.efficiency
+
+    def unit_cost_matrix(self, fuels):
+        """Unit cost of every plant (columns) under every fuel scenario (rows)."""
+        co2_prices = np.array([scenario.co2 for scenario in fuels], dtype=float)
+        return self.fuel_cost_matrix(fuels) + co2_prices[:, None] * self.emissions
+
+    def merit_order(self, costs):
+        """
+        Plant indices sorted by ``costs`` along the last axis: free wind
+        turbines by decreasing efficiency, any other tie in plant order.
+        """
+        # lexsort is stable: equal keys stay in plant order
+        tie_break = self._wind_tie_break if costs.ndim == 1 else np.broadcast_to(self._wind_tie_break, costs.shape)
+        return np.lexsort((tie_break, costs), axis=-1)
+
+    def dispatch(self, fuels, granularity, order=None, unit_costs=None):
+        """
+        Columns of the plants in ``order`` (default: the merit order) under
+        ``fuels`` at ``granularity``. ``unit_costs``, in that order, skips
+        their computation when the caller already has them.
+        """
+        if unit_costs is None:
+            costs = self.unit_costs(fuels)
+            if order is None:
+                order = self.merit_order(costs)
+            unit_costs = costs[order]
+        order = np.asarray(order, dtype=np.intp)
+        pmin_units = self.units(granularity)[0]
+        pmax_units = self.max_units(fuels, granularity)
+        return DispatchColumns(
+            order.tolist(), self.type_codes[order], pmin_units[order], pmax_units[order],
+            np.asarray(unit_costs, dtype=float), [self.group_ids[index] for index in order.tolist()],
+        )
+
+
+class DispatchColumns():
+
+    __slots__ = ("order", "type_codes", "pmin_units", "pmax_units", "unit_costs", "group_ids")
+
+    def __init__(self, order, type_codes, pmin_units, pmax_units, unit_costs, group_ids):
+        self.order = order
+        self.type_codes = type_codes
+        self.pmin_units = pmin_units
+        self.pmax_units = pmax_units
+        self.unit_costs = unit_costs
+        self.group_ids = group_ids
+
+    def bounds(self, limit):
+        """``(min_units, max_units)`` of every plant, production capped at ``limit`` units."""
+        return list(zip(self.pmin_units.tolist(), np.minimum(self.pmax_units, limit).tolist()))
+
+    def groups(self):
+        """Positions of identical plants, grouped, with groups ordered by their first member."""
+        groups = {}
+        for position, group_id in enumerate(self.group_ids):
+            groups.setdefault(group_id, []).append(position)
+        return list(groups.values())
+
+    def plant_groups(self, limit):
+        """DP layers of the plants, identical plants merged, for ``limit`` units."""
+        return PlantGroups(self.bounds(limit), self.unit_costs.tolist(), self.groups(), limit)
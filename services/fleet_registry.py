@@ -0,0 +1,39 @@
+"""
+In-memory registry of fleets registered through ``/fleets``.
+
+Each fleet is kept as a ``PreparedFleet`` so its fuel-independent
+precomputation is built once. Replacing the powerplants of a fleet bumps its
+version, which gives the new ``PreparedFleet`` a new key: caches built for
+the previous composition, here and in the worker processes, are no longer
+used.
+"""
+import uuid
+
+from exceptions.fleet_not_found_exception import FleetNotFoundException
+from services.prepared_fleet import PreparedFleet
+
+
+class FleetRegistry():
+
+    def __init__(self):
+        self._fleets = {}
+
+    def register(self, powerplants):
+        fleet_id = uuid.uuid4().hex
+        self._fleets[fleet_id] = PreparedFleet(powerplants, key=(fleet_id, 1))
+        return self._fleets[fleet_id]
+
+    def get(self, fleet_id):
+        fleet = self._fleets.get(fleet_id)
+        if fleet is None:
+            raise FleetNotFoundException(f"Fleet {fleet_id} is not registered.")
+        return fleet
+
+    def replace(self, fleet_id, powerplants):
+        _, version = self.get(fleet_id).key
+        self._fleets[fleet_id] = PreparedFleet(powerplants, key=(fleet_id, version + 1))
+        return self._fleets[fleet_id]
+
+    def delete(self, fleet_id):
+        self.get(fleet_id)
+        del self._fleets[fleet_id]
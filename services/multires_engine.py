@@ -0,0 +1,129 @@
+"""
+Coarse-to-fine production plan solve.
+
+The DP is solved first on a grid ``factor`` times coarser (1 MW for the
+default 0.1 MW granularity), which is enough to decide the commitment, i.e.
+which layers are on and in which of their production ranges. Once the
+commitment is fixed the problem has no integrality left: every committed
+layer starts at the bottom of its range and the remaining load goes to the
+cheapest layers first, up to the top of their ranges. That dispatch is
+exact at the fine granularity and linear in the number of layers.
+
+Rounding the ranges to the coarse grid can mislead the commitment near a
+boundary (a pmin of 10.5 MW, a wind capacity of 20.9 MW), so the coarse
+commitment is only a starting point: single-layer changes of commitment are
+tried at the fine granularity until none lowers the cost. The result is
+not guaranteed optimal, but it matches the exact engines on the reference
+scenarios. When no nearby commitment serves the load, the exact dense
+engine solves the request instead.
+"""
+from exceptions.unfeasible_exception import UnfeasibleException
+from services import numpy_engine
+from services.deadline import check
+from services.presolve import is_flexible
+
+COARSE_FACTOR = 10
+# the coarse grid is widened further so that it never holds many more levels than this
+COARSE_LEVELS = 1000
+
+
+def coarse_layers(layers, factor, outwards):
+    """``layers`` with every range rounded to multiples of ``factor``, inwards or outwards."""
+    if outwards:
+        return [([(lo // factor, -(-hi // factor)) for lo, hi in intervals], unit_cost) for intervals, unit_cost in layers]
+    return [([(-(-lo // factor), hi // factor) for lo, hi in intervals], unit_cost) for intervals, unit_cost in layers]
+
+
+def commitment(layers, coarse_alloc, factor):
+    """Range index of every layer under the coarse allocation, ``None`` when off."""
+    states = []
+    for (intervals, _), units in zip(layers, coarse_alloc):
+        if units == 0 or not intervals:
+            states.append(None)
+        else:
+            # rounding may leave the coarse output just outside the fine range
+            states.append(min(
+                range(len(intervals)),
+                key=lambda index: max(intervals[index][0] - units * factor, units * factor - intervals[index][1], 0),
+            ))
+    return states
+
+
+def dispatch(layers, states, load):
+    """Cheapest allocation of ``load`` with every layer in its committed range, or ``None``."""
+    ranges = []
+    for (intervals, _), state in zip(layers, states):
+        if is_flexible(intervals):
+            ranges.append((0, intervals[-1][1] if intervals else 0))
+        elif state is None:
+            ranges.append((0, 0))
+        else:
+            ranges.append(intervals[state])
+    alloc = [lo for lo, _ in ranges]
+    residual = load - sum(alloc)
+    if residual < 0:
+        return None
+    for index in sorted(range(len(layers)), key=lambda index: layers[index][1]):
+        lo, hi = ranges[index]
+        units = min(hi - lo, residual)
+        alloc[index] += units
+        residual -= units
+    return alloc if residual == 0 else None
+
+
+def _cost(layers, alloc):
+    return sum(units * unit_cost for units, (_, unit_cost) in zip(alloc, layers))
+
+
+def refine(layers, states, load, deadline=None):
+    """
+    Best dispatch around the coarse commitment: single-layer changes of
+    commitment are tried until none lowers the cost. Returns ``None`` when
+    no nearby commitment can serve the load.
+    """
+    best = dispatch(layers, states, load)
+    best_cost = _cost(layers, best) if best is not None else None
+    improved = True
+    while improved:
+        check(deadline)
+        improved = False
+        for index, (intervals, _) in enumerate(layers):
+            if is_flexible(intervals):
+                continue
+            for state in [None, *range(len(intervals))]:
+                if state == states[index]:
+                    continue
+                candidate_states = states[:index] + [state] + states[index + 1:]
+                alloc = dispatch(layers, candidate_states, load)
+                if alloc is None:
+                    continue
+                cost = _cost(layers, alloc)
+                if best_cost is None or cost < best_cost - 1e-9:
+                    best, best_cost, states = alloc, cost, candidate_states
+                    improved = True
+    return best
+
+
+def solve(layers, load, deadline=None, factor=None):
+    """
+    Minimum cost allocation of ``load`` units over ``layers``, solving the
+    commitment at ``factor`` times the granularity.
+
+    Same layer format and result as ``numpy_engine.solve``.
+    """
+    # inward rounding never overstates a range, outward rounding never hides one:
+    # each can mislead the commitment near a rounding boundary, so both are refined
+    if factor is None:
+        factor = max(COARSE_FACTOR, load // COARSE_LEVELS)
+    candidates = []
+    for outwards in (False, True):
+        try:
+            coarse_alloc = numpy_engine.solve(coarse_layers(layers, factor, outwards), int(round(load / factor)), deadline)
+        except UnfeasibleException:
+            continue
+        alloc = refine(layers, commitment(layers, coarse_alloc, factor), load, deadline)
+        if alloc is not None:
+            candidates.append(alloc)
+    if not candidates:
+        return numpy_engine.solve(layers, load, deadline)
+    return min(candidates, key=lambda alloc: _cost(layers, alloc))
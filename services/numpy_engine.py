@@ -0,0 +1,170 @@
+"""
+Dense NumPy kernel for the production plan dynamic programme.
+
+Every layer of the DP is a float64 cost array over the production levels
+``0..LOAD`` (in granularity units) plus an int32 predecessor array used to
+backtrack the allocation. A plant producing ``k`` units in ``[lo, hi]`` at a
+constant unit cost ``c`` reaches level ``t`` from level ``j = t - k``, so
+
+    cost'[t] = min(cost[t], t * c + min(cost[j] - j * c for j in [t - hi, t - lo]))
+
+and the inner minimum is a sliding-window minimum over ``cost - levels * c``.
+It is evaluated for all levels at once with the van Herk / Gil-Werman block
+scheme, so each plant costs O(LOAD) vectorized operations whatever its range.
+A group of identical plants allows several disjoint ranges and takes one
+window per range. Layers without a minimum output are left to the
+merit-order tail of ``services.presolve``.
+"""
+import numpy as np
+
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.deadline import check
+from services.presolve import Presolve
+
+
+def _running_min(grid, latest=False):
+    """Running minimum along the rows of ``grid`` and the first (``latest``: last) column reaching it."""
+    running = np.minimum.accumulate(grid, axis=1)
+    columns = np.arange(grid.shape[1])
+    improves = np.ones(grid.shape, dtype=bool)
+    improves[:, 1:] = (grid[:, 1:] <= running[:, :-1]) if latest else (grid[:, 1:] < running[:, :-1])
+    argument = np.maximum.accumulate(np.where(improves, columns, 0), axis=1)
+    return running, argument
+
+
+def sliding_window_min(values, width, fill=np.inf, latest=False):
+    """
+    Minimum of ``values[e - width + 1 .. e]`` (clipped at 0) for every ``e``,
+    together with the index where it is reached. ``fill`` pads the windows
+    clipped at 0 and must not be below any value. With ``latest``, ties are
+    reached at the highest index.
+    """
+    size = len(values)
+    pad = width - 1
+    blocks = -(-(pad + size) // width)
+    padded = np.full(blocks * width, fill, dtype=values.dtype)
+    padded[pad:pad + size] = values
+    grid = padded.reshape(blocks, width)
+
+    prefix, prefix_arg = _running_min(grid, latest)
+    suffix, suffix_arg = _running_min(grid[:, ::-1])
+    suffix = suffix[:, ::-1]
+    suffix_arg = (width - 1) - suffix_arg[:, ::-1]
+
+    offsets = np.arange(blocks)[:, None] * width
+    prefix, prefix_arg = prefix.ravel(), (prefix_arg + offsets).ravel()
+    suffix, suffix_arg = suffix.ravel(), (suffix_arg + offsets).ravel()
+
+    # window e covers padded positions [e, e + width - 1]: the suffix of one
+    # block followed by the prefix of the next one
+    starts = np.arange(size)
+    ends = starts + pad
+    use_suffix = suffix[starts] < prefix[ends] if latest else suffix[starts] <= prefix[ends]
+    minimum = np.where(use_suffix, suffix[starts], prefix[ends])
+    argument = np.where(use_suffix, suffix_arg[starts], prefix_arg[ends]) - pad
+    return minimum, argument
+
+
+def iter_layers(layers, load, start=0, solved=None, deadline=None):
+    """
+    Run the DP over ``layers`` for the levels ``start..load``, yielding for
+    every layer its cost array over ``0..load`` and its predecessor array
+    over ``start..load``.
+
+    ``solved`` holds the cost array of every layer over ``0..start - 1``
+    from an earlier run up to ``start - 1``, which the windows of the new
+    levels reach back into: a DP solved up to some level is extended to
+    higher ones without revisiting the levels it already has. Raises
+    ``DeadlineExceeded`` once ``deadline`` has passed.
+    """
+    all_levels = np.arange(load + 1)
+    levels = all_levels[start:]
+    costs = np.full(load + 1, np.inf)
+    costs[0] = 0.0
+
+    for index, (intervals, unit_cost) in enumerate(layers):
+        check(deadline)
+        new_costs = costs[start:].copy()
+        predecessor = levels.astype(np.int32)
+        reduced = costs - all_levels * unit_cost
+
+        for lo, hi in intervals:
+            lo, hi = max(lo, 1), min(hi, load)
+            if lo > hi or start > load:
+                continue
+            # the windows of targets from ``start`` on only look at sources from ``first`` on
+            first = max(0, start - hi)
+            window_min, window_arg = sliding_window_min(reduced[first:], hi - lo + 1)
+            # window e ends at source first + e and reaches target first + e + lo
+            skip, end = max(0, start - first - lo), load + 1 - lo - first
+            window_min, window_arg = window_min[skip:end], window_arg[skip:end]
+            window_arg += first
+            offset = first + skip + lo - start
+            reachable = np.isfinite(window_min)
+            targets = levels[offset:]
+            sources = np.where(reachable, window_arg, 0)
+            candidates = costs[sources] + (targets - sources) * unit_cost
+            better = reachable & (candidates < new_costs[offset:])
+            new_costs[offset:][better] = candidates[better]
+            predecessor[offset:][better] = sources[better]
+
+        costs = np.concatenate((solved[index], new_costs)) if start else new_costs
+        yield costs, predecessor
+
+
+def solve_layers(layers, load, deadline=None):
+    """
+    Run the DP over ``layers`` for every level in ``0..load``.
+
+    ``layers`` holds one ``(intervals, unit_cost)`` tuple per plant (or group
+    of identical plants) in merit order, ``intervals`` being the ranges of
+    non-zero production allowed for that layer. Returns the final cost array
+    (``inf`` where a level is unreachable) and the predecessor array of
+    every layer. Raises ``DeadlineExceeded`` once ``deadline`` has passed.
+    """
+    costs = np.full(load + 1, np.inf)
+    costs[0] = 0.0
+    predecessors = []
+    for costs, predecessor in iter_layers(layers, load, deadline=deadline):
+        predecessors.append(predecessor)
+    return costs, predecessors
+
+
+def backtrack(predecessors, level):
+    """Units produced by each layer to reach ``level``."""
+    alloc = [0] * len(predecessors)
+    acc_load = level
+    for i in range(len(predecessors) - 1, -1, -1):
+        stopping_point = int(predecessors[i][acc_load])
+        alloc[i] = acc_load - stopping_point
+        acc_load = stopping_point
+    return alloc
+
+
+def tail_costs(presolve, load):
+    """Cheapest cost of ``r`` units from the flexible layers of ``presolve``, for every ``r`` in ``0..load``."""
+    costs = np.full(load + 1, np.inf)
+    unit_costs = np.repeat(
+        [unit_cost for _, unit_cost in presolve.tail_segments()],
+        [capacity for capacity, _ in presolve.tail_segments()],
+    )[:load]
+    costs[0] = 0.0
+    costs[1:len(unit_costs) + 1] = np.cumsum(unit_costs)
+    return costs
+
+
+def solve(layers, load, deadline=None):
+    """
+    Minimum cost allocation of ``load`` units over ``layers``.
+
+    The result is the number of units produced by each layer, in the order
+    of ``layers``.
+    """
+    presolve = Presolve(layers)
+    costs, predecessors = solve_layers(presolve.layers, load, deadline)
+
+    totals = costs + tail_costs(presolve, load)[::-1]
+    level = int(np.argmin(totals))
+    if not np.isfinite(totals[level]):
+        raise UnfeasibleException("No feasible solution for the requested load.")
+    return presolve.expand(backtrack(predecessors, level), load - level)
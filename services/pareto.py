@@ -0,0 +1,349 @@
+"""
+Cost/CO2 Pareto front of a load from one DP pass.
+
+Running cost and emissions pull in different directions: gas-fired plants
+are the only emitters but often the cheapest. Instead of a scalar cost,
+every production level of the DP holds a front of non-dominated
+``(fuel cost, CO2)`` points, cheapest first, each with the level and point
+of the previous layer it was reached from.
+
+A layer producing ``k`` units in ``[lo, hi]`` adds ``k * (c, e)`` to a point
+of level ``t - k``. Subtracting ``j * (c, e)`` from every point of level
+``j`` makes the points independent of the target level, so the candidates of
+target ``t`` are the union of the reduced fronts over the window
+``[t - hi, t - lo]``, shifted by ``t * (c, e)``. The union of fronts is
+associative, so window unions are built from a sparse table of power-of-two
+windows: O(log(hi - lo)) vectorized merges per range and layer, whatever the
+range.
+
+The work is kept to the fronts that can matter:
+
+- flexible layers (see ``services.presolve``) skip the DP. The front of
+  ``r`` units of them is made of the merit-order fills of ``r`` units for
+  every weighting ``c + w * e`` of cost and CO2 and of the plans between
+  them (``tail_fronts``), and is combined with the DP fronts once, at the
+  end, in chunks of levels;
+- after each layer, only the levels the layers so far reach and from which
+  the remaining layers can still reach the load are kept;
+- fronts only hold as many points as the longest front of a level. Layers
+  emitting the same CO2 per unit, as gas-fired plants do, leave a single
+  point per level.
+
+Every front is capped at ``max_points`` points. A longer front keeps points
+evenly spread along it, always including both ends: the cheapest plan
+and the least emitting plan of every level are exact, the points between
+them are a sample of the front.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.deadline import check
+from services.presolve import is_flexible
+
+# fronts of a range of levels, one column per level and one row per point: fuel cost and CO2 of the
+# point, and where it comes from (``level * max_points + point`` of the previous layer in the DP)
+Fronts = namedtuple("Fronts", ["costs", "co2", "links"])
+# candidates of the final combination per chunk of levels, to bound the memory it takes
+COMBINE_CHUNK = 2 ** 20
+
+
+def _shift(fronts, offset):
+    """Fronts whose level ``i`` is level ``i - offset`` of ``fronts``, empty below ``offset``."""
+    if offset == 0:
+        return fronts
+    points, size = fronts.costs.shape
+    offset = min(offset, size)
+    costs, co2 = np.full((points, size), np.inf), np.full((points, size), np.inf)
+    links = np.zeros((points, size), dtype=fronts.links.dtype)
+    costs[:, offset:], co2[:, offset:], links[:, offset:] = (field[:, :size - offset] for field in fronts)
+    return Fronts(costs, co2, links)
+
+
+def prune(fronts, max_points):
+    """
+    Non-dominated points of every level of ``fronts``, cheapest first, padded
+    with empty points to the longest front. Longer fronts than
+    ``max_points`` keep ``max_points`` points evenly spread along them, both
+    ends included.
+    """
+    rows, size = fronts.costs.shape
+    # flat indices of every level's points, cheapest first (least emitting first among equal costs)
+    columns = np.arange(size)
+    order = np.lexsort((fronts.co2, fronts.costs), axis=0) * size + columns
+    co2 = fronts.co2.ravel()[order]
+    # a point is kept when it emits less than every cheaper point
+    previous = np.full(co2.shape, np.inf)
+    np.minimum.accumulate(co2[:-1], axis=0, out=previous[1:])
+    with np.errstate(invalid="ignore"):
+        # below a relative 1e-9, emissions are equal up to rounding
+        keep = co2 < np.where(np.isfinite(previous), previous - 1e-9 * np.abs(previous), np.inf)
+    ranks = np.cumsum(keep, axis=0)
+    counts = ranks[-1]
+    points = max(1, min(max_points, int(counts.max(initial=0))))
+
+    # kept[r, e]: flat index of the r-th kept point of level e
+    kept = np.take_along_axis(order, np.argsort(~keep, axis=0, kind="stable"), axis=0)
+
+    picks = np.broadcast_to(np.arange(points)[:, None], (points, size))
+    if points == max_points:
+        spread = np.rint(picks * ((counts - 1) / max(max_points - 1, 1))).astype(np.intp)
+        picks = np.where(counts > max_points, spread, picks)
+    empty = picks >= counts
+    selected = kept[np.minimum(picks, rows - 1), columns]
+
+    costs, co2, links = (field.ravel()[selected] for field in fronts)
+    costs[empty] = np.inf
+    co2[empty] = np.inf
+    return Fronts(costs, co2, links)
+
+
+def merge(first, second, max_points):
+    """Pruned union of two fronts of every level."""
+    return prune(Fronts(*(np.concatenate(fields) for fields in zip(first, second))), max_points)
+
+
+def window_union(fronts, width, max_points):
+    """Union of the fronts of levels ``e - width + 1 .. e`` (clipped at 0) for every level ``e``."""
+    span = 1
+    while span * 2 <= width:
+        fronts = merge(fronts, _shift(fronts, span), max_points)
+        span *= 2
+    if span < width:
+        fronts = merge(fronts, _shift(fronts, width - span), max_points)
+    return fronts
+
+
+def _pad(fronts, size):
+    """Fronts of ``size`` levels, the levels past those of ``fronts`` empty."""
+    points, known = fronts.costs.shape
+    if known >= size:
+        return fronts
+    return Fronts(
+        np.hstack((fronts.costs, np.full((points, size - known), np.inf))),
+        np.hstack((fronts.co2, np.full((points, size - known), np.inf))),
+        np.hstack((fronts.links, np.zeros((points, size - known), dtype=fronts.links.dtype))),
+    )
+
+
+def solve_layers(layers, load, max_points, floors=None, deadline=None):
+    """
+    Run the DP over ``layers`` for the levels up to ``load``.
+
+    ``layers`` holds one ``(intervals, unit_cost, unit_co2)`` tuple per
+    plant (or group of identical plants). Only the levels the layers so far
+    reach are kept, and none below ``floors[i]`` after layer ``i`` (default:
+    0). Returns the lowest level and the fronts of the levels from it after
+    the last layer, and the ``(lowest level, links)`` of every layer,
+    pointing into the fronts of the previous one. Raises
+    ``DeadlineExceeded`` once ``deadline`` has passed.
+    """
+    floors = floors if floors is not None else [0] * len(layers)
+    base = 0
+    fronts = Fronts(np.zeros((1, 1)), np.zeros((1, 1)), np.zeros((1, 1), dtype=np.int32))
+    links = []
+
+    for (intervals, unit_cost, unit_co2), floor in zip(layers, floors):
+        check(deadline)
+        # levels above the previous ones plus the layer's largest range are out of reach
+        top = min(load, base + fronts.costs.shape[1] - 1 + max((hi for _, hi in intervals), default=0))
+        fronts = _pad(fronts, top - base + 1)
+        levels = np.arange(base, top + 1)
+        # every point of every level linked to itself
+        own_links = (levels * max_points + np.arange(len(fronts.costs))[:, None]).astype(np.int32)
+        # staying off keeps every point of the level
+        candidates = Fronts(fronts.costs, fronts.co2, own_links)
+        reduced = Fronts(fronts.costs - levels * unit_cost, fronts.co2 - levels * unit_co2, own_links)
+        for lo, hi in intervals:
+            lo, hi = max(lo, 1), min(hi, top - base)
+            if lo > hi:
+                continue
+            check(deadline)
+            # window e ends at source e and reaches target e + lo
+            window = _shift(window_union(reduced, hi - lo + 1, max_points), lo)
+            window = window._replace(costs=window.costs + levels * unit_cost, co2=window.co2 + levels * unit_co2)
+            candidates = merge(candidates, window, max_points)
+        # levels below the floor cannot reach the load any more
+        floor = min(max(floor, base), top)
+        fronts = Fronts(*(field[:, floor - base:] for field in candidates))
+        base = floor
+        links.append((base, fronts.links))
+    return base, fronts, links
+
+
+def tail_orders(tail, max_orders):
+    """
+    Merit orders of the flexible layers ``tail`` (``(capacity, unit_cost,
+    unit_co2)`` tuples) for the weightings ``c + w * e`` of cost and CO2,
+    from ``w = 0`` (cheapest first) to an infinite ``w`` (least emitting
+    first). Consecutive orders swap two neighbouring layers, tied at the
+    weight where they swap; when there are more than ``max_orders`` of them,
+    an evenly spread sample is kept, both ends included.
+    """
+    costs = np.array([unit_cost for _, unit_cost, _ in tail], dtype=float)
+    co2 = np.array([unit_co2 for _, _, unit_co2 in tail], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        swaps = (costs[None, :] - costs[:, None]) / (co2[:, None] - co2[None, :])
+    swaps = np.unique(swaps[np.isfinite(swaps) & (swaps > 0)])
+    # one weight inside every interval between swaps, ties broken by the other criterion
+    weights = np.concatenate(([0.0], (swaps[:-1] + swaps[1:]) / 2, swaps[-1:] + 1.0))
+    targets = [np.lexsort((co2, costs + weight * co2)) for weight in weights] + [np.lexsort((costs, co2))]
+
+    orders = [targets[0].tolist()]
+    for target in targets[1:]:
+        rank = np.argsort(target)
+        order = list(orders[-1])
+        # only layers tied at the weight between both targets are out of order: bubble them one swap at a time
+        swapped = True
+        while swapped:
+            swapped = False
+            for position in range(len(order) - 1):
+                if rank[order[position]] > rank[order[position + 1]]:
+                    order[position], order[position + 1] = order[position + 1], order[position]
+                    orders.append(list(order))
+                    swapped = True
+    if len(orders) > max_orders:
+        orders = [orders[index] for index in np.unique(np.rint(np.linspace(0, len(orders) - 1, max_orders)).astype(int))]
+    return orders
+
+
+def _swap(orders, index):
+    """Position of the two neighbouring layers ``orders[index + 1]`` swaps in ``orders[index]``, if that is all it changes."""
+    if index + 1 >= len(orders):
+        return None
+    changed = [position for position, (first, second) in enumerate(zip(orders[index], orders[index + 1])) if first != second]
+    if len(changed) == 2 and changed[1] == changed[0] + 1:
+        return changed[0]
+    return None
+
+
+def _fill(tail, order, units):
+    """Units of each flexible layer when ``units`` units are filled in ``order``."""
+    alloc = [0] * len(tail)
+    for index in order:
+        alloc[index] = min(tail[index][0], units)
+        units -= alloc[index]
+    return alloc
+
+
+def tail_fronts(tail, orders, size, max_points):
+    """
+    Fronts of ``0..size - 1`` units from the flexible layers ``tail``.
+
+    Every merit order of ``orders`` gives a point per level. Between two
+    orders swapping neighbouring layers X and Y, the plans moving units one
+    by one from X to Y lie on the segment joining both points; up to
+    ``max_points`` of them are spread over the segments. This is the whole
+    front unless three layers lie on one line of the cost/CO2 plane, which
+    takes three distinct emission factors. Links are
+    ``order * size + units moved``.
+    """
+    capacities = np.array([capacity for capacity, _, _ in tail], dtype=np.int64)
+    units = min(int(capacities.sum()), size - 1)
+    levels = np.arange(size)
+    segments = [index for index in range(len(orders)) if _swap(orders, index) is not None]
+    fractions = np.linspace(0.0, 1.0, max(2, max_points // max(len(segments), 1)))[1:-1]
+    rows = []
+    for index, order in enumerate(orders):
+        costs, co2 = np.full(size, np.inf), np.full(size, np.inf)
+        costs[0] = co2[0] = 0.0
+        costs[1:units + 1] = np.cumsum(np.repeat([tail[layer][1] for layer in order], capacities[order])[:units])
+        co2[1:units + 1] = np.cumsum(np.repeat([tail[layer][2] for layer in order], capacities[order])[:units])
+        rows.append((costs, co2, np.full(size, index * size, dtype=np.int64)))
+        position = _swap(orders, index)
+        if position is None:
+            continue
+        first, second = order[position], order[position + 1]
+        start = capacities[order[:position]].sum()
+        # units of the first layer the next order hands over to the second one
+        moved = (np.clip(levels - start, 0, capacities[first])
+                 - np.clip(levels - start - capacities[second], 0, capacities[first]))
+        for fraction in fractions:
+            steps = np.rint(fraction * moved).astype(np.int64)
+            rows.append((costs + steps * (tail[second][1] - tail[first][1]),
+                         co2 + steps * (tail[second][2] - tail[first][2]),
+                         index * size + steps))
+    return prune(Fronts(*(np.stack(field) for field in zip(*rows))), max_points)
+
+
+def tail_alloc(tail, orders, size, link, units):
+    """Units of each flexible layer of the tail point linked by ``link`` at ``units`` units."""
+    index, steps = divmod(link, size)
+    alloc = _fill(tail, orders[index], units)
+    if steps:
+        position = _swap(orders, index)
+        alloc[orders[index][position]] -= steps
+        alloc[orders[index][position + 1]] += steps
+    return alloc
+
+
+def combine(base, fronts, tail, load, max_points, deadline=None):
+    """
+    Front of ``load`` units from the DP fronts of the levels ``base..load``
+    and the tail fronts of the units left. Links are
+    ``(level * dp_points + dp_point) * tail_points + tail_point``.
+    """
+    dp_points, tail_points = len(fronts.costs), len(tail.costs)
+    first, last = max(base, load + 1 - tail.costs.shape[1]), min(load, base + fronts.costs.shape[1] - 1)
+    chunk = max(1, COMBINE_CHUNK // (dp_points * tail_points))
+    combined = Fronts(np.full((1, 1), np.inf), np.full((1, 1), np.inf), np.zeros((1, 1), dtype=np.int64))
+    for start in range(first, last + 1, chunk):
+        check(deadline)
+        levels = np.arange(start, min(start + chunk, last + 1))
+        dp_costs, dp_co2 = fronts.costs[:, levels - base], fronts.co2[:, levels - base]
+        tail_costs, tail_co2 = tail.costs[:, load - levels], tail.co2[:, load - levels]
+        links = ((levels * dp_points + np.arange(dp_points)[:, None])[:, None, :] * tail_points
+                 + np.arange(tail_points)[None, :, None])
+        candidates = Fronts(
+            (dp_costs[:, None, :] + tail_costs[None, :, :]).reshape(-1, 1),
+            (dp_co2[:, None, :] + tail_co2[None, :, :]).reshape(-1, 1),
+            links.reshape(-1, 1),
+        )
+        combined = merge(combined, candidates, max_points)
+    return combined
+
+
+def solve(layers, load, max_points, deadline=None):
+    """
+    Pareto front of ``load`` units over ``layers``, cheapest first: one
+    ``(cost, co2, alloc)`` per point, costs and CO2 per unit as in
+    ``layers`` and ``alloc`` the units produced by each layer.
+    """
+    constrained = [index for index, (intervals, _, _) in enumerate(layers) if not is_flexible(intervals)]
+    flexible = [index for index, (intervals, _, _) in enumerate(layers) if is_flexible(intervals)]
+    tail = [(layers[index][0][0][1] if layers[index][0] else 0, layers[index][1], layers[index][2]) for index in flexible]
+    tail_capacity = sum(capacity for capacity, _, _ in tail)
+
+    # after a layer, a level is kept when the layers left can still make up the rest of the load
+    floors, capacity_left = [], tail_capacity
+    for index in reversed(constrained):
+        floors.append(max(0, load - capacity_left))
+        capacity_left += max((hi for _, hi in layers[index][0]), default=0)
+    floors.reverse()
+
+    base, fronts, links = solve_layers([layers[index] for index in constrained], load, max_points, floors, deadline)
+    orders = tail_orders(tail, max_points)
+    size = min(load, tail_capacity) + 1
+    tails = tail_fronts(tail, orders, size, max_points)
+    front = combine(base, fronts, tails, load, max_points, deadline)
+
+    dp_points, tail_points = len(fronts.costs), len(tails.costs)
+    points = []
+    for cost, co2, link in zip(front.costs[:, 0].tolist(), front.co2[:, 0].tolist(), front.links[:, 0].tolist()):
+        if not np.isfinite(cost):
+            continue
+        alloc = [0] * len(layers)
+        link, tail_point = divmod(link, tail_points)
+        level, slot = divmod(link, dp_points)
+        residual = load - level
+        for index, units in zip(flexible, tail_alloc(tail, orders, size, int(tails.links[tail_point, residual]), residual)):
+            alloc[index] = units
+        for (layer_base, layer_links), index in zip(reversed(links), reversed(constrained)):
+            previous, slot = divmod(int(layer_links[slot, level - layer_base]), max_points)
+            alloc[index] = level - previous
+            level = previous
+        points.append((cost, co2, alloc))
+    if not points:
+        raise UnfeasibleException("No feasible solution for the requested load.")
+    return points
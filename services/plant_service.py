@@ -1,5 +1,22 @@
+from array import array
+from bisect import bisect_left
+
+from fastapi import status
+
+from exceptions.api_exception import ApiException
+from exceptions.solver_timeout_exception import SolverTimeoutException
 from exceptions.unfeasible_exception import UnfeasibleException
-from schemas.power_grid_schema import PowerGridSchema
+from schemas.power_grid_batch_schema import ScenarioSchema
+from schemas.power_grid_schema import FuelSchema, PowerGridSchema
+from schemas.pareto_schema import ParetoRequestSchema
+from schemas.supply_curve_schema import SupplyCurveRequestSchema
+from services import bnb_engine, fixed_point_engine, numpy_engine, pareto, solver_registry, warm_start
+from services.aggregation import PlantGroups
+from services.deadline import DeadlineExceeded, check as check_deadline
+from services.fleet_columns import FleetColumns
+from services.prepared_fleet import PreparedFleet, warm
+from services.reachability import interval_shift, iter_bits_descending, nearest_levels, subset_sum_layers
+from services.supply_curve import SupplyCurve
 import math
 
 class PlantService():
@@ -18,105 +35,390 @@ class PlantService():
         return fuel_total_cost
     
     @staticmethod
-    def _get_significant_production_steps(powerplants, granularity):
-        significant_production_steps = [[] for _ in range(len(powerplants))]
-        for plant_index in reversed(range(len(powerplants))):
-            powerplant = powerplants[plant_index]
-            pmin_adjusted = int(math.ceil(powerplant.pmin / granularity))
-            if plant_index == len(powerplants)-1:
-                significant_production_steps[plant_index] = [0, pmin_adjusted]
-            else:
-                for element in significant_production_steps[plant_index+1]:
-                    significant_production_steps[plant_index].extend([element, element + pmin_adjusted])
-            significant_production_steps[plant_index] = list(set(significant_production_steps[plant_index]))
-            significant_production_steps[plant_index].sort()
-            significant_production_steps[plant_index].reverse()
-        return significant_production_steps
+    def _get_significant_production_bitsets(powerplants, granularity, limit):
+        # bit k of layer i is set when k units are a sum of pmins of plants i..n-1
+        pmins_adjusted = [int(math.ceil(round(powerplant.pmin / granularity, 6))) for powerplant in powerplants]
+        return subset_sum_layers(pmins_adjusted, limit)
 
     @staticmethod
-    def _sort_powerplants_by_cost(power_grid: PowerGridSchema):
-        return [powerplant for powerplant in sorted(
-            power_grid.powerplants,
-            key=lambda p: PlantService._get_unit_cost(p, power_grid.fuels)
-        )]
+    def _get_significant_production_steps(powerplants, granularity, limit=None):
+        if limit is None:
+            limit = sum(int(math.ceil(round(powerplant.pmin / granularity, 6))) for powerplant in powerplants)
+        bitsets = PlantService._get_significant_production_bitsets(powerplants, granularity, limit)
+        return [list(iter_bits_descending(bitset)) for bitset in bitsets]
 
     @staticmethod
-    def simple_production_plan(power_grid: PowerGridSchema):
-
-        granularity = 0.1  
-        LOAD = int(round(power_grid.load / granularity))
-        n = len(power_grid.powerplants)
+    def _sort_powerplants_by_cost(power_grid: PowerGridSchema, fleet: PreparedFleet = None):
+        fleet = fleet if fleet is not None else PreparedFleet(power_grid.powerplants)
+        order = fleet.columns.merit_order(fleet.columns.unit_costs(power_grid.fuels))
+        return [fleet.powerplants[index] for index in order.tolist()]
 
-        production_costs = {0: 0}
+    @staticmethod
+    def _get_plan(powerplants_greedy, alloc, granularity):
+        # convert allocations back to MW and produce result list
+        result = []
+        for fac, mw_units in zip(powerplants_greedy, alloc):
+            production =round(mw_units * granularity, 1)
+            result.append({"name": fac.name, "p": production})
 
-        prevs = [] # list of dicts to reconstruct allocation
+        return result
 
-        powerplants_greedy = PlantService()._sort_powerplants_by_cost(power_grid)
+    @staticmethod
+    def _get_reachable_levels(bounds, limit):
+        # bit k is set when k units can be produced with every plant off or within [pmin, pmax]
+        reachable = 1
+        for min_units, max_units in bounds:
+            if min_units <= max_units and max_units > 0:
+                reachable |= interval_shift(reachable, max(min_units, 1), max_units, limit)
+        return reachable
 
-        significant_production_steps = PlantService()._get_significant_production_steps(powerplants_greedy, granularity)
+    @staticmethod
+    def _check_feasibility(powerplants, fuels, granularity, LOAD, columns=None):
+        # presolve check: fails before any DP runs, with the nearest loads that can be served
+        columns = columns if columns is not None else FleetColumns(powerplants)
+        # stepping a plan above the load down one unit or one plant at a time never skips more than the
+        # largest pmin: the nearest feasible load above lies within it, whatever the pmaxs of the fleet
+        capacity = int(math.floor(round(sum(columns.capacities(fuels)) / granularity, 6)))
+        limit = max(LOAD, min(capacity, LOAD + int(columns.units(granularity)[0].max(initial=0)) + 1))
+        reachable = PlantService._get_reachable_levels(columns.bounds(fuels, granularity, limit), limit)
+        if reachable >> LOAD & 1:
+            return reachable
+        below, above = (
+            None if level is None else round(level * granularity, 1)
+            for level in nearest_levels(reachable, LOAD)
+        )
+        raise UnfeasibleException(
+            "No feasible solution for the requested load. "
+            f"Nearest feasible loads: {below} MW below, "
+            + (f"{above} MW above." if above is not None else "none above (total capacity exceeded)."),
+            nearest_loads=(below, above),
+        )
 
-        #For each powerplant, calculate possible productions
-        for index, powerplant in enumerate(powerplants_greedy):
+    @staticmethod
+    def _dict_production_alloc(bounds, unit_costs, LOAD, significant_production_bitsets=None, deadline=None):
+        # bounds and unit costs of the plants in merit order, as DispatchColumns gives them
+        n = len(bounds)
 
-            unit_cost = PlantService._get_unit_cost(powerplant, power_grid.fuels)
+        # cost of every level, inf where unreachable, and the reachable levels in increasing order
+        production_costs = array("d", [math.inf]) * (LOAD + 1)
+        production_costs[0] = 0.0
+        reached = array("i", [0])
 
-            # If wind turbine, pmax depends on wind
-            if powerplant.type == "windturbine":
-                max_units = powerplant.pmax * getattr(power_grid.fuels, "windturbine") / 100.0
-            else:
-                max_units = powerplant.pmax
+        # per layer, the levels it improved and their predecessors, as sorted int arrays
+        prevs = []
 
-            min_units = int(math.ceil(powerplant.pmin / granularity)) if powerplant.pmin is not None else 0
+        if significant_production_bitsets is None:
+            significant_production_bitsets = subset_sum_layers([min_units for min_units, _ in bounds], LOAD)
 
-            max_units = int(math.floor(max_units / granularity)) if max_units is not None else LOAD
+        #For each powerplant, calculate possible productions
+        for index, ((min_units, max_prod_units), unit_cost) in enumerate(zip(bounds, unit_costs)):
+            check_deadline(deadline)
 
-            # maximum producible units for this plant (bounded by total demand D)
-            max_prod_units = LOAD if max_units is None else min(max_units, LOAD)
+            if min_units > max_prod_units or max_prod_units == 0:
+                prevs.append((array("i"), array("i")))
+                continue
 
-            # get significant stopping points for this plant
-            stopping_points = []
-            if min_units <= max_prod_units:
-                stopping_points.extend([LOAD-step for step in significant_production_steps[index] if max_prod_units-step >= min_units])
+            # some optimal plan has at most one plant strictly between its bounds, the later
+            # committed plants at their pmin: that plant stops where the pmins left make the load
+            stopping_points = [LOAD - step for step in iter_bits_descending(significant_production_bitsets[index])]
 
-            # new layer starts from no production from this plant
-            prev = {key:key for key in production_costs}
-            new_production_costs = production_costs.copy()
+            # best cost and previous production of every level after this plant, -1 where it does not improve
+            layer_costs = array("d", production_costs)
+            predecessors = array("i", [-1]) * (LOAD + 1)
 
-            # for each previous production, try to add production from this plant based on significant production stopping points
-            for production in production_costs:
-                for stopping_point in stopping_points:
-                    if stopping_point < production:
-                        continue
-                    if production + max_prod_units < stopping_point:
-                        new_production = production + max_prod_units
-                    else:
-                        new_production = stopping_point
+            # for each previous production, try the bounds of this plant and the stopping points between them
+            for production in reached:
+                production_cost = production_costs[production]
+                lowest = production + max(min_units, 1)
+                highest = min(production + max_prod_units, LOAD)
+                if lowest > highest:
+                    continue
+                first = bisect_left(stopping_points, lowest)
+                last = bisect_left(stopping_points, highest + 1)
+                for new_production in {lowest, highest, *stopping_points[first:last]}:
+                    cost = production_cost + (new_production-production) * unit_cost
+                    if cost < layer_costs[new_production]:
+                        layer_costs[new_production] = cost
+                        predecessors[new_production] = production
 
-                    cost = production_costs[production] + (new_production-production) * unit_cost
-                    if new_production not in production_costs or cost < production_costs[new_production]:
-                        new_production_costs[new_production] = cost
-                        prev[new_production] = production
-
-            production_costs = new_production_costs
-            prevs.append(prev)
+            # only the improved levels are stored for backtracking
+            levels = array("i", (level for level in range(LOAD + 1) if predecessors[level] >= 0))
+            prevs.append((levels, array("i", (predecessors[level] for level in levels))))
+            production_costs = layer_costs
+            reached = array("i", (level for level in range(LOAD + 1) if production_costs[level] < math.inf))
 
         # if target load has not been reached, raise exception
-        if LOAD not in production_costs:
+        if production_costs[LOAD] == math.inf:
             raise UnfeasibleException("No feasible solution for the requested load.")
 
-        # reconstruct allocation by backtracking through prevs
+        # reconstruct allocation by backtracking through prevs, a level a layer did not improve kept its production
         alloc = [0] * n
         acc_load = LOAD
         for i in range(n - 1, -1, -1):
-            stopping_point = prevs[i][acc_load]
-            units_produced = acc_load - stopping_point
-            alloc[i] = units_produced
-            acc_load -= units_produced
+            levels, predecessors = prevs[i]
+            position = bisect_left(levels, acc_load)
+            if position < len(levels) and levels[position] == acc_load:
+                stopping_point = predecessors[position]
+                alloc[i] = acc_load - stopping_point
+                acc_load = stopping_point
 
-        # convert allocations back to MW and produce result list
-        result = []
-        for fac, mw_units in zip(powerplants_greedy, alloc):
-            production =round(mw_units * granularity, 1)
-            result.append({"name": fac.name, "p": production})
+        return alloc
+
+    @staticmethod
+    def _solve(fleet: PreparedFleet, load: float, fuels: FuelSchema, engine: str, granularity: float, deadline: float = None):
+        # plan, engine that ran and why it was chosen
+
+        # the schemas reject a load off a resolution the client chose, a load without one is rounded to 0.1 MW
+        LOAD = int(round(load / granularity))
+
+        fleet = warm(fleet)
+        reachable = PlantService._check_feasibility(fleet.powerplants, fuels, granularity, LOAD, fleet.columns)
+        dispatch = fleet.dispatch(fuels, granularity)
+        order = dispatch.order
+        powerplants_greedy = [fleet.powerplants[index] for index in order]
+
+        if engine not in ("auto", *solver_registry.ENGINE_NAMES):
+            raise ValueError(f"Unknown solver engine: {engine}")
+        reason = "requested"
+        plant_groups = None
+        if engine != "dict":
+            plant_groups = dispatch.plant_groups(LOAD)
+        if engine == "auto":
+            complexity = solver_registry.estimate(fleet.powerplants, plant_groups.layers, reachable, LOAD)
+            engine, reason = solver_registry.select(complexity)
+
+        if engine == "dict":
+            significant_production_bitsets = fleet.significant_bitsets(order, granularity, LOAD)
+            alloc = PlantService._dict_production_alloc(dispatch.bounds(LOAD), dispatch.unit_costs.tolist(), LOAD, significant_production_bitsets, deadline)
+        elif engine == "numpy":
+            # the DP layers are kept per fleet and fuels, a nearby load only backtracks or extends them
+            key = warm_start.fingerprint(powerplants_greedy, fuels, granularity)
+            layers_at = lambda limit: dispatch.plant_groups(limit).layers
+            alloc = plant_groups.expand(warm_start.solve(key, layers_at, LOAD, deadline))
+        elif engine == "fixed":
+            layers = fixed_point_engine.scale_layers(plant_groups.layers, granularity)
+            alloc = plant_groups.expand(fixed_point_engine.solve(layers, LOAD, deadline))
+        else:
+            solver = solver_registry.LAYER_ENGINES[engine]
+            alloc = plant_groups.expand(solver.solve(plant_groups.layers, LOAD, deadline))
+
+        return PlantService._get_plan(powerplants_greedy, alloc, granularity), engine, reason
+
+    @staticmethod
+    def prepared_production_plan(fleet: PreparedFleet, load: float, fuels: FuelSchema, engine: str = "dict", granularity: float = 0.1, deadline: float = None):
+        return PlantService._solve(fleet, load, fuels, engine, granularity, deadline)[0]
+
+    @staticmethod
+    def selected_production_plan(fleet: PreparedFleet, load: float, fuels: FuelSchema, engine: str = "auto", granularity: float = 0.1):
+        # same as prepared_production_plan, along with the engine that ran and why
+        plan, engine, reason = PlantService._solve(fleet, load, fuels, engine, granularity)
+        return {"plan": plan, "engine": engine, "reason": reason}
+
+    @staticmethod
+    def simple_production_plan(power_grid: PowerGridSchema, engine: str = "dict"):
+        fleet = PreparedFleet(power_grid.powerplants)
+        return PlantService.prepared_production_plan(fleet, power_grid.load, power_grid.fuels, engine, power_grid.resolution)
+
+    @staticmethod
+    def _greedy_alloc(bounds, LOAD):
+        # merit order fill; a plant whose pmin exceeds the residual is made room for by
+        # backing off the most expensive committed plants, down to their own pmin
+        alloc = [0] * len(bounds)
+        residual = LOAD
+        for index, (min_units, max_units) in enumerate(bounds):
+            if residual == 0:
+                break
+            if min_units > max_units or max_units == 0:
+                continue
+            if residual < min_units:
+                need = min_units - residual
+                slack = sum(alloc[i] - bounds[i][0] for i in range(index) if alloc[i])
+                if slack < need:
+                    continue
+                for i in range(index - 1, -1, -1):
+                    if alloc[i] == 0:
+                        continue
+                    back_off = min(alloc[i] - bounds[i][0], need)
+                    alloc[i] -= back_off
+                    need -= back_off
+                    if need == 0:
+                        break
+                residual = min_units
+            alloc[index] = min(max_units, residual)
+            residual -= alloc[index]
+        return alloc if residual == 0 else None
+
+    @staticmethod
+    def _lp_lower_bound(bounds, unit_costs, LOAD):
+        # relaxing the on/off decision lets every plant run anywhere in [0, pmax]: merit order fill
+        cost = 0.0
+        residual = LOAD
+        for (_, max_units), unit_cost in zip(bounds, unit_costs):
+            units = min(max_units, residual)
+            cost += units * unit_cost
+            residual -= units
+        return cost
+
+    @staticmethod
+    def anytime_production_plan(power_grid: PowerGridSchema, engine: str = "dict", deadline: float = None):
+        # a greedy plan and a lower bound first, then the engine until the deadline
+        granularity = power_grid.resolution
+        LOAD = int(round(power_grid.load / granularity))
+        fleet = PreparedFleet(power_grid.powerplants)
+        PlantService._check_feasibility(fleet.powerplants, power_grid.fuels, granularity, LOAD, fleet.columns)
+
+        dispatch = fleet.dispatch(power_grid.fuels, granularity)
+        powerplants_greedy = [fleet.powerplants[index] for index in dispatch.order]
+        bounds = dispatch.bounds(LOAD)
+        unit_costs = dispatch.unit_costs.tolist()
+        lower_bound = PlantService._lp_lower_bound(bounds, unit_costs, LOAD)
+        tolerance = 1e-9 * max(1.0, lower_bound)
+
+        plans = []
+        greedy = PlantService._greedy_alloc(bounds, LOAD)
+        if greedy is not None:
+            plans.append((sum(units * unit_cost for units, unit_cost in zip(greedy, unit_costs)), greedy))
+
+        proven = False
+        reason = "greedy plan meets the lower bound"
+        if not plans or plans[0][0] > lower_bound + tolerance:
+            try:
+                plan, engine, reason = PlantService._solve(fleet, power_grid.load, power_grid.fuels, engine, granularity, deadline)
+                alloc = [int(round(entry["p"] / granularity)) for entry in plan]
+                plans.append((sum(units * unit_cost for units, unit_cost in zip(alloc, unit_costs)), alloc))
+                proven = engine in solver_registry.EXACT_ENGINES
+            except DeadlineExceeded:
+                if not plans:
+                    raise SolverTimeoutException("No feasible plan could be found before the deadline.")
+                engine, reason = "greedy", "deadline reached before the engine finished"
+        else:
+            engine = "greedy"
+
+        cost, alloc = min(plans, key=lambda entry: entry[0])
+        return {
+            "plan": PlantService._get_plan(powerplants_greedy, alloc, granularity),
+            "lower_bound": round(lower_bound * granularity, 2),
+            "optimal": proven or cost <= lower_bound + tolerance,
+            "engine": engine,
+            "reason": reason,
+        }
+
+    @staticmethod
+    def batch_production_plan(fleet: PreparedFleet, scenarios: list[ScenarioSchema], engine: str = "dict"):
+        # one entry per scenario, in order; a failing scenario does not fail the others
+        results = []
+        for scenario in scenarios:
+            try:
+                plan = PlantService.prepared_production_plan(fleet, scenario.load, scenario.fuels, engine)
+                results.append({"status_code": status.HTTP_200_OK, "plan": plan})
+            except ApiException as exc:
+                results.append(exc.content())
+        return results
+
+    @staticmethod
+    def sweep_production_plans(fleet: PreparedFleet, load: float, scenarios: list, granularity: float = 0.1):
+        # scenarios are (index, fuels, merit order, unit costs in that order), same-order scenarios adjacent;
+        # one entry per scenario, in order, a failing scenario does not fail the others
+        LOAD = int(round(load / granularity))
+        fleet = warm(fleet)
+        results = []
+        feasibility_by_wind = {}
+        previous_order = incumbent = None
+        for index, fuels, order, unit_costs in scenarios:
+            dispatch = fleet.columns.dispatch(fuels, granularity, order, unit_costs)
+            if order != previous_order:
+                powerplants_greedy = [fleet.powerplants[plant] for plant in order]
+                groups = dispatch.groups()
+                previous_order, incumbent = order, None
+            try:
+                # only the wind capacity changes the reachable levels
+                if fuels.windturbine not in feasibility_by_wind:
+                    try:
+                        feasibility_by_wind[fuels.windturbine] = PlantService._check_feasibility(fleet.powerplants, fuels, granularity, LOAD, fleet.columns)
+                    except UnfeasibleException as exc:
+                        feasibility_by_wind[fuels.windturbine] = exc
+                reachable = feasibility_by_wind[fuels.windturbine]
+                if isinstance(reachable, UnfeasibleException):
+                    raise reachable
+
+                plant_groups = PlantGroups(dispatch.bounds(LOAD), unit_costs, groups, LOAD)
+                complexity = solver_registry.estimate(fleet.powerplants, plant_groups.layers, reachable, LOAD)
+                engine, _ = solver_registry.select(complexity)
+                if engine == "bnb":
+                    # the previous commitment of the same merit order is the first incumbent
+                    group_alloc = bnb_engine.solve(plant_groups.layers, LOAD, incumbent=incumbent)
+                    incumbent = group_alloc
+                else:
+                    group_alloc = solver_registry.LAYER_ENGINES[engine].solve(plant_groups.layers, LOAD)
+                plan = PlantService._get_plan(powerplants_greedy, plant_groups.expand(group_alloc), granularity)
+                results.append({"index": index, "status_code": status.HTTP_200_OK, "plan": plan, "engine": engine})
+            except ApiException as exc:
+                results.append({"index": index, **exc.content()})
+        return results
+
+    @staticmethod
+    def supply_curve(fleet: PreparedFleet, fuels: FuelSchema, limit: float):
+        # one dense DP pass gives the minimum cost of every level up to the limit
+        granularity = 0.1
+        LIMIT = int(round(limit / granularity))
+
+        dispatch = fleet.dispatch(fuels, granularity)
+        powerplants_greedy = [fleet.powerplants[index] for index in dispatch.order]
+
+        plant_groups = dispatch.plant_groups(LIMIT)
+        costs, predecessors = numpy_engine.solve_layers(plant_groups.layers, LIMIT)
+        return powerplants_greedy, SupplyCurve(granularity, costs, predecessors, plant_groups)
+
+    @staticmethod
+    def supply_curve_plan(curve_request: SupplyCurveRequestSchema):
+        fleet = PreparedFleet(curve_request.powerplants)
+        stop = curve_request.stop
+        if stop is None:
+            stop = sum(fleet.columns.capacities(curve_request.fuels))
+        powerplants_greedy, curve = PlantService.supply_curve(fleet, curve_request.fuels, max([stop, *curve_request.plans_at]))
+
+        # allocations are backtracked from the same solve, only for the requested levels
+        plans = []
+        for load in curve_request.plans_at:
+            plan = None
+            if curve.is_reachable(load):
+                plan = PlantService._get_plan(powerplants_greedy, curve.allocation(load), curve.granularity)
+            plans.append({"load": load, "plan": plan})
+        return {
+            "points": curve.points(curve_request.start, stop, curve_request.step),
+            "plans": plans,
+        }
+
+    @staticmethod
+    def pareto_front(pareto_request: ParetoRequestSchema, deadline: float = None):
+        # one DP pass whose levels hold fronts of (fuel cost, CO2) points instead of a single cost
+        granularity = pareto_request.resolution
+        fuels = pareto_request.fuels
+        LOAD = int(round(pareto_request.load / granularity))
+        fleet = PreparedFleet(pareto_request.powerplants)
+        PlantService._check_feasibility(fleet.powerplants, fuels, granularity, LOAD, fleet.columns)
+
+        dispatch = fleet.dispatch(fuels, granularity)
+        powerplants_greedy = [fleet.powerplants[index] for index in dispatch.order]
+        plant_groups = dispatch.plant_groups(LOAD)
+        fuel_costs = fleet.columns.fuel_cost_matrix([fuels])[0][dispatch.order]
+        emissions = fleet.columns.emissions[dispatch.order]
+        layers = [
+            (intervals, float(fuel_costs[group[0]]), float(emissions[group[0]]))
+            for (intervals, _), group in zip(plant_groups.layers, plant_groups.groups)
+        ]
 
-        return result
\ No newline at end of file
+        try:
+            front = pareto.solve(layers, LOAD, pareto_request.max_points, deadline)
+        except DeadlineExceeded:
+            raise SolverTimeoutException("The Pareto front could not be computed before the deadline.")
+        points = []
+        for cost, co2, group_alloc in front:
+            cost, co2 = cost * granularity, co2 * granularity
+            points.append({
+                "cost": round(cost, 2),
+                "co2": round(co2, 3),
+                "total_cost": round(cost + co2 * fuels.co2, 2),
+                "plan": PlantService._get_plan(powerplants_greedy, plant_groups.expand(group_alloc), granularity),
+            })
+        return {"points": points}
@@ -0,0 +1,67 @@
+"""
+Fuel-independent precomputation for a list of powerplants.
+
+Requests that share a fleet (batch entries, registered fleets) build one
+``PreparedFleet`` and reuse it for every load/fuel combination:
+
+- the plant attributes are held as columns (``FleetColumns``), converted to
+  units once per granularity, so the merit order, bounds and unit costs of
+  a request are array operations;
+- the significant production step bitsets only depend on the merit order and
+  the granularity, so they are cached per order and recomputed only when a
+  larger load than the cached one is requested.
+
+Fleets registered through ``/fleets`` carry a ``key`` (fleet id and
+version). Solves run in worker processes, which receive a pickled copy
+without the caches; ``warm`` swaps that copy for the one the worker already
+holds for the same key, so the caches stay warm across requests until the
+fleet is modified.
+"""
+from collections import OrderedDict
+
+from services.fleet_columns import FleetColumns
+from services.reachability import subset_sum_layers
+
+WARM_FLEETS_PER_PROCESS = 64
+
+_warm_fleets = OrderedDict()
+
+
+def warm(fleet):
+    """The copy of ``fleet`` already prepared in this process, if it has a key."""
+    if fleet.key is None:
+        return fleet
+    cached = _warm_fleets.get(fleet.key)
+    if cached is None:
+        cached = _warm_fleets[fleet.key] = fleet
+        while len(_warm_fleets) > WARM_FLEETS_PER_PROCESS:
+            _warm_fleets.popitem(last=False)
+    _warm_fleets.move_to_end(fleet.key)
+    return cached
+
+
+class PreparedFleet():
+
+    def __init__(self, powerplants, key=None):
+        self.key = key
+        self.powerplants = list(powerplants)
+        self.columns = FleetColumns(self.powerplants)
+        self._bitsets = {}
+
+    def dispatch(self, fuels, granularity):
+        """``DispatchColumns`` of the fleet in merit order under ``fuels``."""
+        return self.columns.dispatch(fuels, granularity)
+
+    def significant_bitsets(self, order, granularity, limit):
+        """Subset-sum bitsets of the pmins of ``order[i:]`` for every ``i``, covering ``0..limit``."""
+        key = (tuple(order), granularity)
+        cached = self._bitsets.get(key)
+        if cached is None or cached[0] < limit:
+            pmins_adjusted = self.columns.units(granularity)[0][list(order)].tolist()
+            cached = (limit, subset_sum_layers(pmins_adjusted, limit))
+            self._bitsets[key] = cached
+        return cached[1]
+
+    def __getstate__(self):
+        # caches are rebuilt (or found warm) in the receiving process
+        return dict(self.__dict__, _bitsets={})
@@ -0,0 +1,48 @@
+"""
+Presolve of flexible layers.
+
+A layer that can produce any amount between 0 and its capacity (pmin 0, as
+wind turbines usually are) never restricts the levels the other layers can
+reach. Such layers are taken out of the DP and merged into one merit-order
+tail: filling them cheapest first gives the minimum cost of any residual
+load, a convex piecewise-linear function. The DP then only runs over the
+layers with a real minimum output, and the load is split between the DP
+level and the tail where their summed cost is lowest.
+
+Dispatching the zero-cost capacity first and solving the residual is not
+enough on its own: a wind turbine at full output can leave a residual below
+the pmin of every other plant.
+"""
+
+
+def is_flexible(intervals):
+    """Whether a layer can produce any amount from 0 up to its capacity."""
+    return not intervals or (len(intervals) == 1 and intervals[0][0] <= 1)
+
+
+class Presolve():
+
+    def __init__(self, layers):
+        self.size = len(layers)
+        self.constrained = [index for index, (intervals, _) in enumerate(layers) if not is_flexible(intervals)]
+        self.layers = [layers[index] for index in self.constrained]
+        # flexible layers cheapest first, as (index, capacity, unit_cost)
+        flexible = [index for index, (intervals, _) in enumerate(layers) if is_flexible(intervals)]
+        self.tail = sorted(
+            ((index, layers[index][0][0][1] if layers[index][0] else 0, layers[index][1]) for index in flexible),
+            key=lambda entry: entry[2],
+        )
+
+    def tail_segments(self):
+        """``(capacity, unit_cost)`` of every flexible layer, cheapest first."""
+        return [(capacity, unit_cost) for _, capacity, unit_cost in self.tail]
+
+    def expand(self, constrained_alloc, residual):
+        """Per-layer allocation from the DP allocation and the residual left to the tail."""
+        alloc = [0] * self.size
+        for index, units in zip(self.constrained, constrained_alloc):
+            alloc[index] = units
+        for index, capacity, _ in self.tail:
+            alloc[index] = min(capacity, residual)
+            residual -= alloc[index]
+        return alloc
@@ -0,0 +1,74 @@
+"""
+Bitset helpers for reachable production levels.
+
+A set of production levels (expressed in granularity units) is stored as a
+Python int: bit ``k`` is set when level ``k`` is reachable. Shifts and ORs on
+big ints run in C over machine words, so building the reachable set of a
+whole fleet stays polynomial in the load instead of exponential in the
+number of plants.
+"""
+
+
+def mask(limit):
+    """Bitset with every level in ``0..limit`` set."""
+    return (1 << (limit + 1)) - 1
+
+
+def subset_sum_layers(sizes, limit):
+    """
+    Build, for every index ``i``, the bitset of all subset sums of
+    ``sizes[i:]`` capped at ``limit``.
+
+    The layers share one running reachable set: each layer is the next one
+    shifted by its own size and ORed in, so no intermediate lists are built.
+    """
+    layers = [0] * len(sizes)
+    limit_mask = mask(limit)
+    reachable = 1
+    for index in reversed(range(len(sizes))):
+        # a zero size (pmin 0) adds no new level
+        if sizes[index]:
+            reachable = (reachable | (reachable << sizes[index])) & limit_mask
+        layers[index] = reachable
+    return layers
+
+
+def iter_bits_descending(bitset):
+    """Yield the set bits of ``bitset`` from the highest to the lowest."""
+    if bitset <= 0:
+        return
+    digits = bin(bitset)[2:]
+    top = len(digits) - 1
+    position = digits.find("1")
+    while position != -1:
+        yield top - position
+        position = digits.find("1", position + 1)
+
+
+def interval_shift(bitset, lo, hi, limit):
+    """
+    Levels reachable from ``bitset`` by adding any amount in ``[lo, hi]``,
+    capped at ``limit``.
+
+    The shifts by ``0..hi - lo`` are ORed by doubling, so a range of width
+    ``w`` costs O(log w) big-int operations instead of ``w``.
+    """
+    limit_mask = mask(limit)
+    width = hi - lo + 1
+    spread = bitset
+    covered = 1
+    while covered < width:
+        step = min(covered, width - covered)
+        spread = (spread | (spread << step)) & limit_mask
+        covered += step
+    return (spread << lo) & limit_mask
+
+
+def nearest_levels(bitset, level):
+    """Highest set bit at or below ``level`` and lowest set bit at or above it (``None`` when absent)."""
+    below = (bitset & mask(level)).bit_length() - 1
+    above = bitset >> level
+    return (
+        below if below >= 0 else None,
+        level + (above & -above).bit_length() - 1 if above else None,
+    )
@@ -0,0 +1,145 @@
+"""
+In-process cache of solved production plans.
+
+Entries are keyed on a hash of the normalized request, so the order of the
+powerplants and the formatting of numbers (``100`` vs ``100.0``) do not
+matter. The memory store is an LRU bounded in size, every entry expires after
+a TTL, and an optional SQLite file lets cached plans survive worker restarts.
+
+Settings are read from the environment:
+
+- ``RESULT_CACHE_SIZE``: entries kept (default: 1024, 0 disables the cache)
+- ``RESULT_CACHE_TTL_S``: seconds an entry stays valid (default: 300)
+- ``RESULT_CACHE_PATH``: SQLite file backing the cache (default: memory only)
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def canonical_key(power_grid, *options):
+    """SHA-256 of the request with normalized numbers and powerplants sorted."""
+    payload = _normalize(power_grid.model_dump())
+    if "powerplants" in payload:
+        payload["powerplants"].sort(key=lambda plant: json.dumps(plant, sort_keys=True))
+    payload["options"] = list(options)
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache():
+
+    def __init__(self, max_entries: int, ttl: float, path: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._connection = None
+        if path:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires_at REAL, accessed_at REAL, value TEXT)"
+            )
+            self._connection.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_entries=int(os.getenv("RESULT_CACHE_SIZE", 1024)),
+            ttl=float(os.getenv("RESULT_CACHE_TTL_S", 300)),
+            path=os.getenv("RESULT_CACHE_PATH"),
+        )
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= now:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            entry = self._load(key, now)
+            if entry is not None:
+                self._store(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        entry = (time.time() + self.ttl, value)
+        self._store(key, entry)
+        self._save(key, entry)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key, now):
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT expires_at, value FROM results WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self._connection.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        self._connection.commit()
+        return row[0], json.loads(row[1])
+
+    def _save(self, key, entry):
+        if self._connection is None:
+            return
+        now = time.time()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results (key, expires_at, accessed_at, value) VALUES (?, ?, ?, ?)",
+            (key, entry[0], now, json.dumps(entry[1])),
+        )
+        # same LRU bound on disk, expired rows first
+        self._connection.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        self._connection.execute(
+            "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY accessed_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._connection.commit()
@@ -0,0 +1,52 @@
+"""
+Coalescing of concurrent identical solves.
+
+When several requests with the same canonical key arrive while a solve for
+that key is in flight, only the first one (the leader) runs the solver; the
+others await its result or its exception. If the leader's client disconnects
+and its solve is cancelled, a waiter takes over and solves again, so one
+impatient client never fails the others. The key is forgotten as soon as the
+solve ends, so later requests go through the result cache as usual.
+"""
+import asyncio
+
+from exceptions.solver_cancelled_exception import SolverCancelledException
+
+
+class SingleFlight():
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._in_flight = {}
+
+    async def run(self, key, function):
+        """Await ``function()`` for ``key``, sharing one in-flight call between concurrent callers."""
+        shared = self._in_flight.get(key)
+        if shared is not None and not shared.done():
+            self.coalesced += 1
+            try:
+                # shield: a waiter that goes away must not cancel the leader's solve
+                return await asyncio.shield(shared)
+            except SolverCancelledException:
+                return await self.run(key, function)
+
+        self.leaders += 1
+        shared = asyncio.ensure_future(function())
+        self._in_flight[key] = shared
+        shared.add_done_callback(lambda _: self._forget(key, shared))
+        return await asyncio.shield(shared)
+
+    def _forget(self, key, shared):
+        # marks the outcome as retrieved even when every waiter has gone away
+        if not shared.cancelled():
+            shared.exception()
+        if self._in_flight.get(key) is shared:
+            del self._in_flight[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,126 @@
+"""
+Process pool running the CPU-bound solver off the event loop.
+
+The pool is started and stopped by the FastAPI lifespan (see ``main.py``) and
+the endpoints await ``SolverPool.run``. Jobs beyond ``max_workers`` wait in a
+queue of at most ``max_queue`` entries; further requests are rejected with a
+503 instead of piling up. A job still queued when its request times out or
+its client disconnects is cancelled; a job already running in a worker
+process cannot be interrupted and its result is discarded; it keeps
+counting against the queue limit until the worker is done with it.
+
+Each worker process has an executor of its own (a lane), so jobs can be
+routed. Warm fleets (``services.prepared_fleet.warm``) and warm DP states
+(``services.warm_start``) live in the process that built them: a job given
+an ``affinity`` (the key of its fleet) goes to the same lane as the previous
+jobs of that key, unless it holds more than ``AFFINITY_SLACK`` jobs more
+than the idlest lane. Jobs without affinity go to the least busy lane.
+
+Settings are read from the environment:
+
+- ``SOLVER_POOL_SIZE``: worker processes (default: CPU count)
+- ``SOLVER_MAX_QUEUE``: jobs allowed to wait for a worker (default: 32)
+- ``SOLVER_TIMEOUT_S``: seconds a request waits for its plan (default: 30)
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import os
+import threading
+
+from exceptions.solver_busy_exception import SolverBusyException
+from exceptions.solver_cancelled_exception import SolverCancelledException
+from exceptions.solver_timeout_exception import SolverTimeoutException
+
+DISCONNECT_POLL_INTERVAL_S = 0.1
+# jobs more than the idlest lane a job waits behind in the lane of its affinity key
+AFFINITY_SLACK = 1
+
+
+class SolverPool():
+
+    def __init__(self, max_workers: int, max_queue: int, timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executors = []
+        self._pending = 0
+        # jobs submitted to each lane and not finished yet
+        self._lane_pending = [0] * max_workers
+        # jobs are released from the executor's thread when they finish
+        self._pending_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_workers=int(os.getenv("SOLVER_POOL_SIZE", os.cpu_count() or 1)),
+            max_queue=int(os.getenv("SOLVER_MAX_QUEUE", 32)),
+            timeout=float(os.getenv("SOLVER_TIMEOUT_S", 30)),
+        )
+
+    @property
+    def pending(self):
+        return self._pending
+
+    @property
+    def lane_pending(self):
+        return list(self._lane_pending)
+
+    def start(self):
+        self._executors = [ProcessPoolExecutor(max_workers=1) for _ in range(self.max_workers)]
+
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executors = []
+
+    def _lane(self, affinity):
+        least = min(range(self.max_workers), key=lambda lane: self._lane_pending[lane])
+        if affinity is None:
+            return least
+        # the same key prefers the same lane, unless it would wait behind more jobs than elsewhere
+        preferred = hash(affinity) % self.max_workers
+        return preferred if self._lane_pending[preferred] <= self._lane_pending[least] + AFFINITY_SLACK else least
+
+    async def run(self, function, *args, request=None, affinity=None):
+        if not self._executors:
+            raise RuntimeError("Solver pool is not started.")
+        if self._pending >= self.max_workers + self.max_queue:
+            raise SolverBusyException("Solver queue is full, retry later.")
+
+        with self._pending_lock:
+            lane = self._lane(affinity)
+            self._pending += 1
+            self._lane_pending[lane] += 1
+        job = self._executors[lane].submit(function, *args)
+        # a job is pending until it leaves the executor, not when its caller stops waiting
+        job.add_done_callback(functools.partial(self._release, lane))
+        result = asyncio.wrap_future(job)
+        watchers = {result}
+        disconnect = None
+        if request is not None:
+            disconnect = asyncio.create_task(self._wait_for_disconnect(request))
+            watchers.add(disconnect)
+        try:
+            done, _ = await asyncio.wait(watchers, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if disconnect is not None:
+                disconnect.cancel()
+            # no-op once finished, otherwise drops the job if it is still queued
+            result.cancel()
+
+        if result in done:
+            return result.result()
+        if disconnect in done:
+            raise SolverCancelledException("Client disconnected before the plan was ready.")
+        raise SolverTimeoutException(f"No plan could be computed within {self.timeout} seconds.")
+
+    def _release(self, lane, job):
+        with self._pending_lock:
+            self._pending -= 1
+            self._lane_pending[lane] -= 1
+
+    @staticmethod
+    async def _wait_for_disconnect(request):
+        while not await request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_INTERVAL_S)
@@ -0,0 +1,80 @@
+"""
+Registry of production plan engines and automatic engine selection.
+
+Every engine but ``dict`` works on the layers of ``services.aggregation``
+and is looked up here by name. ``auto`` picks the engine expected to be the
+fastest among the exact ones from a complexity estimate computed after the
+feasibility precheck, so it costs no extra solve:
+
+- the dense DPs (``numpy``, ``deque``) cost one pass over ``0..LOAD`` per
+  group with a minimum output, whatever the fleet looks like;
+- branch-and-bound (``bnb``) ignores the load, but its search grows with the
+  number of commitments, and its relaxation bounds are loose when the
+  reachable set is sparse (rigid units whose sums leave gaps).
+
+``numpy`` is always faster than ``deque`` on the same work, so ``deque`` is
+only run on request, as is ``fixed``, the integer-cost ``numpy`` DP of
+``services.fixed_point_engine`` (its layers are scaled by the granularity
+first, so it is not looked up with the others).
+"""
+from collections import namedtuple
+import math
+
+from services import bnb_engine, deque_engine, multires_engine, numpy_engine
+from services.presolve import is_flexible
+
+LAYER_ENGINES = {
+    "numpy": numpy_engine,
+    "deque": deque_engine,
+    "multires": multires_engine,
+    "bnb": bnb_engine,
+}
+ENGINE_NAMES = ("dict", *LAYER_ENGINES, "fixed")
+# engines whose plan is a proven minimum cost
+EXACT_ENGINES = ("dict", "numpy", "deque", "bnb")
+
+# branch-and-bound is always chosen when there are at most 2 ** BNB_MAX_BITS commitments
+BNB_MAX_BITS = 12
+# above this many DP layer-levels, a dense reachable set makes branch-and-bound the faster choice
+DENSE_DP_WORK = 100_000
+BNB_MIN_DENSITY = 0.9
+
+Complexity = namedtuple(
+    "Complexity", ["plants", "distinct_pmins", "levels", "reachable", "committable", "commitment_bits"]
+)
+
+
+def estimate(powerplants, layers, reachable, LOAD):
+    """
+    Complexity of a request from its plants, its layers in merit order and
+    the bitset of reachable levels of the feasibility precheck.
+    """
+    committable = [intervals for intervals, _ in layers if not is_flexible(intervals)]
+    return Complexity(
+        plants=len(powerplants),
+        distinct_pmins=len({powerplant.pmin for powerplant in powerplants if powerplant.pmin > 0}),
+        levels=LOAD,
+        reachable=(reachable & ((1 << (LOAD + 1)) - 1)).bit_count(),
+        committable=len(committable),
+        commitment_bits=sum(math.log2(len(intervals) + 1) for intervals in committable),
+    )
+
+
+def select(complexity):
+    """Name of the fastest exact engine for ``complexity`` and the reason it was chosen."""
+    if complexity.commitment_bits <= BNB_MAX_BITS:
+        return "bnb", (
+            f"{complexity.committable} committable groups: at most {2 ** round(complexity.commitment_bits)} "
+            f"commitments to search, whatever the {complexity.levels} levels"
+        )
+    density = complexity.reachable / (complexity.levels + 1)
+    work = complexity.committable * complexity.levels
+    if work > DENSE_DP_WORK and density >= BNB_MIN_DENSITY:
+        return "bnb", (
+            f"{work} DP layer-levels but {density:.0%} of the levels reachable: "
+            "relaxation bounds are tight"
+        )
+    return "numpy", (
+        f"{complexity.committable} committable groups ({complexity.distinct_pmins} distinct pmins) "
+        f"over {complexity.levels} levels, {density:.0%} reachable"
+    )
@@ -0,0 +1,59 @@
+"""
+Supply cost curve of a fleet from a single dense DP pass.
+
+The NumPy engine already computes the minimum cost of every production level
+up to the requested limit; ``SupplyCurve`` keeps that cost array and the
+predecessor layers, so the curve can be sampled over any range and the
+allocation of any reachable level backtracked without solving again.
+"""
+import numpy as np
+
+from services.numpy_engine import backtrack
+
+
+class SupplyCurve():
+
+    def __init__(self, granularity, costs, predecessors, plant_groups):
+        self.granularity = granularity
+        self.costs = costs
+        self.predecessors = predecessors
+        self.plant_groups = plant_groups
+
+    @property
+    def limit(self):
+        return len(self.costs) - 1
+
+    def _units(self, load):
+        return int(round(load / self.granularity))
+
+    def is_reachable(self, load):
+        units = self._units(load)
+        return 0 <= units <= self.limit and bool(np.isfinite(self.costs[units]))
+
+    def cost(self, load):
+        # the DP accumulates unit_cost (euro/MWh) per granularity step
+        return float(self.costs[self._units(load)] * self.granularity)
+
+    def marginal_cost(self, load):
+        """Cost per MWh of the last granularity step below ``load``, None if that step is unreachable."""
+        units = self._units(load)
+        if units == 0 or not np.isfinite(self.costs[units - 1]):
+            return None
+        return float(self.costs[units] - self.costs[units - 1])
+
+    def allocation(self, load):
+        """Units produced by each plant, in merit order, at a reachable ``load``."""
+        return self.plant_groups.expand(backtrack(self.predecessors, self._units(load)))
+
+    def points(self, start, stop, step):
+        """Cost and marginal cost of the reachable levels in ``start..stop`` every ``step`` MW."""
+        start_units = self._units(start)
+        stop_units = min(self._units(stop), self.limit)
+        step_units = max(self._units(step), 1)
+        points = []
+        for units in range(start_units, stop_units + 1, step_units):
+            if not np.isfinite(self.costs[units]):
+                continue
+            load = round(units * self.granularity, 1)
+            points.append({"load": load, "cost": self.cost(load), "marginal_cost": self.marginal_cost(load)})
+        return points
@@ -0,0 +1,29 @@
+"""
+Fuel scenario sweeps over one fleet and one load.
+
+Risk runs solve the same fleet and load under many fuel price scenarios.
+The unit cost of every plant under every scenario is one matrix operation
+over the fleet columns, and so is the merit order of every scenario (a
+row-wise argsort). Scenarios that share a merit order share their plant
+groups and layer order, so they are solved back to back: the allocation of
+one scenario is a commitment that is still feasible, and usually still
+good, for the next, and seeds the branch-and-bound of the next one with a
+tight incumbent.
+"""
+import numpy as np
+
+
+def merit_order_groups(columns, costs):
+    """
+    ``(merit order, scenario indices)`` of every distinct merit order of
+    ``costs`` (``FleetColumns.unit_cost_matrix``), groups in order of first
+    scenario.
+    """
+    if costs.shape[1] == 0:
+        return [([], list(range(costs.shape[0])))]
+    orders = columns.merit_order(costs)
+    unique, first, inverse, counts = np.unique(
+        orders, axis=0, return_index=True, return_inverse=True, return_counts=True
+    )
+    members = np.split(np.argsort(inverse.ravel(), kind="stable"), np.cumsum(counts)[:-1])
+    return [(unique[group].tolist(), members[group].tolist()) for group in np.argsort(first)]
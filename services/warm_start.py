@@ -0,0 +1,109 @@
+"""
+Warm start of the dense DP for nearby loads.
+
+Real-time balancing asks for the same fleet and fuels every few seconds
+with a load a few MW away from the previous request. The DP of
+``services.numpy_engine`` computes the cost of every level up to the load
+anyway, so its layers answer any lower load by backtracking alone. The DP
+state is therefore kept per fleet and fuels (see ``fingerprint``), solved
+``HEADROOM`` above the requested load:
+
+- a load within the solved levels only combines the last layer with the
+  merit-order tail and backtracks, O(load + layers) instead of
+  O(load * layers);
+- a higher load extends every layer to the new levels only
+  (``numpy_engine.iter_layers`` from the first unsolved level), the solved
+  levels are not revisited.
+
+A state keeps the cost and predecessor arrays of every layer, 12 bytes per
+layer and level. States are evicted least recently used first once those
+of a process exceed ``WARM_STATE_BYTES``. Like prepared fleets, they live in
+the worker process that solved them; the solver pool routes the repeats of
+a fleet to that process (see ``services.solver_pool``).
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.numpy_engine import backtrack, iter_layers, tail_costs
+from services.presolve import Presolve
+
+# levels solved above the requested load, as a fraction of it
+HEADROOM = 0.1
+WARM_STATE_BYTES = 64 * 2 ** 20
+
+_states = OrderedDict()
+
+
+def fingerprint(powerplants, fuels, granularity):
+    """Key of the DP layers of ``powerplants``, in merit order, under ``fuels`` at ``granularity``."""
+    return (
+        granularity,
+        (fuels.gasfired, fuels.turbojet, fuels.co2, fuels.windturbine),
+        tuple((powerplant.type, powerplant.efficiency, powerplant.pmin, powerplant.pmax) for powerplant in powerplants),
+    )
+
+
+class WarmState():
+
+    def __init__(self):
+        self.limit = -1
+        self.presolve = None
+        self.layer_costs = []
+        self.predecessors = []
+        self.costs = None
+        self.tail_costs = None
+
+    @property
+    def nbytes(self):
+        return sum(costs.nbytes for costs in self.layer_costs) + sum(predecessor.nbytes for predecessor in self.predecessors)
+
+    def extend(self, layers, limit, deadline=None):
+        """Solve ``layers``, built for ``limit`` levels, for the levels up to ``limit`` not solved yet."""
+        presolve = Presolve(layers)
+        # a layer left without range by the previous cap (pmin above it) was in the tail: start over
+        start = self.limit + 1 if self.presolve is not None and presolve.constrained == self.presolve.constrained else 0
+        layer_costs, predecessors = [], []
+        for index, (costs, predecessor) in enumerate(iter_layers(presolve.layers, limit, start, self.layer_costs, deadline)):
+            layer_costs.append(costs)
+            predecessors.append(np.concatenate((self.predecessors[index], predecessor)) if start else predecessor)
+
+        # the state only changes once every layer is extended, a deadline leaves it as it was
+        self.limit, self.presolve = limit, presolve
+        self.layer_costs, self.predecessors = layer_costs, predecessors
+        if layer_costs:
+            self.costs = layer_costs[-1]
+        else:
+            self.costs = np.full(limit + 1, np.inf)
+            self.costs[0] = 0.0
+        self.tail_costs = tail_costs(presolve, limit)
+
+    def solve(self, load):
+        """Minimum cost allocation of ``load`` units, at most ``limit``, over the layers."""
+        totals = self.costs[:load + 1] + self.tail_costs[load::-1]
+        level = int(np.argmin(totals))
+        if not np.isfinite(totals[level]):
+            raise UnfeasibleException("No feasible solution for the requested load.")
+        return self.presolve.expand(backtrack(self.predecessors, level), load - level)
+
+
+def solve(key, layers_at, load, deadline=None):
+    """
+    Minimum cost allocation of ``load`` units over the layers kept under
+    ``key``. ``layers_at(limit)`` builds the layers for ``limit`` levels
+    when the state is created or extended.
+
+    Same result as ``numpy_engine.solve`` on the layers built for ``load``.
+    """
+    state = _states.get(key)
+    if state is None:
+        state = WarmState()
+    if load > state.limit:
+        limit = load + max(1, int(load * HEADROOM))
+        state.extend(layers_at(limit), limit, deadline)
+    _states[key] = state
+    _states.move_to_end(key)
+    while len(_states) > 1 and sum(kept.nbytes for kept in _states.values()) > WARM_STATE_BYTES:
+        _states.popitem(last=False)
+    return state.solve(load)
@@ -10,8 +10,9 @@ from schemas.power_plant_schema import PowerPlantSchema
 
 @pytest.fixture
 def client():
-    """Fixture providing a test client for the FastAPI application."""
-    return TestClient(app)
+    """Fixture providing a test client for the FastAPI application, with its lifespan running."""
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
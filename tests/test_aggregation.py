@@ -0,0 +1,74 @@
+"""
+Unit tests for the aggregation of identical plants.
+"""
+import pytest
+from schemas.power_grid_schema import PowerGridSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services.aggregation import committed_intervals, split_units
+from services.fleet_columns import FleetColumns
+from services.plant_service import PlantService
+
+
+def _total_cost(grid, plan):
+    """Fuel cost of ``plan`` for ``grid``."""
+    by_name = {powerplant.name: powerplant for powerplant in grid.powerplants}
+    return sum(PlantService._get_unit_cost(by_name[entry["name"]], grid.fuels) * entry["p"] for entry in plan)
+
+
+class TestAggregation:
+    """Tests for the grouping, interval and split helpers."""
+
+    @pytest.mark.unit
+    def test_identical_plants_keep_first_member_order(self, basic_gas_plant, basic_wind_plant, basic_fuel):
+        """Identical plants share a group and groups follow their first plant."""
+        twin = basic_gas_plant.model_copy(update={"name": "gas_twin"})
+        dispatch = FleetColumns([basic_wind_plant, basic_gas_plant, twin]).dispatch(basic_fuel, 0.1, order=range(3))
+
+        assert dispatch.groups() == [[0], [1, 2]]
+
+    @pytest.mark.unit
+    def test_committed_intervals_merge_once_ranges_overlap(self):
+        """Disjoint k-unit ranges stay apart until they overlap, then merge into one tail."""
+        assert committed_intervals(100, 150, 5, 10000) == [(100, 150), (200, 750)]
+        assert committed_intervals(100, 120, 3, 10000) == [(100, 120), (200, 240), (300, 360)]
+        assert committed_intervals(0, 50, 200, 120) == [(1, 120)]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_committed_intervals_without_capacity(self):
+        """A group that cannot produce has no interval."""
+        assert committed_intervals(0, 0, 4, 100) == []
+        assert committed_intervals(200, 300, 4, 100) == []
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("total", [0, 100, 130, 250, 299, 600])
+    def test_split_units_respects_bounds(self, total):
+        """The split sums to the total and every committed unit lies in [pmin, pmax]."""
+        units = split_units(total, 4, 150)
+
+        assert sum(units) == total
+        assert all(unit == 0 or 100 <= unit <= 150 for unit in units)
+
+
+class TestAggregatedSolve:
+    """Tests for the engines on fleets of identical plants."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("engine", ["numpy", "deque"])
+    @pytest.mark.parametrize("load", [55, 130, 400, 1500])
+    def test_many_identical_plants(self, basic_fuel, engine, load):
+        """Hundreds of identical units solve to the per-plant optimum, one entry per plant."""
+        powerplants = [
+            PowerPlantSchema(name=f"gas{i}", type="gasfired", efficiency=0.5, pmin=20, pmax=50) for i in range(200)
+        ] + [
+            PowerPlantSchema(name=f"jet{i}", type="turbojet", efficiency=0.3, pmin=0, pmax=10) for i in range(200)
+        ]
+        grid = PowerGridSchema(load=load, fuels=basic_fuel, powerplants=powerplants)
+
+        plan = PlantService.simple_production_plan(grid, engine=engine)
+
+        assert len(plan) == len(powerplants)
+        assert round(sum(entry["p"] for entry in plan), 1) == load
+        assert all(entry["p"] == 0 or 20 <= entry["p"] <= 50 for entry in plan if entry["name"].startswith("gas"))
+        # gas is the cheapest fuel and every load is at least one gas pmin
+        assert _total_cost(grid, plan) == pytest.approx(load * PlantService._get_unit_cost(powerplants[0], basic_fuel))
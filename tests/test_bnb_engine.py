@@ -0,0 +1,90 @@
+"""
+Unit tests for the branch-and-bound commitment engine.
+"""
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services import bnb_engine, numpy_engine
+from services.deadline import DeadlineExceeded
+from services.plant_service import PlantService
+from tests import test_scenarios
+from tests.test_numpy_engine import SCENARIOS
+
+
+class TestBnbEngine:
+    """Tests for the branch-and-bound engine of simple_production_plan."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_same_allocations_as_numpy_engine(self, scenario):
+        """Both engines give the same plan (or both fail) on the reference scenarios."""
+        grid = PowerGridSchema(**getattr(test_scenarios, scenario))
+        try:
+            expected = PlantService.simple_production_plan(grid, engine="numpy")
+        except UnfeasibleException:
+            with pytest.raises(UnfeasibleException):
+                PlantService.simple_production_plan(grid, engine="bnb")
+            return
+
+        assert PlantService.simple_production_plan(grid, engine="bnb") == expected
+
+    @pytest.mark.unit
+    def test_relaxation_fills_in_merit_order(self):
+        """Committed layers start at their bottom and the rest goes cheapest first."""
+        ranges = [(0, 30, 0.0), (50, 100, 20.0), (0, 40, 10.0)]
+
+        assert bnb_engine.relaxation(ranges, [0, 2, 1], 110) == (30 * 0.0 + 30 * 10.0 + 50 * 20.0, [30, 50, 30])
+        assert bnb_engine.relaxation(ranges, [0, 2, 1], 40) is None
+        assert bnb_engine.relaxation(ranges, [0, 2, 1], 200) is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("load", [35, 95, 180, 270])
+    def test_same_cost_as_numpy_engine(self, load):
+        """Commitments with disjoint group ranges are searched exactly."""
+        layers = [
+            ([(1, 30)], 0.0), ([(50, 100)], 20.0), ([(20, 40), (60, 80)], 45.0), ([(1, 60)], 60.0), ([(35, 35)], 25.0),
+        ]
+        cost = lambda alloc: sum(units * unit_cost for units, (_, unit_cost) in zip(alloc, layers))
+
+        assert cost(bnb_engine.solve(layers, load)) == pytest.approx(cost(numpy_engine.solve(layers, load)))
+
+    @pytest.mark.unit
+    def test_runtime_does_not_depend_on_load(self, basic_fuel):
+        """A few units serving tens of GW at 0.1 MW are solved without a dense DP."""
+        powerplants = [
+            PowerPlantSchema(name=f"gas{i}", type="gasfired", efficiency=0.3 + i / 50, pmin=2000 + 500 * i, pmax=9000 + 700 * i)
+            for i in range(6)
+        ]
+        grid = PowerGridSchema(load=41234.5, fuels=basic_fuel, powerplants=powerplants)
+
+        plan = PlantService.simple_production_plan(grid, engine="bnb")
+
+        assert round(sum(entry["p"] for entry in plan), 1) == 41234.5
+        assert all(entry["p"] == 0 or powerplant.pmin <= entry["p"] <= powerplant.pmax
+                   for entry, powerplant in zip(plan, PlantService._sort_powerplants_by_cost(grid)))
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_infeasible_load_and_deadline(self):
+        """Loads no commitment serves are rejected, and an expired deadline stops the search."""
+        with pytest.raises(UnfeasibleException):
+            bnb_engine.solve([([(1, 20)], 0.0), ([(100, 200)], 10.0)], 50)
+        with pytest.raises(DeadlineExceeded):
+            bnb_engine.solve([([(1, 20)], 0.0), ([(100, 200)], 10.0)], 150, deadline=0)
+
+    @pytest.mark.unit
+    def test_incumbent_keeps_the_search_exact(self):
+        """A commitment from other costs seeds the search without changing the optimum."""
+        layers = [
+            ([(1, 30)], 0.0), ([(50, 100)], 20.0), ([(20, 40), (60, 80)], 45.0), ([(1, 60)], 60.0), ([(35, 35)], 25.0),
+        ]
+        cost = lambda alloc: sum(units * unit_cost for units, (_, unit_cost) in zip(alloc, layers))
+        stale = [30, 0, 60, 0, 35]
+
+        assert bnb_engine.commitment_ranges(layers, stale) == [
+            (0, 30, 0.0), (0, 0, 20.0), (60, 80, 45.0), (0, 60, 60.0), (35, 35, 25.0)
+        ]
+        assert bnb_engine.commitment_ranges(layers, [30, 0, 50, 0, 0]) is None
+        for load in (95, 125, 180):
+            assert cost(bnb_engine.solve(layers, load, incumbent=stale)) == pytest.approx(cost(numpy_engine.solve(layers, load)))
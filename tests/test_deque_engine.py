@@ -0,0 +1,51 @@
+"""
+Unit tests for the monotone-deque production plan engine.
+"""
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from services import deque_engine, numpy_engine
+from services.plant_service import PlantService
+from tests import test_scenarios
+from tests.test_numpy_engine import SCENARIOS
+
+
+class TestDequeEngine:
+    """Tests for the sliding-window minimum engine of simple_production_plan."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_same_allocations_as_dict_engine(self, scenario):
+        """Both engines give the same plan (or both fail) on the reference scenarios."""
+        grid = PowerGridSchema(**getattr(test_scenarios, scenario))
+        try:
+            expected = PlantService.simple_production_plan(grid, engine="dict")
+        except UnfeasibleException:
+            with pytest.raises(UnfeasibleException):
+                PlantService.simple_production_plan(grid, engine="deque")
+            return
+
+        assert PlantService.simple_production_plan(grid, engine="deque") == expected
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("load", [1, 55, 120, 149, 230])
+    def test_same_allocations_as_numpy_engine(self, load):
+        """The deque and NumPy kernels solve the same dense DP."""
+        layers = [([(1, 30)], 0.0), ([(50, 100)], 20.0), ([(20, 40), (60, 80)], 45.0), ([(1, 60)], 60.0)]
+
+        assert deque_engine.solve(layers, load) == numpy_engine.solve(layers, load)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_solve_skips_unusable_layers(self):
+        """Layers with no capacity or pmin above pmax never produce."""
+        layers = [([], 0.0), ([(80, 60)], 10.0), ([(10, 50)], 30.0)]
+
+        assert deque_engine.solve(layers, 20) == [0, 0, 20]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_infeasible_load_raises_exception(self):
+        """A load between the reachable levels raises UnfeasibleException."""
+        with pytest.raises(UnfeasibleException):
+            deque_engine.solve([([(1, 20)], 0.0), ([(100, 200)], 10.0)], 50)
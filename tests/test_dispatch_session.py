@@ -0,0 +1,85 @@
+"""
+Unit tests for the state of real-time dispatch sessions.
+"""
+import asyncio
+
+import pytest
+from exceptions.invalid_update_exception import InvalidUpdateException
+from services.dispatch_session import DispatchSession
+
+
+FUELS = {"gas(euro/MWh)": 13.4, "kerosine(euro/MWh)": 50.8, "co2(euro/ton)": 20, "wind(%)": 60}
+
+
+class TestDispatchSession:
+    """Tests for the merge of partial updates and the choice of the update to solve."""
+
+    @pytest.mark.unit
+    def test_partial_updates_are_merged(self, basic_gas_plant):
+        """Updates only carry what changed, the rest of the previous state is kept."""
+        session = DispatchSession([basic_gas_plant])
+
+        assert session.update({"load": 300, "fuels": FUELS}) == 1
+        assert session.update({"fuels": {"wind(%)": 25}}) == 2
+        assert session.update({"load": 310}) == 3
+
+        assert session.load == 310
+        assert session.fuels == {**FUELS, "wind(%)": 25}
+        assert session.fleet.key[0].startswith("session-")
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize("update", [
+        {"load": 300},
+        {"fuels": FUELS},
+        {"load": -1, "fuels": FUELS},
+        {"load": 300, "fuels": {**FUELS, "wind(%)": 120}},
+        {"load": 300, "fuels": FUELS, "engine": "numpy"},
+    ])
+    def test_invalid_updates_are_rejected_whole(self, basic_gas_plant, update):
+        """An update that is invalid or leaves the load or a fuel unset changes nothing."""
+        session = DispatchSession([basic_gas_plant])
+
+        with pytest.raises(InvalidUpdateException) as exc_info:
+            session.update(update)
+
+        assert exc_info.value.status_code == 422
+        assert (session.seq, session.load, session.fuels) == (0, None, {})
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_load_off_the_resolution_is_rejected(self, basic_gas_plant):
+        """A load that is not a multiple of the session resolution is rejected, not rounded."""
+        session = DispatchSession([basic_gas_plant], resolution=5)
+        session.update({"load": 300, "fuels": FUELS})
+
+        with pytest.raises(InvalidUpdateException):
+            session.update({"load": 312})
+
+        assert (session.seq, session.load) == (1, 300)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_load_without_session_resolution_is_accepted(self, basic_gas_plant):
+        """Without a session resolution, a load off the 0.1 MW grid is accepted and rounded when solved."""
+        session = DispatchSession([basic_gas_plant])
+
+        assert session.update({"load": 300.05, "fuels": FUELS}) == 1
+        assert session.resolution == 0.1
+
+    @pytest.mark.unit
+    async def test_latest_skips_superseded_updates(self, basic_gas_plant):
+        """Updates merged while a solve runs are answered once, by the latest of them."""
+        session = DispatchSession([basic_gas_plant])
+        session.update({"load": 300, "fuels": FUELS})
+        assert (await session.latest())[:2] == (1, 300)
+
+        waiting = asyncio.ensure_future(session.latest())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        for load in (301, 302, 303):
+            session.update({"load": load})
+        seq, load, fuels = await waiting
+
+        assert (seq, load) == (4, 303)
+        assert fuels.windturbine == 60
@@ -1,7 +1,13 @@
 """
 Integration tests for the /productionplan endpoint.
 """
+import asyncio
+import json
+import time
+
 import pytest
+from exceptions.solver_timeout_exception import SolverTimeoutException
+from services.solver_registry import ENGINE_NAMES
 
 
 class TestProductionPlanEndpoint:
@@ -62,6 +68,7 @@ class TestProductionPlanEndpoint:
         assert response.status_code == 400
         data = response.json()
         assert "detail" in data or "message" in data or data.get("status_code") == 400
+        assert data["nearest_feasible_loads"] == {"below": 470.0, "above": None}
 
     @pytest.mark.integration
     @pytest.mark.edge_case
@@ -265,3 +272,518 @@ class TestProductionPlanEndpoint:
             assert len(item) == 2, "Response should only contain 'name' and 'p' fields"
             assert isinstance(item["name"], str)
             assert isinstance(item["p"], (int, float))
+
+    @pytest.mark.integration
+    def test_endpoint_with_numpy_engine(self, client, multi_plant_power_grid):
+        """The engine query parameter selects the NumPy engine with the same result."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        default_response = client.post("/productionplan", json=payload)
+        numpy_response = client.post("/productionplan?engine=numpy", json=payload)
+
+        assert numpy_response.status_code == 200
+        assert numpy_response.json() == default_response.json()
+
+    @pytest.mark.integration
+    def test_endpoint_with_multires_engine(self, client, multi_plant_power_grid):
+        """The engine query parameter selects the coarse-to-fine engine with the same result."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        default_response = client.post("/productionplan", json=payload)
+        multires_response = client.post("/productionplan?engine=multires", json=payload)
+
+        assert multires_response.status_code == 200
+        assert multires_response.json() == default_response.json()
+
+    @pytest.mark.integration
+    def test_endpoint_with_fixed_engine(self, client, multi_plant_power_grid):
+        """The engine query parameter selects the fixed-point engine, reported in the headers."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        default_response = client.post("/productionplan", json=payload)
+        fixed_response = client.post("/productionplan?engine=fixed", json=payload)
+
+        assert fixed_response.status_code == 200
+        assert fixed_response.headers["X-Solver-Engine"] == "fixed"
+        assert fixed_response.json() == default_response.json()
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_endpoint_with_unknown_engine(self, client, multi_plant_power_grid):
+        """An unknown engine query parameter is a validation error."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post("/productionplan?engine=unknown", json=payload)
+
+        assert response.status_code == 422
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("engine", ENGINE_NAMES)
+    def test_endpoint_accepts_every_registered_engine(self, client, multi_plant_power_grid, engine):
+        """Every engine of the registry can be forced, none is missing from the accepted values."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post(f"/productionplan?engine={engine}", json=payload)
+
+        assert response.status_code == 200
+        assert response.headers["X-Solver-Engine"] == engine
+
+    @pytest.mark.integration
+    def test_endpoint_reports_selected_engine(self, client, multi_plant_power_grid):
+        """Without an override an exact engine is selected and reported with its reason."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post("/productionplan", json=payload)
+
+        assert response.status_code == 200
+        assert response.headers["X-Solver-Engine"] in ("numpy", "deque", "bnb")
+        assert response.headers["X-Solver-Reason"]
+
+    @pytest.mark.integration
+    @pytest.mark.parametrize("query, headers, engine, reason", [
+        ("?engine=deque", {}, "deque", "forced by the engine query parameter"),
+        ("", {"X-Solver-Engine": "dict"}, "dict", "forced by the X-Solver-Engine header"),
+        ("?engine=numpy", {"X-Solver-Engine": "dict"}, "numpy", "forced by the engine query parameter"),
+    ])
+    def test_endpoint_engine_override(self, client, multi_plant_power_grid, query, headers, engine, reason):
+        """The query parameter, then the header, force the engine that runs."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post(f"/productionplan{query}", json=payload, headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["X-Solver-Engine"] == engine
+        assert response.headers["X-Solver-Reason"] == reason
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_endpoint_rejects_unknown_engine_header(self, client, multi_plant_power_grid):
+        """An unknown engine in the header is a validation error."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post("/productionplan", json=payload, headers={"X-Solver-Engine": "unknown"})
+
+        assert response.status_code == 422
+
+    @pytest.mark.integration
+    def test_endpoint_reports_resolution(self, client, multi_plant_power_grid):
+        """The resolution used is reported in a response header, 0.1 MW by default."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        default_response = client.post("/productionplan", json=payload)
+        coarse_response = client.post("/productionplan", json={**payload, "resolution": 5})
+
+        assert default_response.headers["X-Solver-Resolution"] == "0.1"
+        assert coarse_response.status_code == 200
+        assert coarse_response.headers["X-Solver-Resolution"] == "5.0"
+        assert all(plant["p"] % 5 == 0 for plant in coarse_response.json())
+
+    @pytest.mark.integration
+    def test_endpoint_with_deadline_reports_optimality(self, client, multi_plant_power_grid):
+        """A deadline adds the optimality flag and the lower bound to the response headers."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        default_response = client.post("/productionplan?engine=numpy", json=payload)
+        response = client.post("/productionplan?engine=numpy", json={**payload, "deadline_ms": 10000})
+
+        assert response.status_code == 200
+        assert response.json() == default_response.json()
+        assert response.headers["X-Solver-Optimal"] == "true"
+        assert float(response.headers["X-Solver-Lower-Bound"]) >= 0
+        assert "X-Solver-Optimal" not in default_response.headers
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_endpoint_rejects_invalid_deadline(self, client, multi_plant_power_grid):
+        """A deadline must be a positive number of milliseconds."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post("/productionplan", json={**payload, "deadline_ms": 0})
+
+        assert response.status_code == 422
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_endpoint_clamps_deadline_to_pool_timeout(self, client, multi_plant_power_grid, monkeypatch):
+        """A deadline past the pool timeout is cut short of it, so the plan found so far is returned instead of a 504."""
+        solver_pool = client.app.state.solver_pool
+        run = solver_pool.run
+        deadlines = []
+
+        async def record_deadline(function, power_grid, engine, deadline, request=None):
+            deadlines.append(deadline - time.time())
+            return await run(function, power_grid, engine, deadline, request=request)
+
+        monkeypatch.setattr(solver_pool, "timeout", 2.0)
+        monkeypatch.setattr(solver_pool, "run", record_deadline)
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post("/productionplan", json={**payload, "deadline_ms": 60000})
+
+        assert response.status_code == 200
+        assert 0 < deadlines[0] <= 1.8
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize("load, resolution, status_code", [(10, 5, 200), (13.2, 3.3, 200), (12, 5, 422), (12, 3.3, 422), (480.05, 0.1, 422)])
+    def test_endpoint_requires_load_multiple_of_resolution(self, client, multi_plant_power_grid, load, resolution, status_code):
+        """A load that is not a multiple of the resolution is a validation error instead of a plan for another load."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True, exclude={"resolution"})
+        response = client.post("/productionplan", json={**payload, "load": load, "resolution": resolution})
+
+        assert response.status_code == status_code
+        if status_code == 200:
+            assert round(sum(plant["p"] for plant in response.json()), 1) == load
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_endpoint_rounds_load_without_resolution(self, client, multi_plant_power_grid):
+        """Without a resolution, a load off the 0.1 MW grid is served to the nearest 0.1 MW, as before resolutions existed."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True, exclude={"resolution", "deadline_ms"})
+        response = client.post("/productionplan", json={**payload, "load": 480.05})
+
+        assert response.status_code == 200
+        assert round(sum(plant["p"] for plant in response.json()), 1) in (480.0, 480.1)
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize("resolution", [0.05, 0.25, 20])
+    def test_endpoint_rejects_invalid_resolution(self, client, multi_plant_power_grid, resolution):
+        """Resolutions outside 0.1-10 MW or not a multiple of 0.1 MW are validation errors."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        response = client.post("/productionplan", json={**payload, "resolution": resolution})
+
+        assert response.status_code == 422
+
+
+class TestBatchProductionPlanEndpoint:
+    """Tests for the /productionplan/batch endpoint."""
+
+    @pytest.mark.integration
+    def test_batch_endpoint_returns_entries_in_order(self, client, multi_plant_power_grid, basic_fuel):
+        """Every scenario gets its entry in request order, errors included."""
+        fuels = basic_fuel.model_dump(by_alias=True)
+        payload = {
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "scenarios": [{"load": load, "fuels": fuels} for load in (500, 2000, 300, 100)],
+        }
+        response = client.post("/productionplan/batch", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [entry["status_code"] for entry in data] == [200, 400, 200, 200]
+        assert data[1]["exception_case"] == "UnfeasibleException"
+        assert data[1]["plan"] is None
+        assert data[1]["nearest_feasible_loads"] == {"below": 530.0, "above": None}
+        for load, entry in zip((500, 2000, 300, 100), data):
+            if entry["plan"] is not None:
+                assert abs(sum(item["p"] for item in entry["plan"]) - load) < 1.0
+
+    @pytest.mark.integration
+    def test_batch_endpoint_streams_ndjson_on_request(self, client, multi_plant_power_grid, basic_fuel):
+        """With Accept: application/x-ndjson, the entries of the JSON response come one per line, in order."""
+        fuels = basic_fuel.model_dump(by_alias=True)
+        loads = [100 + 12.5 * i for i in range(40)] + [2000]
+        payload = {
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "scenarios": [{"load": load, "fuels": fuels} for load in loads],
+        }
+        expected = client.post("/productionplan/batch", json=payload).json()
+
+        response = client.post("/productionplan/batch", json=payload, headers={"Accept": "application/x-ndjson"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line) for line in response.text.splitlines()] == expected
+        assert expected[-1]["status_code"] == 400
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_batch_endpoint_fails_only_the_entries_of_a_failed_chunk(self, client, multi_plant_power_grid, basic_fuel, monkeypatch):
+        """A chunk the pool does not solve (here, timed out) gets an error entry per scenario, the other chunks their plans."""
+        solver_pool = client.app.state.solver_pool
+
+        async def run_or_time_out(function, *args, request=None):
+            if any(scenario.load == 300 for scenario in args[1]):
+                raise SolverTimeoutException("No plan could be computed within 30 seconds.")
+            return function(*args)
+
+        monkeypatch.setattr(solver_pool, "max_workers", 2)
+        monkeypatch.setattr(solver_pool, "run", run_or_time_out)
+        fuels = basic_fuel.model_dump(by_alias=True)
+        payload = {
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "scenarios": [{"load": load, "fuels": fuels} for load in (500, 400, 300, 100)],
+        }
+        response = client.post("/productionplan/batch", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [entry["status_code"] for entry in data] == [200, 200, 504, 504]
+        assert data[2]["exception_case"] == "SolverTimeoutException"
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_batch_endpoint_cancels_other_chunks_on_unexpected_error(self, client, multi_plant_power_grid, basic_fuel, monkeypatch):
+        """An error that is not an API error fails the batch and cancels the chunks still solving."""
+        solver_pool = client.app.state.solver_pool
+        cancelled = []
+
+        async def fail_or_wait(function, fleet, chunk, engine, request=None):
+            if any(scenario.load == 300 for scenario in chunk):
+                raise RuntimeError("worker crashed")
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(chunk)
+                raise
+
+        monkeypatch.setattr(solver_pool, "max_workers", 2)
+        monkeypatch.setattr(solver_pool, "run", fail_or_wait)
+        fuels = basic_fuel.model_dump(by_alias=True)
+        payload = {
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "scenarios": [{"load": load, "fuels": fuels} for load in (500, 400, 300, 100)],
+        }
+        with pytest.raises(RuntimeError):
+            client.post("/productionplan/batch", json=payload)
+
+        assert len(cancelled) == 1
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_batch_endpoint_requires_scenarios(self, client, multi_plant_power_grid):
+        """A batch without scenarios is a validation error."""
+        payload = {
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "scenarios": [],
+        }
+        response = client.post("/productionplan/batch", json=payload)
+
+        assert response.status_code == 422
+
+
+class TestSweepProductionPlanEndpoint:
+    """Tests for the /productionplan/sweep endpoint."""
+
+    @pytest.mark.integration
+    def test_sweep_endpoint_streams_one_line_per_scenario(self, client, multi_plant_power_grid, basic_fuel):
+        """Every fuel vector gets one NDJSON line with its index, errors included."""
+        fuels = [basic_fuel.model_dump(by_alias=True) for _ in range(3)]
+        fuels[1]["kerosine(euro/MWh)"] = 5.0
+        fuels[2]["wind(%)"] = 0
+        payload = {
+            "load": 480,
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "fuels": fuels,
+        }
+        response = client.post("/productionplan/sweep", json=payload)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        entries = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda entry: entry["index"])
+        assert [entry["index"] for entry in entries] == [0, 1, 2]
+        assert [entry["status_code"] for entry in entries] == [200, 200, 400]
+        assert entries[2]["exception_case"] == "UnfeasibleException"
+        for entry in entries[:2]:
+            assert round(sum(item["p"] for item in entry["plan"]), 1) == 480
+        expected = client.post("/productionplan", json={**payload, "fuels": fuels[0]}).json()
+        assert sorted(entries[0]["plan"], key=lambda item: item["name"]) == sorted(expected, key=lambda item: item["name"])
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_sweep_endpoint_requires_fuels(self, client, multi_plant_power_grid):
+        """A sweep without fuel vectors is a validation error."""
+        payload = {
+            "load": 480,
+            "powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants],
+            "fuels": [],
+        }
+        response = client.post("/productionplan/sweep", json=payload)
+
+        assert response.status_code == 422
+
+
+class TestDispatchWebSocket:
+    """Tests for the /ws/productionplan session."""
+
+    @pytest.mark.integration
+    def test_session_answers_the_latest_update(self, client, multi_plant_power_grid, basic_fuel):
+        """The fleet is sent once, updates are answered in order and superseded ones are skipped."""
+        with client.websocket_connect("/ws/productionplan?engine=numpy") as websocket:
+            websocket.send_json({"powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants]})
+            assert websocket.receive_json() == {"type": "ready", "powerplants": 3}
+
+            websocket.send_json({"load": 300, "fuels": basic_fuel.model_dump(by_alias=True)})
+            first = websocket.receive_json()
+            assert (first["type"], first["seq"], first["engine"]) == ("plan", 1, "numpy")
+            assert round(sum(entry["p"] for entry in first["plan"]), 1) == 300
+
+            for load in range(301, 311):
+                websocket.send_json({"load": load})
+            websocket.send_json({"fuels": {"wind(%)": 0}})
+            seqs = []
+            while not seqs or seqs[-1] < 12:
+                message = websocket.receive_json()
+                seqs.append(message["seq"])
+            assert seqs == sorted(set(seqs))
+            assert message["load"] == 310
+            assert {entry["name"]: entry["p"] for entry in message["plan"]}["windplant1"] == 0
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_session_rejects_invalid_messages(self, client, multi_plant_power_grid):
+        """Invalid updates are answered with an error and the session goes on; an invalid fleet closes it."""
+        with client.websocket_connect("/ws/productionplan") as websocket:
+            websocket.send_json({"powerplants": [plant.model_dump() for plant in multi_plant_power_grid.powerplants]})
+            websocket.receive_json()
+            websocket.send_json({"load": 300})
+            assert websocket.receive_json()["exception_case"] == "InvalidUpdateException"
+            websocket.send_text("not json")
+            assert websocket.receive_json()["status_code"] == 400
+
+        with client.websocket_connect("/ws/productionplan") as websocket:
+            websocket.send_json({"powerplants": []})
+            message = websocket.receive_json()
+            assert (message["type"], message["status_code"]) == ("error", 422)
+
+
+class TestSupplyCurveEndpoint:
+    """Tests for the /productionplan/curve endpoint."""
+
+    @pytest.mark.integration
+    def test_curve_endpoint_returns_points_and_plans(self, client, multi_plant_power_grid):
+        """The curve covers the requested range and plans are returned for the requested levels."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True, exclude={"load"})
+        payload.update({"start": 100, "stop": 500, "step": 100, "plans_at": [500]})
+        response = client.post("/productionplan/curve", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [point["load"] for point in data["points"]] == [100, 200, 300, 400, 500]
+        costs = [point["cost"] for point in data["points"]]
+        assert costs == sorted(costs)
+        plan = data["plans"][0]["plan"]
+        assert abs(sum(item["p"] for item in plan) - 500) < 1.0
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_curve_endpoint_rejects_small_step(self, client, multi_plant_power_grid):
+        """A step below the solver granularity is a validation error."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True, exclude={"load"})
+        payload["step"] = 0.01
+        response = client.post("/productionplan/curve", json=payload)
+
+        assert response.status_code == 422
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_curve_endpoint_caps_stop_at_capacity(self, client, multi_plant_power_grid):
+        """A stop far above the fleet's capacity solves and returns the curve up to the capacity only."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True, exclude={"load"})
+        payload.update({"stop": 1e9, "step": 100})
+        response = client.post("/productionplan/curve", json=payload)
+        capacity = payload["fuels"]["wind(%)"] / 100 * sum(p["pmax"] for p in payload["powerplants"] if p["type"] == "windturbine")
+        capacity += sum(p["pmax"] for p in payload["powerplants"] if p["type"] != "windturbine")
+
+        assert response.status_code == 200
+        assert max(point["load"] for point in response.json()["points"]) <= capacity
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_curve_endpoint_rejects_plans_above_capacity_or_too_many(self, client, multi_plant_power_grid):
+        """plans_at levels above the fleet's capacity, or too many of them, are validation errors."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True, exclude={"load"})
+        payload["plans_at"] = [1e9]
+        above_capacity = client.post("/productionplan/curve", json=payload)
+        payload["plans_at"] = [100] * 101
+        too_many = client.post("/productionplan/curve", json=payload)
+
+        assert above_capacity.status_code == 422
+        assert too_many.status_code == 422
+
+
+
+class TestParetoEndpoint:
+    """Tests for the /productionplan/pareto endpoint."""
+
+    @pytest.mark.integration
+    def test_pareto_endpoint_returns_front(self, client, multi_plant_power_grid):
+        """Points go from the cheapest to the least emitting plan, each serving the load."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        payload["max_points"] = 5
+        response = client.post("/productionplan/pareto", json=payload)
+
+        assert response.status_code == 200
+        points = response.json()["points"]
+        assert 1 <= len(points) <= 5
+        assert [point["cost"] for point in points] == sorted(point["cost"] for point in points)
+        assert [point["co2"] for point in points] == sorted((point["co2"] for point in points), reverse=True)
+        for point in points:
+            assert point["total_cost"] == pytest.approx(point["cost"] + point["co2"] * payload["fuels"]["co2(euro/ton)"], abs=0.01)
+            assert abs(sum(item["p"] for item in point["plan"]) - payload["load"]) < 0.1
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_pareto_endpoint_rejects_single_point(self, client, multi_plant_power_grid):
+        """A front of fewer than two points is a validation error."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        payload["max_points"] = 1
+        response = client.post("/productionplan/pareto", json=payload)
+
+        assert response.status_code == 422
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_pareto_endpoint_rejects_front_over_budget(self, client, multi_plant_power_grid):
+        """Too many points over too many levels is a validation error pointing at a coarser resolution."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        payload.update(load=30000, max_points=100)
+        response = client.post("/productionplan/pareto", json=payload)
+
+        assert response.status_code == 422
+        assert "coarser resolution" in response.text
+
+class TestMetricsEndpoint:
+    """Tests for the /metrics endpoint."""
+
+    @pytest.mark.integration
+    def test_repeated_request_is_served_from_cache(self, client, multi_plant_power_grid):
+        """The second identical request is a cache hit with the same plan."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        first = client.post("/productionplan", json=payload)
+        payload["powerplants"].reverse()
+        second = client.post("/productionplan", json=payload)
+        metrics = client.get("/metrics").json()
+
+        assert second.json() == first.json()
+        assert metrics["result_cache"]["hits"] == 1
+        assert metrics["result_cache"]["misses"] == 1
+        assert metrics["single_flight"] == {"in_flight": 0, "leaders": 1, "coalesced": 0}
+
+
+class TestFleetEndpoints:
+    """Tests for the /fleets endpoints."""
+
+    @pytest.mark.integration
+    def test_fleet_lifecycle(self, client, multi_plant_power_grid, basic_fuel, basic_gas_plant):
+        """A fleet can be registered, solved, replaced and deleted."""
+        powerplants = [plant.model_dump() for plant in multi_plant_power_grid.powerplants]
+        created = client.post("/fleets", json={"powerplants": powerplants})
+        assert created.status_code == 201
+        fleet_id = created.json()["fleet_id"]
+        assert created.json()["version"] == 1
+
+        scenario = {"load": 500, "fuels": basic_fuel.model_dump(by_alias=True)}
+        plan = client.post(f"/fleets/{fleet_id}/productionplan", json=scenario)
+        assert plan.status_code == 200
+        full = client.post("/productionplan", json=multi_plant_power_grid.model_dump(by_alias=True))
+        assert plan.json() == full.json()
+
+        replaced = client.put(f"/fleets/{fleet_id}", json={"powerplants": [basic_gas_plant.model_dump()]})
+        assert replaced.json()["version"] == 2
+        scenario["load"] = 300
+        plan = client.post(f"/fleets/{fleet_id}/productionplan", json=scenario)
+        assert plan.json() == [{"name": "gasfired1", "p": 300.0}]
+        assert client.get(f"/fleets/{fleet_id}").json()["powerplants"] == [basic_gas_plant.model_dump()]
+
+        assert client.delete(f"/fleets/{fleet_id}").status_code == 204
+        assert client.get(f"/fleets/{fleet_id}").status_code == 404
+
+    @pytest.mark.integration
+    @pytest.mark.edge_case
+    def test_unknown_fleet_returns_404(self, client, basic_fuel):
+        """Solving an unknown fleet returns 404."""
+        scenario = {"load": 500, "fuels": basic_fuel.model_dump(by_alias=True)}
+        response = client.post("/fleets/unknown/productionplan", json=scenario)
+
+        assert response.status_code == 404
+        assert response.json()["exception_case"] == "FleetNotFoundException"
@@ -0,0 +1,94 @@
+"""
+Unit tests for the fixed-point production plan engine.
+"""
+import numpy as np
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from services import fixed_point_engine, numpy_engine
+from services.plant_service import PlantService
+from tests import test_scenarios
+
+SCENARIOS = [
+    name for name in dir(test_scenarios)
+    if name.startswith("SCENARIO_") and name != "SCENARIO_INVALID_NEGATIVE_LOAD"
+]
+
+
+def plan_cost(grid, plan):
+    by_name = {powerplant.name: powerplant for powerplant in grid.powerplants}
+    return sum(PlantService._get_unit_cost(by_name[entry["name"]], grid.fuels) * entry["p"] for entry in plan)
+
+
+class TestFixedPointEngine:
+    """Tests for the integer-cost DP and its tie-break rule."""
+
+    @pytest.mark.unit
+    def test_scale_layers_to_milli_euro_per_unit(self):
+        """Unit costs become milli-euro per unit of the granularity, rounded to the nearest."""
+        layers = [([(1, 5)], 31.283018867924525), ([(2, 4)], 0.0)]
+
+        assert fixed_point_engine.scale_layers(layers, 0.1) == [([(1, 5)], 3128), ([(2, 4)], 0)]
+        assert fixed_point_engine.scale_layers(layers, 1.0) == [([(1, 5)], 31283), ([(2, 4)], 0)]
+
+    @pytest.mark.unit
+    def test_latest_sliding_window_min_breaks_ties_at_the_highest_index(self):
+        """With ``latest``, an integer window minimum reached twice is reported at its last index."""
+        values = np.array([4, 2, 2, 7, 2, 9, 9, 3], dtype=np.int64)
+
+        minimum, argument = numpy_engine.sliding_window_min(values, 3, fill=fixed_point_engine.UNREACHABLE, latest=True)
+
+        for end in range(len(values)):
+            window = values[max(0, end - 2):end + 1]
+            assert minimum[end] == window.min()
+            assert argument[end] == max(0, end - 2) + max(np.flatnonzero(window == window.min()))
+
+    @pytest.mark.unit
+    def test_equal_costs_leave_late_layers_lowest(self):
+        """Among plans of equal cost, the layers late in merit order produce the fewest units."""
+        layers = [([(10, 50)], 7), ([(10, 50)], 7), ([(5, 30), (40, 60)], 7)]
+
+        assert fixed_point_engine.solve(layers, 70) == [50, 20, 0]
+        assert fixed_point_engine.solve(layers, 130) == [50, 50, 30]
+
+    @pytest.mark.unit
+    def test_costs_within_a_milli_euro_do_not_flap(self):
+        """Unit costs a rounding error apart give the same plan in either order."""
+        cheap_first = [([(10, 50)], 25.0000001), ([(10, 50)], 25.0)]
+        cheap_last = [([(10, 50)], 25.0), ([(10, 50)], 25.0000001)]
+
+        first = fixed_point_engine.solve(fixed_point_engine.scale_layers(cheap_first, 0.1), 60)
+        last = fixed_point_engine.solve(fixed_point_engine.scale_layers(cheap_last, 0.1), 60)
+
+        assert first == last == [50, 10]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_same_cost_as_numpy_engine(self, scenario):
+        """On the reference scenarios, the plan costs what the float DP's plan costs, to the milli-euro."""
+        grid = PowerGridSchema(**getattr(test_scenarios, scenario))
+        try:
+            expected = PlantService.simple_production_plan(grid, engine="numpy")
+        except UnfeasibleException:
+            with pytest.raises(UnfeasibleException):
+                PlantService.simple_production_plan(grid, engine="fixed")
+            return
+
+        plan = PlantService.simple_production_plan(grid, engine="fixed")
+
+        assert round(sum(entry["p"] for entry in plan), 1) == grid.load
+        assert plan_cost(grid, plan) == pytest.approx(plan_cost(grid, expected), abs=grid.load * 5e-3)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_unreachable_load(self):
+        """A load no combination of ranges serves raises UnfeasibleException."""
+        with pytest.raises(UnfeasibleException):
+            fixed_point_engine.solve([([(50, 100)], 2000)], 40)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_costs_too_large_for_int64(self):
+        """Costs whose sum could overflow the int64 arrays are refused before solving."""
+        with pytest.raises(OverflowError):
+            fixed_point_engine.solve([([(1, 10 ** 6)], 10 ** 13)], 10 ** 6)
@@ -0,0 +1,93 @@
+"""
+Unit tests for the columnar fleet representation.
+"""
+import math
+
+import pytest
+from schemas.power_grid_schema import FuelSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services.aggregation import committed_intervals
+from services.fleet_columns import FleetColumns
+from services.plant_service import PlantService
+
+
+@pytest.fixture
+def fleet_plants():
+    """Fixture providing plants of every type, identical twins and pmins off the granularity grid."""
+    return [
+        PowerPlantSchema(name="gas_low", type="gasfired", efficiency=0.35, pmin=41, pmax=211),
+        PowerPlantSchema(name="wind_small", type="windturbine", efficiency=0.9, pmin=0, pmax=37),
+        PowerPlantSchema(name="gas_high", type="gasfired", efficiency=0.53, pmin=100, pmax=460),
+        PowerPlantSchema(name="jet", type="turbojet", efficiency=0.3, pmin=0, pmax=16),
+        PowerPlantSchema(name="wind_big", type="windturbine", efficiency=1, pmin=0, pmax=150),
+        PowerPlantSchema(name="gas_twin", type="gasfired", efficiency=0.53, pmin=100, pmax=460),
+    ]
+
+
+def fuel(wind=60):
+    return FuelSchema(**{"gas(euro/MWh)": 13.4, "kerosine(euro/MWh)": 50.8, "co2(euro/ton)": 20, "wind(%)": wind})
+
+
+class TestFleetColumns:
+    """Tests for FleetColumns and DispatchColumns."""
+
+    @pytest.mark.unit
+    def test_unit_costs_match_unit_cost(self, fleet_plants):
+        """Vectorized unit costs are the per-plant unit costs, to the last bit."""
+        columns = FleetColumns(fleet_plants)
+
+        assert columns.unit_costs(fuel()).tolist() == [PlantService._get_unit_cost(plant, fuel()) for plant in fleet_plants]
+
+    @pytest.mark.unit
+    def test_merit_order_breaks_wind_ties_by_efficiency(self, fleet_plants):
+        """Free wind turbines come first by decreasing efficiency, other ties keep plant order."""
+        columns = FleetColumns(fleet_plants)
+
+        assert columns.merit_order(columns.unit_costs(fuel())).tolist() == [4, 1, 2, 5, 0, 3]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("granularity", [0.1, 0.3, 1.0])
+    @pytest.mark.parametrize("wind", [0, 35, 100])
+    def test_dispatch_bounds_match_per_plant_conversion(self, fleet_plants, granularity, wind):
+        """Bounds are converted like the per-plant code, wind turbines capped by the wind."""
+        columns = FleetColumns(fleet_plants)
+        limit = 1500
+
+        dispatch = columns.dispatch(fuel(wind), granularity)
+
+        expected = []
+        for index in dispatch.order:
+            plant = fleet_plants[index]
+            capacity = plant.pmax * wind / 100.0 if plant.type == "windturbine" else plant.pmax
+            expected.append((
+                int(math.ceil(round(plant.pmin / granularity, 6))),
+                min(int(math.floor(round(capacity / granularity, 6))), limit),
+            ))
+        assert dispatch.bounds(limit) == expected
+        assert columns.bounds(fuel(wind), granularity, limit) == [expected[dispatch.order.index(i)] for i in range(6)]
+
+    @pytest.mark.unit
+    def test_wind_capped_units_follow_the_wind(self, fleet_plants):
+        """The capped pmax of the last wind is reused, a new wind recomputes it."""
+        columns = FleetColumns(fleet_plants)
+
+        calm = columns.max_units(fuel(0), 0.1)
+
+        assert columns.max_units(fuel(0), 0.1) is calm
+        assert columns.max_units(fuel(50), 0.1).tolist() == [2110, 185, 4600, 160, 750, 4600]
+        assert calm.tolist() == [2110, 0, 4600, 160, 0, 4600]
+
+    @pytest.mark.unit
+    def test_plant_groups_merge_identical_plants(self, fleet_plants):
+        """Identical plants share one layer, the union of the ranges of their committed units."""
+        dispatch = FleetColumns(fleet_plants).dispatch(fuel(), 0.1)
+        bounds = dispatch.bounds(5000)
+
+        plant_groups = dispatch.plant_groups(5000)
+
+        assert dispatch.groups() == [[0], [1], [2, 3], [4], [5]]
+        assert plant_groups.layers == [
+            (committed_intervals(*bounds[group[0]], len(group), 5000), dispatch.unit_costs[group[0]])
+            for group in dispatch.groups()
+        ]
+        assert plant_groups.layers[2][0] == [(1000, 5000)]
@@ -0,0 +1,48 @@
+"""
+Unit tests for the registry of fleets.
+"""
+import pytest
+from exceptions.fleet_not_found_exception import FleetNotFoundException
+from services.fleet_registry import FleetRegistry
+
+
+class TestFleetRegistry:
+    """Tests for FleetRegistry."""
+
+    @pytest.mark.unit
+    def test_register_and_get(self, multi_plant_power_grid):
+        """A registered fleet is found by its id at version 1."""
+        registry = FleetRegistry()
+        fleet = registry.register(multi_plant_power_grid.powerplants)
+        fleet_id, version = fleet.key
+
+        assert version == 1
+        assert registry.get(fleet_id) is fleet
+        assert fleet.powerplants == multi_plant_power_grid.powerplants
+
+    @pytest.mark.unit
+    def test_replace_bumps_version(self, multi_plant_power_grid, basic_gas_plant):
+        """Replacing the powerplants builds a new prepared fleet under a new key."""
+        registry = FleetRegistry()
+        fleet = registry.register(multi_plant_power_grid.powerplants)
+        fleet_id, _ = fleet.key
+
+        replaced = registry.replace(fleet_id, [basic_gas_plant])
+
+        assert replaced is not fleet
+        assert replaced.key == (fleet_id, 2)
+        assert registry.get(fleet_id).powerplants == [basic_gas_plant]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_unknown_fleet_raises_exception(self, basic_gas_plant):
+        """Unknown or deleted fleets raise FleetNotFoundException."""
+        registry = FleetRegistry()
+        fleet_id, _ = registry.register([basic_gas_plant]).key
+        registry.delete(fleet_id)
+
+        with pytest.raises(FleetNotFoundException) as exc_info:
+            registry.get(fleet_id)
+        assert exc_info.value.status_code == 404
+        with pytest.raises(FleetNotFoundException):
+            registry.replace("unknown", [basic_gas_plant])
@@ -0,0 +1,70 @@
+"""
+Unit tests for the coarse-to-fine production plan engine.
+"""
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from services import multires_engine, numpy_engine
+from services.plant_service import PlantService
+from tests import test_scenarios
+from tests.test_numpy_engine import SCENARIOS
+
+
+class TestMultiresEngine:
+    """Tests for the multi-resolution engine of simple_production_plan."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_same_allocations_as_numpy_engine(self, scenario):
+        """Both engines give the same plan (or both fail) on the reference scenarios."""
+        grid = PowerGridSchema(**getattr(test_scenarios, scenario))
+        try:
+            expected = PlantService.simple_production_plan(grid, engine="numpy")
+        except UnfeasibleException:
+            with pytest.raises(UnfeasibleException):
+                PlantService.simple_production_plan(grid, engine="multires")
+            return
+
+        assert PlantService.simple_production_plan(grid, engine="multires") == expected
+
+    @pytest.mark.unit
+    def test_coarse_layers_round_both_ways(self):
+        """Inward rounding shrinks every range, outward rounding widens it."""
+        layers = [([(1, 209)], 0.0), ([(105, 180), (210, 360)], 20.0)]
+
+        assert multires_engine.coarse_layers(layers, 10, outwards=False) == [([(1, 20)], 0.0), ([(11, 18), (21, 36)], 20.0)]
+        assert multires_engine.coarse_layers(layers, 10, outwards=True) == [([(0, 21)], 0.0), ([(10, 18), (21, 36)], 20.0)]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_rounded_capacity_does_not_commit_extra_plant(self):
+        """Free capacity lost to rounding (20.9 MW) does not switch on a plant that is not needed."""
+        layers = [([(1, 209)], 0.0), ([(20, 209)], 67.4), ([(1, 209)], 319.1)]
+
+        assert multires_engine.solve(layers, 209) == [209, 0, 0]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("load, layers", [
+        (2682, [([(1, 361)], 0.0), ([(1, 516)], 0.0), ([(1, 137)], 0.0), ([(1, 533)], 0.0),
+                ([(670, 1070)], 31.2), ([(620, 1200)], 44.2), ([(50, 570)], 236.0)]),
+        (2393, [([(1, 30)], 0.0), ([(1, 18)], 0.0), ([(1, 36)], 0.0), ([(1, 42)], 0.0), ([(1, 1250)], 53.8),
+                ([(1, 870)], 56.7), ([(590, 1150)], 86.5), ([(280, 380)], 95.4), ([(110, 130)], 128.3),
+                ([(290, 670)], 135.7)]),
+        (5824, [([(1, 648)], 0.0), ([(1, 170)], 0.0), ([(1, 932)], 0.0), ([(820, 1310)], 64.8),
+                ([(1080, 1320)], 138.1), ([(560, 1040)], 171.2), ([(1130, 1160)], 178.3), ([(730, 910)], 194.5)]),
+    ])
+    def test_same_cost_as_numpy_engine(self, load, layers):
+        """Commitments misled by rounding are repaired at the fine granularity."""
+        cost = lambda alloc: sum(units * unit_cost for units, (_, unit_cost) in zip(alloc, layers))
+
+        alloc = multires_engine.solve(layers, load)
+
+        assert sum(alloc) == load
+        assert cost(alloc) == pytest.approx(cost(numpy_engine.solve(layers, load)))
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_infeasible_load_raises_exception(self):
+        """A load no commitment can serve falls back to the exact engine and fails there."""
+        with pytest.raises(UnfeasibleException):
+            multires_engine.solve([([(1, 20)], 0.0), ([(100, 200)], 10.0)], 50)
@@ -0,0 +1,81 @@
+"""
+Unit tests for the dense NumPy production plan engine.
+"""
+import numpy as np
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from services import numpy_engine
+from services.plant_service import PlantService
+from tests import test_scenarios
+
+SCENARIOS = [
+    name for name in dir(test_scenarios)
+    if name.startswith("SCENARIO_") and name != "SCENARIO_INVALID_NEGATIVE_LOAD"
+]
+
+
+class TestSlidingWindowMin:
+    """Tests for the vectorized sliding-window minimum."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("width", [1, 2, 3, 7, 20])
+    def test_matches_brute_force(self, width):
+        """Minimum and argument match a direct scan of every window."""
+        values = np.array([5, 3, np.inf, 8, 1, 1, 9, np.inf, 4, 2, 7, 6], dtype=float)
+        minimum, argument = numpy_engine.sliding_window_min(values, width)
+
+        for end in range(len(values)):
+            window = values[max(0, end - width + 1):end + 1]
+            assert minimum[end] == window.min()
+            assert values[argument[end]] == minimum[end]
+            assert max(0, end - width + 1) <= argument[end] <= end
+
+
+class TestNumpyEngine:
+    """Tests for the NumPy engine of simple_production_plan."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_same_allocations_as_dict_engine(self, scenario):
+        """Both engines give the same plan (or both fail) on the reference scenarios."""
+        grid = PowerGridSchema(**getattr(test_scenarios, scenario))
+        try:
+            expected = PlantService.simple_production_plan(grid, engine="dict")
+        except UnfeasibleException:
+            with pytest.raises(UnfeasibleException):
+                PlantService.simple_production_plan(grid, engine="numpy")
+            return
+
+        assert PlantService.simple_production_plan(grid, engine="numpy") == expected
+
+    @pytest.mark.unit
+    def test_solve_respects_plant_bounds(self):
+        """Committed layers produce within their bounds and the total matches the load."""
+        layers = [([(1, 30)], 0.0), ([(50, 100)], 20.0), ([(1, 40)], 60.0)]
+        alloc = numpy_engine.solve(layers, 120)
+
+        assert sum(alloc) == 120
+        assert alloc == [30, 90, 0]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_solve_skips_unusable_layers(self):
+        """Layers with no capacity or pmin above pmax never produce."""
+        layers = [([], 0.0), ([(80, 60)], 10.0), ([(10, 50)], 30.0)]
+
+        assert numpy_engine.solve(layers, 20) == [0, 0, 20]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_infeasible_load_raises_exception(self):
+        """A load between the reachable levels raises UnfeasibleException."""
+        with pytest.raises(UnfeasibleException):
+            numpy_engine.solve([([(100, 200)], 10.0)], 50)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_unknown_engine_raises_error(self, multi_plant_power_grid):
+        """An unknown engine name is rejected."""
+        with pytest.raises(ValueError):
+            PlantService.simple_production_plan(multi_plant_power_grid, engine="unknown")
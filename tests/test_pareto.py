@@ -0,0 +1,160 @@
+"""
+Unit tests for the cost/CO2 Pareto front.
+"""
+import itertools
+import time
+
+import numpy as np
+import pytest
+from exceptions.solver_timeout_exception import SolverTimeoutException
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.pareto_schema import ParetoRequestSchema
+from schemas.power_grid_schema import PowerGridSchema
+from services import pareto
+from services.deadline import DeadlineExceeded
+from services.plant_service import PlantService
+
+
+def brute_force_front(layers, load):
+    choices = [[0] + [units for lo, hi in intervals for units in range(lo, hi + 1)] for intervals, _, _ in layers]
+    points = {
+        (round(sum(units * cost for units, (_, cost, _) in zip(alloc, layers)), 9),
+         round(sum(units * co2 for units, (_, _, co2) in zip(alloc, layers)), 9))
+        for alloc in itertools.product(*choices) if sum(alloc) == load
+    }
+    return sorted(point for point in points if not any(
+        other != point and other[0] <= point[0] and other[1] <= point[1] for other in points
+    ))
+
+
+def realistic_request(fuels):
+    powerplants = []
+    for index in range(8):
+        powerplants += [
+            {"name": f"gas{index}", "type": "gasfired", "efficiency": 0.4 + index / 50, "pmin": 60 + 10 * index, "pmax": 300 + 20 * index},
+            {"name": f"tj{index}", "type": "turbojet", "efficiency": 0.3, "pmin": 0, "pmax": 30 + 5 * index},
+            {"name": f"wind{index}", "type": "windturbine", "efficiency": 1, "pmin": 0, "pmax": 100 + 10 * index},
+        ]
+    return ParetoRequestSchema(load=3000, fuels=fuels, powerplants=powerplants, max_points=50)
+
+
+class TestPareto:
+    """Tests for the frontier DP and its pruning."""
+
+    @pytest.mark.unit
+    def test_prune_keeps_non_dominated_points_cheapest_first(self):
+        """Dominated and duplicate points are dropped, the fronts keep as many rows as the longest one."""
+        costs = np.array([[3.0], [1.0], [2.0], [2.0], [1.0]])
+        co2 = np.array([[1.0], [5.0], [2.0], [4.0], [5.0]])
+        fronts = pareto.Fronts(costs, co2, np.arange(5, dtype=np.int32)[:, None])
+
+        pruned = pareto.prune(fronts, 4)
+
+        assert pruned.costs[:, 0].tolist() == [1.0, 2.0, 3.0]
+        assert pruned.co2[:, 0].tolist() == [5.0, 2.0, 1.0]
+        assert pruned.links[:3, 0].tolist() == [1, 2, 0]
+
+    @pytest.mark.unit
+    def test_capped_front_keeps_both_ends(self):
+        """A front longer than the cap keeps evenly spread points, the cheapest and the least emitting included."""
+        costs = np.arange(10, dtype=float)[:, None]
+        fronts = pareto.Fronts(costs, 10.0 - costs, np.zeros((10, 1), dtype=np.int32))
+
+        pruned = pareto.prune(fronts, 4)
+
+        assert pruned.costs[:, 0].tolist() == [0.0, 3.0, 6.0, 9.0]
+
+    @pytest.mark.unit
+    def test_front_matches_brute_force(self):
+        """On small random layers, the front is exactly the non-dominated set of all allocations."""
+        rng = np.random.default_rng(7)
+        for _ in range(60):
+            layers = []
+            for _ in range(rng.integers(1, 4)):
+                lo = int(rng.integers(1, 5))
+                layers.append(([(lo, lo + int(rng.integers(0, 8)))], float(rng.choice([1.0, 2.5, 4.0])), float(rng.choice([0.0, 0.3, 0.6]))))
+            load = int(rng.integers(1, 20))
+            expected = brute_force_front(layers, load)
+            if not expected:
+                with pytest.raises(UnfeasibleException):
+                    pareto.solve(layers, load, 64)
+                continue
+
+            front = pareto.solve(layers, load, 64)
+
+            assert [(round(cost, 9), round(co2, 9)) for cost, co2, _ in front] == expected
+            for cost, co2, alloc in front:
+                assert sum(alloc) == load
+                assert cost == pytest.approx(sum(units * unit_cost for units, (_, unit_cost, _) in zip(alloc, layers)))
+
+    @pytest.mark.unit
+    def test_cheapest_point_costs_the_fuel_optimum(self, multi_plant_power_grid):
+        """With CO2 nearly free, the cheapest point of the front costs what the NumPy engine's plan costs."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        payload["fuels"]["co2(euro/ton)"] = 1e-9
+        grid = PowerGridSchema(**payload)
+        plan = PlantService.simple_production_plan(grid, engine="numpy")
+        by_name = {powerplant.name: powerplant for powerplant in grid.powerplants}
+        optimum = sum(PlantService._get_unit_cost(by_name[entry["name"]], grid.fuels) * entry["p"] for entry in plan)
+
+        points = PlantService.pareto_front(ParetoRequestSchema(**payload))["points"]
+
+        assert points[0]["cost"] == pytest.approx(optimum, abs=0.01)
+        assert [point["co2"] for point in points] == sorted((point["co2"] for point in points), reverse=True)
+        for point in points:
+            assert round(sum(entry["p"] for entry in point["plan"]), 1) == grid.load
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_unreachable_load(self):
+        """A load no combination of ranges serves raises UnfeasibleException."""
+        with pytest.raises(UnfeasibleException):
+            pareto.solve([([(50, 100)], 20.0, 0.3)], 40, 8)
+
+    @pytest.mark.unit
+    def test_flexible_layers_trade_units_along_the_front(self):
+        """Layers running from 0 skip the DP: the plans between two merit orders still make up the front."""
+        layers = [([(1, 4)], 0.0, 0.0), ([(1, 6)], 1.0, 0.3), ([(1, 6)], 1.5, 0.3), ([(1, 6)], 4.0, 0.0), ([(3, 5)], 2.5, 0.3)]
+
+        front = pareto.solve(layers, 14, 64)
+
+        assert [(round(cost, 9), round(co2, 9)) for cost, co2, _ in front] == brute_force_front(layers, 14)
+
+    @pytest.mark.unit
+    def test_realistic_fleet_gets_a_complete_front_before_the_deadline(self, basic_fuel):
+        """A 24-plant fleet serving 3 GW gets its whole front under the solver pool's default 30 s deadline."""
+        request = realistic_request(basic_fuel)
+
+        points = PlantService.pareto_front(request, deadline=time.time() + 30)["points"]
+
+        assert 1 < len(points) <= request.max_points
+        assert [point["cost"] for point in points] == sorted(point["cost"] for point in points)
+        assert [point["co2"] for point in points] == sorted((point["co2"] for point in points), reverse=True)
+        for point in points:
+            assert round(sum(entry["p"] for entry in point["plan"]), 1) == 3000
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_realistic_fleet_checks_the_deadline_during_the_solve(self, basic_fuel, monkeypatch):
+        """The deadline is checked between layers: a solve running out of time mid-way raises a timeout."""
+        calls = []
+
+        def expire_on_third_check(deadline):
+            calls.append(deadline)
+            if len(calls) == 3:
+                raise DeadlineExceeded()
+
+        monkeypatch.setattr(pareto, "check", expire_on_third_check)
+
+        with pytest.raises(SolverTimeoutException):
+            PlantService.pareto_front(realistic_request(basic_fuel), deadline=time.time() + 30)
+        assert len(calls) == 3
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_expired_deadline_raises_timeout(self, multi_plant_power_grid):
+        """Past the deadline the front is given up with SolverTimeoutException."""
+        request = ParetoRequestSchema(**multi_plant_power_grid.model_dump(by_alias=True))
+
+        with pytest.raises(SolverTimeoutException):
+            PlantService.pareto_front(request, deadline=0)
@@ -1,6 +1,8 @@
 """
 Unit tests for the PlantService optimization algorithm.
 """
+import random
+
 from pydantic_core import ValidationError
 import pytest
 from schemas.power_plant_schema import PowerPlantSchema
@@ -223,6 +225,35 @@ class TestSimpleProductionPlan:
         
         assert "No feasible solution" in str(exc_info.value.detail)
 
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize("engine", ["dict", "numpy", "deque"])
+    def test_infeasible_gap_reports_nearest_loads(self, basic_fuel, basic_gas_plant, engine):
+        """A load between two pmin/pmax combinations is rejected with the feasible loads around it."""
+        twin = basic_gas_plant.model_copy(update={"name": "gas_twin", "pmin": 300, "pmax": 350})
+        grid = PowerGridSchema(load=50.1, fuels=basic_fuel, powerplants=[basic_gas_plant.model_copy(update={"pmax": 120}), twin])
+
+        with pytest.raises(UnfeasibleException) as exc_info:
+            PlantService.simple_production_plan(grid, engine=engine)
+
+        assert exc_info.value.nearest_loads == (0.0, 100.0)
+        assert "100.0 MW above" in exc_info.value.detail
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    @pytest.mark.parametrize("engine", ["dict", "numpy"])
+    def test_huge_pmax_costs_no_more_than_the_load(self, basic_fuel, basic_gas_plant, engine):
+        """The feasibility precheck is sized by the load, not by a pmax far above it."""
+        huge = basic_gas_plant.model_copy(update={"pmin": 300, "pmax": 2e8})
+        grid = PowerGridSchema(load=100, fuels=basic_fuel, powerplants=[huge])
+
+        with pytest.raises(UnfeasibleException) as exc_info:
+            PlantService.simple_production_plan(grid, engine=engine)
+        assert exc_info.value.nearest_loads == (0.0, 300.0)
+
+        grid = PowerGridSchema(load=400, fuels=basic_fuel, powerplants=[huge])
+        assert PlantService.simple_production_plan(grid, engine=engine) == [{"name": huge.name, "p": 400.0}]
+
     @pytest.mark.unit
     def test_algorithm_prefers_cheapest_plants(self, multi_plant_power_grid):
         """Algorithm should prefer cheaper plants (wind > gas > turbojet in cost)."""
@@ -277,6 +308,74 @@ class TestSimpleProductionPlan:
             PlantService.simple_production_plan(grid)
 
 
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_committed_plant_never_runs_below_pmin(self, basic_fuel, basic_gas_plant):
+        """A committed plant must not be dispatched below pmin to absorb the residual load."""
+        full_wind_fuel = basic_fuel.model_copy()
+        full_wind_fuel.windturbine = 100
+        wind_plant = PowerPlantSchema(name="windplant1", type="windturbine", efficiency=1, pmin=0, pmax=100)
+        grid = PowerGridSchema(
+            load=150,
+            fuels=full_wind_fuel,
+            powerplants=[basic_gas_plant, wind_plant]
+        )
+        result = PlantService.simple_production_plan(grid)
+        production_dict = {p["name"]: p["p"] for p in result}
+
+        assert production_dict == {"windplant1": 50.0, "gasfired1": 100.0}
+
+    @pytest.mark.unit
+    def test_dict_engine_matches_numpy_engine_on_random_fleets(self):
+        """On random fleets, the dict engine serves every load the numpy engine serves, at the same cost."""
+        rng = random.Random(3)
+        for _ in range(150):
+            plants = []
+            for index in range(rng.randint(2, 8)):
+                plant_type = rng.choice(["gasfired", "turbojet", "windturbine"])
+                pmax = rng.randint(1, 150)
+                pmin = 0 if plant_type == "windturbine" or rng.random() < 0.3 else rng.randint(0, pmax)
+                plants.append(PowerPlantSchema(name=f"p{index}", type=plant_type, efficiency=round(rng.uniform(0.2, 0.6), 2), pmin=pmin, pmax=pmax))
+            fuel = FuelSchema(**{
+                "gas(euro/MWh)": round(rng.uniform(5, 30), 1), "kerosine(euro/MWh)": round(rng.uniform(20, 80), 1),
+                "co2(euro/ton)": rng.randint(1, 50), "wind(%)": rng.randint(0, 100),
+            })
+            grid = PowerGridSchema(load=round(rng.uniform(1, 400), 1), fuels=fuel, powerplants=plants)
+            try:
+                expected = PlantService.simple_production_plan(grid, engine="numpy")
+            except UnfeasibleException:
+                continue
+
+            result = PlantService.simple_production_plan(grid, engine="dict")
+
+            by_name = {plant.name: plant for plant in plants}
+            cost = lambda plan: sum(PlantService._get_unit_cost(by_name[entry["name"]], fuel) * entry["p"] for entry in plan)
+            assert round(sum(entry["p"] for entry in result), 1) == grid.load
+            assert cost(result) == pytest.approx(cost(expected), abs=1e-6)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("engine", ["dict", "numpy", "deque", "multires"])
+    @pytest.mark.parametrize("resolution", [0.1, 0.7, 1, 5])
+    def test_resolution_sets_production_step(self, multi_plant_power_grid, engine, resolution):
+        """Every output is a multiple of the resolution and the load is served exactly."""
+        grid = PowerGridSchema(**{**multi_plant_power_grid.model_dump(by_alias=True), "load": 350, "resolution": resolution})
+
+        result = PlantService.simple_production_plan(grid, engine=engine)
+
+        units = [plant["p"] / resolution for plant in result]
+        assert all(abs(unit - round(unit)) < 1e-6 for unit in units)
+        assert round(sum(round(unit) for unit in units) * resolution, 1) == 350
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_resolution_keeps_exact_pmin(self, basic_fuel):
+        """A pmin that is a multiple of the resolution is not rounded up by float noise."""
+        plant = PowerPlantSchema(name="gas", type="gasfired", efficiency=0.5, pmin=7, pmax=70)
+        grid = PowerGridSchema(load=7, fuels=basic_fuel, powerplants=[plant], resolution=0.7)
+
+        assert PlantService.simple_production_plan(grid) == [{"name": "gas", "p": 7.0}]
+
+
 class TestSignificantProductionSteps:
     """Tests for the _get_significant_production_steps method."""
 
@@ -297,3 +396,121 @@ class TestSignificantProductionSteps:
             assert len(steps) > 0
             assert all(isinstance(step, int) for step in steps)
 
+
+    @pytest.mark.unit
+    def test_significant_steps_are_subset_sums_of_pmins(self, basic_fuel):
+        """Each layer holds every subset sum of the pmins of the plants from that index on."""
+        plants = [
+            PowerPlantSchema(name=f"gas{i}", type="gasfired", efficiency=0.5, pmin=pmin, pmax=500)
+            for i, pmin in enumerate([10, 25, 40])
+        ]
+        result = PlantService._get_significant_production_steps(plants, granularity=1)
+
+        assert result[2] == [40, 0]
+        assert result[1] == [65, 40, 25, 0]
+        assert result[0] == [75, 65, 50, 40, 35, 25, 10, 0]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_significant_steps_are_capped_at_limit(self):
+        """Steps above the requested limit are never generated."""
+        plants = [
+            PowerPlantSchema(name=f"gas{i}", type="gasfired", efficiency=0.5, pmin=50 + i, pmax=500)
+            for i in range(250)
+        ]
+        result = PlantService._get_significant_production_steps(plants, granularity=0.1, limit=5000)
+
+        assert len(result) == 250
+        assert all(step <= 5000 for steps in result for step in steps)
+        assert result[-1] == [int(round(plants[-1].pmin / 0.1)), 0]
+
+
+class TestBatchProductionPlan:
+    """Tests for the batch_production_plan method."""
+
+    @pytest.mark.unit
+    def test_batch_results_in_scenario_order(self, multi_plant_power_grid, basic_fuel):
+        """Each scenario gets the same plan as a standalone request, in order."""
+        from schemas.power_grid_batch_schema import ScenarioSchema
+        from services.prepared_fleet import PreparedFleet
+        scenarios = [ScenarioSchema(load=load, fuels=basic_fuel) for load in (500, 300, 120)]
+        fleet = PreparedFleet(multi_plant_power_grid.powerplants)
+
+        results = PlantService.batch_production_plan(fleet, scenarios)
+
+        assert [entry["status_code"] for entry in results] == [200, 200, 200]
+        for scenario, entry in zip(scenarios, results):
+            grid = PowerGridSchema(load=scenario.load, fuels=scenario.fuels, powerplants=multi_plant_power_grid.powerplants)
+            assert entry["plan"] == PlantService.simple_production_plan(grid)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_batch_reports_per_entry_errors(self, basic_fuel, basic_gas_plant):
+        """An infeasible scenario is reported in its entry without failing the others."""
+        from schemas.power_grid_batch_schema import ScenarioSchema
+        from services.prepared_fleet import PreparedFleet
+        scenarios = [ScenarioSchema(load=load, fuels=basic_fuel) for load in (300, 50, 200)]
+
+        results = PlantService.batch_production_plan(PreparedFleet([basic_gas_plant]), scenarios, engine="numpy")
+
+        assert [entry["status_code"] for entry in results] == [200, 400, 200]
+        assert results[1]["exception_case"] == "UnfeasibleException"
+        assert "No feasible solution" in results[1]["detail"]
+        assert results[2]["plan"] == [{"name": "gasfired1", "p": 200.0}]
+
+
+class TestAnytimeProductionPlan:
+    """Tests for the anytime_production_plan method."""
+
+    @pytest.fixture
+    def wind_and_gas_grid(self, basic_fuel, basic_gas_plant):
+        """Fixture where free wind at full output leaves a residual below the gas pmin."""
+        full_wind_fuel = basic_fuel.model_copy()
+        full_wind_fuel.windturbine = 100
+        wind_plant = PowerPlantSchema(name="windplant1", type="windturbine", efficiency=1, pmin=0, pmax=100)
+        return PowerGridSchema(load=150, fuels=full_wind_fuel, powerplants=[basic_gas_plant, wind_plant])
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("engine", ["numpy", "deque"])
+    def test_without_deadline_exact_plan_is_proven(self, multi_plant_power_grid, engine):
+        """With time to finish, an exact engine gives its plan, proven optimal."""
+        result = PlantService.anytime_production_plan(multi_plant_power_grid, engine)
+
+        assert result["plan"] == PlantService.simple_production_plan(multi_plant_power_grid, engine=engine)
+        assert result["optimal"] is True
+
+    @pytest.mark.unit
+    def test_expired_deadline_returns_repaired_greedy_plan(self, wind_and_gas_grid, basic_gas_plant):
+        """Past the deadline the greedy plan is returned, backed off to fit the gas pmin, with its bound."""
+        result = PlantService.anytime_production_plan(wind_and_gas_grid, "numpy", deadline=0)
+        gas_cost = PlantService._get_unit_cost(basic_gas_plant, wind_and_gas_grid.fuels)
+
+        assert {p["name"]: p["p"] for p in result["plan"]} == {"windplant1": 50.0, "gasfired1": 100.0}
+        assert result["lower_bound"] == round(50 * gas_cost, 2)
+        assert result["optimal"] is False
+
+    @pytest.mark.unit
+    def test_greedy_plan_at_lower_bound_is_proven(self, low_load_grid):
+        """A greedy plan matching the LP bound is optimal without running the engine."""
+        result = PlantService.anytime_production_plan(low_load_grid, "numpy", deadline=0)
+
+        assert result["optimal"] is True
+        assert round(sum(p["p"] for p in result["plan"]), 1) == low_load_grid.load
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_no_plan_before_deadline_raises_timeout(self, basic_fuel):
+        """When the greedy plan cannot be repaired and time is out, the request times out."""
+        from exceptions.solver_timeout_exception import SolverTimeoutException
+        powerplants = [
+            PowerPlantSchema(name="gas_a", type="gasfired", efficiency=0.6, pmin=100, pmax=100),
+            PowerPlantSchema(name="gas_b", type="gasfired", efficiency=0.5, pmin=50, pmax=50),
+            PowerPlantSchema(name="gas_c", type="gasfired", efficiency=0.4, pmin=70, pmax=70),
+        ]
+        grid = PowerGridSchema(load=120, fuels=basic_fuel, powerplants=powerplants)
+
+        with pytest.raises(SolverTimeoutException):
+            PlantService.anytime_production_plan(grid, "numpy", deadline=0)
+        assert PlantService.anytime_production_plan(grid, "numpy")["plan"] == [
+            {"name": "gas_a", "p": 0.0}, {"name": "gas_b", "p": 50.0}, {"name": "gas_c", "p": 70.0}
+        ]
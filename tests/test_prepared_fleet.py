@@ -0,0 +1,74 @@
+"""
+Unit tests for the fuel-independent fleet precomputation.
+"""
+import pytest
+from schemas.power_grid_schema import FuelSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services.plant_service import PlantService
+from services.prepared_fleet import PreparedFleet
+
+
+@pytest.fixture
+def mixed_fleet():
+    """Fixture providing plants of every type with distinct and repeated efficiencies."""
+    return [
+        PowerPlantSchema(name="gas_low", type="gasfired", efficiency=0.35, pmin=40, pmax=210),
+        PowerPlantSchema(name="jet", type="turbojet", efficiency=0.3, pmin=0, pmax=16),
+        PowerPlantSchema(name="gas_high", type="gasfired", efficiency=0.53, pmin=100, pmax=460),
+        PowerPlantSchema(name="wind1", type="windturbine", efficiency=1, pmin=0, pmax=150),
+        PowerPlantSchema(name="gas_twin", type="gasfired", efficiency=0.53, pmin=100, pmax=460),
+        PowerPlantSchema(name="wind2", type="windturbine", efficiency=1, pmin=0, pmax=36),
+    ]
+
+
+class TestPreparedFleet:
+    """Tests for PreparedFleet."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("gas_price", [1.0, 13.4, 80.0])
+    def test_merit_order_matches_stable_sort(self, mixed_fleet, basic_fuel, gas_price):
+        """The argsort of the fleet's unit costs gives the stable sort by unit cost."""
+        fuels = FuelSchema(**{**basic_fuel.model_dump(by_alias=True), "gas(euro/MWh)": gas_price})
+        columns = PreparedFleet(mixed_fleet).columns
+
+        expected = sorted(range(len(mixed_fleet)), key=lambda i: PlantService._get_unit_cost(mixed_fleet[i], fuels))
+        assert columns.merit_order(columns.unit_costs(fuels)).tolist() == expected
+
+    @pytest.mark.unit
+    def test_significant_bitsets_are_cached_per_order(self, mixed_fleet):
+        """Bitsets are reused for the same order and a smaller limit."""
+        fleet = PreparedFleet(mixed_fleet)
+        order = [3, 5, 2, 4, 0, 1]
+
+        first = fleet.significant_bitsets(order, 0.1, 5000)
+
+        assert fleet.significant_bitsets(order, 0.1, 3000) is first
+        assert fleet.significant_bitsets(list(reversed(order)), 0.1, 3000) is not first
+
+    @pytest.mark.unit
+    def test_significant_bitsets_grow_with_limit(self, mixed_fleet):
+        """A larger limit than the cached one recomputes the bitsets."""
+        fleet = PreparedFleet(mixed_fleet)
+        order = [3, 5, 2, 4, 0, 1]
+
+        small = fleet.significant_bitsets(order, 0.1, 1000)
+        large = fleet.significant_bitsets(order, 0.1, 3000)
+
+        # order[2:] has pmins 100, 100, 40 and 0 MW
+        assert small[2] == (1 << 1000) | (1 << 400) | 1
+        assert large[2] == (1 << 2400) | (1 << 2000) | (1 << 1400) | small[2]
+
+    @pytest.mark.unit
+    def test_warm_reuses_fleet_with_same_key(self, mixed_fleet):
+        """A pickled copy of a keyed fleet is swapped for the warm one of this process."""
+        import pickle
+        from services.prepared_fleet import warm
+        fleet = warm(PreparedFleet(mixed_fleet, key=("fleet", 1)))
+        fleet.significant_bitsets([0, 1, 2, 3, 4, 5], 0.1, 100)
+
+        copy = pickle.loads(pickle.dumps(fleet))
+
+        assert copy._bitsets == {}
+        assert warm(copy) is fleet
+        assert warm(PreparedFleet(mixed_fleet, key=("fleet", 2))) is not fleet
+        assert warm(PreparedFleet(mixed_fleet)) is not fleet
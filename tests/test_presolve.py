@@ -0,0 +1,74 @@
+"""
+Unit tests for the presolve of flexible layers.
+"""
+import pytest
+from schemas.power_grid_schema import PowerGridSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services import numpy_engine
+from services.plant_service import PlantService
+from services.fleet_columns import FleetColumns
+from services.presolve import Presolve, is_flexible
+
+
+class TestPresolve:
+    """Tests for the split between DP layers and the merit-order tail."""
+
+    @pytest.mark.unit
+    def test_is_flexible(self):
+        """Only layers producing any amount from zero are flexible."""
+        assert is_flexible([(1, 30)])
+        assert is_flexible([])
+        assert not is_flexible([(10, 30)])
+        assert not is_flexible([(1, 30), (50, 60)])
+
+    @pytest.mark.unit
+    def test_split_and_expand(self):
+        """Constrained layers keep their order, the tail is filled cheapest first."""
+        layers = [([(1, 30)], 5.0), ([(50, 100)], 20.0), ([(1, 40)], 0.0), ([], 0.0)]
+        presolve = Presolve(layers)
+
+        assert presolve.layers == [([(50, 100)], 20.0)]
+        assert presolve.tail_segments() == [(40, 0.0), (0, 0.0), (30, 5.0)]
+        assert presolve.expand([60], 50) == [10, 60, 40, 0]
+
+
+class TestPresolvedSolve:
+    """Tests for the engines with a merit-order tail."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("engine", ["numpy", "deque"])
+    def test_wind_does_not_push_residual_below_pmin(self, basic_fuel, basic_gas_plant, engine):
+        """Free capacity is not dispatched first when that makes the residual infeasible."""
+        full_wind_fuel = basic_fuel.model_copy()
+        full_wind_fuel.windturbine = 100
+        wind_plant = PowerPlantSchema(name="windplant1", type="windturbine", efficiency=1, pmin=0, pmax=100)
+        grid = PowerGridSchema(load=150, fuels=full_wind_fuel, powerplants=[basic_gas_plant, wind_plant])
+
+        production = {p["name"]: p["p"] for p in PlantService.simple_production_plan(grid, engine=engine)}
+
+        assert production == {"windplant1": 50.0, basic_gas_plant.name: 100.0}
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("engine", ["numpy", "deque"])
+    @pytest.mark.parametrize("load", [35.5, 180, 412.3, 700])
+    def test_same_cost_as_full_dp(self, basic_fuel, engine, load):
+        """Many distinct flexible plants give the cost of the DP over every layer."""
+        powerplants = [
+            PowerPlantSchema(name=f"wind{i}", type="windturbine", efficiency=1, pmin=0, pmax=5 + i) for i in range(30)
+        ] + [
+            PowerPlantSchema(name=f"jet{i}", type="turbojet", efficiency=0.2 + i / 100, pmin=0, pmax=10) for i in range(10)
+        ] + [
+            PowerPlantSchema(name="gas_big", type="gasfired", efficiency=0.55, pmin=150, pmax=400),
+            PowerPlantSchema(name="gas_small", type="gasfired", efficiency=0.4, pmin=40, pmax=90),
+        ]
+        grid = PowerGridSchema(load=load, fuels=basic_fuel, powerplants=powerplants)
+        LOAD = int(round(load / 0.1))
+        layers = FleetColumns(powerplants).dispatch(basic_fuel, 0.1).plant_groups(LOAD).layers
+        costs, _ = numpy_engine.solve_layers(layers, LOAD)
+
+        plan = PlantService.simple_production_plan(grid, engine=engine)
+        by_name = {powerplant.name: powerplant for powerplant in powerplants}
+
+        assert round(sum(entry["p"] for entry in plan), 1) == load
+        assert sum(PlantService._get_unit_cost(by_name[entry["name"]], basic_fuel) * entry["p"] for entry in plan) == \
+            pytest.approx(costs[LOAD] * 0.1)
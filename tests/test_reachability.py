@@ -0,0 +1,58 @@
+"""
+Unit tests for the reachable production level bitsets.
+"""
+import pytest
+from services.reachability import interval_shift, iter_bits_descending, mask, nearest_levels, subset_sum_layers
+
+
+class TestReachability:
+    """Tests for the bitset helpers."""
+
+    @pytest.mark.unit
+    def test_mask_covers_zero_to_limit(self):
+        """The mask has exactly limit + 1 bits set."""
+        assert mask(0) == 0b1
+        assert mask(3) == 0b1111
+
+    @pytest.mark.unit
+    def test_iter_bits_descending(self):
+        """Set bits are yielded from the highest to the lowest."""
+        assert list(iter_bits_descending(0b101001)) == [5, 3, 0]
+        assert list(iter_bits_descending(0)) == []
+
+    @pytest.mark.unit
+    def test_subset_sum_layers(self):
+        """Each layer is the set of subset sums of the remaining sizes."""
+        layers = subset_sum_layers([2, 3], limit=10)
+
+        assert list(iter_bits_descending(layers[1])) == [3, 0]
+        assert list(iter_bits_descending(layers[0])) == [5, 3, 2, 0]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_subset_sum_layers_with_many_distinct_sizes(self):
+        """Hundreds of distinct sizes stay bounded by the limit."""
+        layers = subset_sum_layers(list(range(1, 301)), limit=2000)
+
+        assert layers[0] == mask(2000)
+        assert layers[-1] == (1 << 300) | 1
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("lo, hi", [(1, 1), (3, 9), (2, 40), (5, 100)])
+    def test_interval_shift_matches_every_shift(self, lo, hi):
+        """Doubling gives the OR of every shift in [lo, hi], capped at the limit."""
+        bitset = 0b100101
+        expected = 0
+        for shift in range(lo, hi + 1):
+            expected |= bitset << shift
+
+        assert interval_shift(bitset, lo, hi, limit=60) == expected & mask(60)
+
+    @pytest.mark.unit
+    def test_nearest_levels(self):
+        """The closest set bits on each side of a level are found."""
+        bitset = (1 << 0) | (1 << 10) | (1 << 25)
+
+        assert nearest_levels(bitset, 17) == (10, 25)
+        assert nearest_levels(bitset, 10) == (10, 10)
+        assert nearest_levels(bitset, 30) == (25, None)
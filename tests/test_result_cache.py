@@ -0,0 +1,124 @@
+"""
+Unit tests for the production plan result cache.
+"""
+import pytest
+from schemas.power_grid_schema import PowerGridSchema
+from services import result_cache
+from services.result_cache import ResultCache, canonical_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fixture replacing the cache clock with a controllable one."""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    return now
+
+
+class TestCanonicalKey:
+    """Tests for canonical_key."""
+
+    @pytest.mark.unit
+    def test_key_ignores_plant_order_and_number_format(self, multi_plant_power_grid):
+        """Reordered plants and integral floats give the same key."""
+        payload = multi_plant_power_grid.model_dump(by_alias=True)
+        reordered = dict(payload, load=500.0, powerplants=list(reversed(payload["powerplants"])))
+        reordered["fuels"] = dict(payload["fuels"], **{"co2(euro/ton)": 20.0})
+
+        assert canonical_key(PowerGridSchema(**reordered), "dict") == canonical_key(multi_plant_power_grid, "dict")
+
+    @pytest.mark.unit
+    def test_key_depends_on_request_and_options(self, multi_plant_power_grid):
+        """A different load or engine gives a different key."""
+        other_load = multi_plant_power_grid.model_copy(update={"load": 501})
+
+        assert canonical_key(other_load, "dict") != canonical_key(multi_plant_power_grid, "dict")
+        assert canonical_key(multi_plant_power_grid, "numpy") != canonical_key(multi_plant_power_grid, "dict")
+
+
+class TestResultCache:
+    """Tests for ResultCache."""
+
+    @pytest.mark.unit
+    def test_hit_and_miss_counters(self):
+        """Lookups are counted as hits or misses."""
+        cache = ResultCache(max_entries=2, ttl=60)
+
+        assert cache.get("a") is None
+        cache.set("a", [1])
+
+        assert cache.get("a") == [1]
+        assert cache.stats() == {"size": 1, "max_entries": 2, "hits": 1, "misses": 1, "evictions": 0}
+
+    @pytest.mark.unit
+    def test_least_recently_used_entry_is_evicted(self):
+        """Inserting beyond the size evicts the least recently used entry."""
+        cache = ResultCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_entries_expire_after_ttl(self, clock):
+        """An entry older than the TTL is a miss."""
+        cache = ResultCache(max_entries=2, ttl=10)
+        cache.set("a", 1)
+        clock[0] += 10
+
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_disabled_cache_stores_nothing(self):
+        """A size of 0 disables the cache."""
+        cache = ResultCache(max_entries=0, ttl=60)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert cache.misses == 0
+
+    @pytest.mark.unit
+    def test_disk_store_survives_restart(self, tmp_path, clock):
+        """Entries saved to the SQLite file are found by a new cache instance until they expire."""
+        path = str(tmp_path / "results.sqlite")
+        first = ResultCache(max_entries=2, ttl=10, path=path)
+        first.set("a", [{"name": "gasfired1", "p": 10.0}])
+        first.close()
+
+        second = ResultCache(max_entries=2, ttl=10, path=path)
+        assert second.get("a") == [{"name": "gasfired1", "p": 10.0}]
+        clock[0] += 10
+        second._entries.clear()
+        assert second.get("a") is None
+        second.close()
+
+    @pytest.mark.unit
+    def test_disk_store_is_bounded(self, tmp_path, clock):
+        """The SQLite file keeps at most max_entries rows, most recently used first."""
+        cache = ResultCache(max_entries=2, ttl=60, path=str(tmp_path / "results.sqlite"))
+        for key in ("a", "b", "c"):
+            clock[0] += 1
+            cache.set(key, key)
+        cache._entries.clear()
+
+        assert cache.get("a") is None
+        assert cache.get("c") == "c"
+        cache.close()
+
+    @pytest.mark.unit
+    def test_from_env(self, monkeypatch):
+        """Size, TTL and path are read from the environment."""
+        monkeypatch.setenv("RESULT_CACHE_SIZE", "5")
+        monkeypatch.setenv("RESULT_CACHE_TTL_S", "1.5")
+        monkeypatch.delenv("RESULT_CACHE_PATH", raising=False)
+        cache = ResultCache.from_env()
+
+        assert (cache.max_entries, cache.ttl, cache.enabled) == (5, 1.5, True)
@@ -0,0 +1,94 @@
+"""
+Unit tests for the coalescing of concurrent identical solves.
+"""
+import asyncio
+
+import pytest
+from exceptions.solver_cancelled_exception import SolverCancelledException
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+
+    @pytest.mark.unit
+    async def test_concurrent_calls_share_one_solve(self):
+        """Concurrent callers with the same key get the leader's result."""
+        single_flight = SingleFlight()
+        calls = []
+
+        async def solve():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return [{"name": "gasfired1", "p": 100.0}]
+
+        results = await asyncio.gather(*(single_flight.run("key", solve) for _ in range(5)))
+
+        assert len(calls) == 1
+        assert all(result == results[0] for result in results)
+        assert single_flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+    @pytest.mark.unit
+    async def test_different_keys_are_not_coalesced(self):
+        """Each key runs its own solve."""
+        single_flight = SingleFlight()
+
+        async def solve():
+            await asyncio.sleep(0)
+            return 1
+
+        await asyncio.gather(single_flight.run("a", solve), single_flight.run("b", solve))
+
+        assert (single_flight.leaders, single_flight.coalesced) == (2, 0)
+
+    @pytest.mark.unit
+    async def test_sequential_calls_solve_again(self):
+        """A key is forgotten once its solve has ended."""
+        single_flight = SingleFlight()
+
+        async def solve():
+            return 1
+
+        await single_flight.run("key", solve)
+        await single_flight.run("key", solve)
+
+        assert (single_flight.leaders, single_flight.coalesced) == (2, 0)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_exception_is_shared(self):
+        """Waiters receive the exception raised by the leader's solve."""
+        single_flight = SingleFlight()
+
+        async def solve():
+            await asyncio.sleep(0.01)
+            raise UnfeasibleException("No feasible solution for the requested load.")
+
+        results = await asyncio.gather(
+            *(single_flight.run("key", solve) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, UnfeasibleException) for result in results)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_waiter_takes_over_when_leader_is_cancelled(self):
+        """A waiter solves again when the leader's client disconnected."""
+        single_flight = SingleFlight()
+
+        async def cancelled_solve():
+            await asyncio.sleep(0.01)
+            raise SolverCancelledException("Client disconnected before the plan was ready.")
+
+        async def solve():
+            return 42
+
+        leader = asyncio.ensure_future(single_flight.run("key", cancelled_solve))
+        await asyncio.sleep(0)
+        waiter = await single_flight.run("key", solve)
+
+        assert waiter == 42
+        with pytest.raises(SolverCancelledException):
+            await leader
+        assert (single_flight.leaders, single_flight.coalesced) == (2, 1)
@@ -0,0 +1,171 @@
+"""
+Unit tests for the process pool running the solver.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+from exceptions.solver_busy_exception import SolverBusyException
+from exceptions.solver_cancelled_exception import SolverCancelledException
+from exceptions.solver_timeout_exception import SolverTimeoutException
+from exceptions.unfeasible_exception import UnfeasibleException
+from services.plant_service import PlantService
+from services.solver_pool import SolverPool
+
+
+def slow_identity(value, seconds):
+    time.sleep(seconds)
+    return value
+
+
+_seen_keys = set()
+
+
+def seen_before(key):
+    """Whether this worker process was given ``key`` before, as a warm state would be found."""
+    seen = key in _seen_keys
+    _seen_keys.add(key)
+    return seen
+
+
+class DisconnectedRequest:
+    """Stand-in for a request whose client has already gone away."""
+
+    async def is_disconnected(self):
+        return True
+
+
+@pytest.fixture
+def solver_pool():
+    """Fixture providing a started single-worker pool."""
+    pool = SolverPool(max_workers=1, max_queue=1, timeout=5)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+class TestSolverPool:
+    """Tests for SolverPool."""
+
+    @pytest.mark.unit
+    async def test_run_returns_solver_result(self, solver_pool, multi_plant_power_grid):
+        """A job runs in a worker process and its result is returned."""
+        result = await solver_pool.run(PlantService.simple_production_plan, multi_plant_power_grid, "dict")
+
+        assert result == PlantService.simple_production_plan(multi_plant_power_grid)
+        assert solver_pool.pending == 0
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_run_propagates_unfeasible_exception(self, solver_pool, basic_fuel, basic_gas_plant):
+        """Exceptions raised in the worker reach the caller with their status code."""
+        from schemas.power_grid_schema import PowerGridSchema
+        grid = PowerGridSchema(load=1000, fuels=basic_fuel, powerplants=[basic_gas_plant])
+
+        with pytest.raises(UnfeasibleException) as exc_info:
+            await solver_pool.run(PlantService.simple_production_plan, grid, "dict")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_run_rejects_jobs_beyond_queue_depth(self, solver_pool):
+        """Jobs beyond the workers plus the queue depth are rejected."""
+        jobs = [asyncio.create_task(solver_pool.run(slow_identity, i, 0.3)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(SolverBusyException):
+            await solver_pool.run(slow_identity, 2, 0)
+
+        assert await asyncio.gather(*jobs) == [0, 1]
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_run_times_out(self, solver_pool):
+        """A job that outlives the timeout raises SolverTimeoutException."""
+        solver_pool.timeout = 0.05
+
+        with pytest.raises(SolverTimeoutException):
+            await solver_pool.run(slow_identity, 0, 0.5)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_timed_out_job_stays_pending_until_it_finishes(self, solver_pool):
+        """A running job whose caller timed out still holds its worker and counts against the queue."""
+        # the worker is up, so the slow job is running when the caller gives up
+        await solver_pool.run(slow_identity, 0, 0)
+        solver_pool.timeout = 0.05
+
+        with pytest.raises(SolverTimeoutException):
+            await solver_pool.run(slow_identity, 0, 0.5)
+
+        assert solver_pool.pending == 1
+        with pytest.raises(SolverBusyException):
+            await asyncio.gather(*(solver_pool.run(slow_identity, i, 0) for i in range(2)))
+        for _ in range(100):
+            if solver_pool.pending == 0:
+                break
+            await asyncio.sleep(0.05)
+        assert solver_pool.pending == 0
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_run_cancels_queued_job_on_disconnect(self, solver_pool):
+        """A queued job is cancelled when the client disconnects."""
+        running = asyncio.create_task(solver_pool.run(slow_identity, 0, 0.3))
+        await asyncio.sleep(0)
+
+        with pytest.raises(SolverCancelledException) as exc_info:
+            await solver_pool.run(slow_identity, 1, 0, request=DisconnectedRequest())
+
+        assert exc_info.value.status_code == 499
+        assert await running == 0
+
+    @pytest.mark.unit
+    async def test_repeats_of_a_key_reach_the_same_worker(self):
+        """Sequential jobs of one affinity key find the state left by the previous ones in every repeat."""
+        pool = SolverPool(max_workers=3, max_queue=3, timeout=5)
+        pool.start()
+        try:
+            hits = [await pool.run(seen_before, key, affinity=key) for key in ["fleet-a", "fleet-b"] * 10]
+            pids = {await pool.run(os.getpid, affinity="fleet-a") for _ in range(5)}
+        finally:
+            pool.shutdown()
+
+        assert hits == [False, False] + [True] * 18
+        assert len(pids) == 1
+
+    @pytest.mark.unit
+    async def test_busy_preferred_worker_is_not_waited_for(self):
+        """A job whose preferred worker holds more jobs than the slack allows goes to an idler one."""
+        pool = SolverPool(max_workers=2, max_queue=2, timeout=5)
+        pool.start()
+        try:
+            jobs = []
+            for value in range(3):
+                jobs.append(asyncio.create_task(pool.run(slow_identity, value, 0.3, affinity="fleet-a")))
+                await asyncio.sleep(0)
+
+            # the first two share the preferred worker, the third does not wait behind both
+            assert sorted(pool.lane_pending) == [1, 2]
+            assert await asyncio.gather(*jobs) == [0, 1, 2]
+        finally:
+            pool.shutdown()
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    async def test_run_requires_started_pool(self):
+        """Running a job before start() is an error."""
+        with pytest.raises(RuntimeError):
+            await SolverPool(max_workers=1, max_queue=0, timeout=1).run(slow_identity, 0, 0)
+
+    @pytest.mark.unit
+    def test_from_env(self, monkeypatch):
+        """Pool size, queue depth and timeout are read from the environment."""
+        monkeypatch.setenv("SOLVER_POOL_SIZE", "3")
+        monkeypatch.setenv("SOLVER_MAX_QUEUE", "7")
+        monkeypatch.setenv("SOLVER_TIMEOUT_S", "2.5")
+        pool = SolverPool.from_env()
+
+        assert (pool.max_workers, pool.max_queue, pool.timeout) == (3, 7, 2.5)
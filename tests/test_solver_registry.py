@@ -0,0 +1,77 @@
+"""
+Unit tests for the engine registry and the automatic engine selection.
+"""
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services import solver_registry
+from services.plant_service import PlantService
+from services.prepared_fleet import PreparedFleet
+from services.solver_registry import Complexity
+from tests import test_scenarios
+from tests.test_numpy_engine import SCENARIOS
+
+
+class TestSolverRegistry:
+    """Tests for estimate and select."""
+
+    @pytest.mark.unit
+    def test_estimate_counts_fleet_features(self, multi_plant_power_grid):
+        """Plants, distinct pmins, levels, reachable levels and commitments are measured."""
+        layers = [([(1, 900)], 0.0), ([(1000, 4600)], 20.0), ([(1000, 4600), (2000, 9200)], 25.0), ([(1, 100)], 80.0)]
+
+        complexity = solver_registry.estimate(multi_plant_power_grid.powerplants, layers, reachable=0b1011, LOAD=2)
+
+        assert complexity.plants == 3
+        assert complexity.distinct_pmins == 1
+        assert complexity.levels == 2
+        assert complexity.reachable == 2
+        assert complexity.committable == 2
+        assert complexity.commitment_bits == pytest.approx(1 + 1.584962500721156)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("complexity, engine", [
+        (Complexity(plants=8, distinct_pmins=8, levels=500000, reachable=1000, committable=8, commitment_bits=8), "bnb"),
+        (Complexity(plants=80, distinct_pmins=70, levels=100000, reachable=99000, committable=80, commitment_bits=80), "bnb"),
+        (Complexity(plants=80, distinct_pmins=70, levels=100000, reachable=9000, committable=80, commitment_bits=80), "numpy"),
+        (Complexity(plants=30, distinct_pmins=30, levels=2000, reachable=2000, committable=30, commitment_bits=30), "numpy"),
+    ])
+    def test_select_picks_fastest_exact_engine(self, complexity, engine):
+        """Few commitments or a dense reachable set go to branch-and-bound, the rest to the dense DP."""
+        selected, reason = solver_registry.select(complexity)
+
+        assert selected == engine
+        assert selected in solver_registry.EXACT_ENGINES
+        assert reason
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("scenario", SCENARIOS)
+    def test_auto_gives_exact_plans(self, scenario):
+        """The selected engine gives the NumPy plan (or fails) on the reference scenarios."""
+        grid = PowerGridSchema(**getattr(test_scenarios, scenario))
+        fleet = PreparedFleet(grid.powerplants)
+        try:
+            expected = PlantService.simple_production_plan(grid, engine="numpy")
+        except UnfeasibleException:
+            with pytest.raises(UnfeasibleException):
+                PlantService.selected_production_plan(fleet, grid.load, grid.fuels)
+            return
+
+        result = PlantService.selected_production_plan(fleet, grid.load, grid.fuels)
+
+        assert result["plan"] == expected
+        assert result["engine"] in solver_registry.EXACT_ENGINES
+
+    @pytest.mark.unit
+    def test_rigid_units_go_to_dense_dp(self, basic_fuel):
+        """Many fixed-output units leave a sparse reachable set, solved by the dense DP."""
+        powerplants = [
+            PowerPlantSchema(name=f"gas{i}", type="gasfired", efficiency=0.4 + i / 200, pmin=50 + 37 * i, pmax=50 + 37 * i)
+            for i in range(20)
+        ]
+
+        result = PlantService.selected_production_plan(PreparedFleet(powerplants), 1436, basic_fuel)
+
+        assert result["engine"] == "numpy"
+        assert "reachable" in result["reason"]
@@ -0,0 +1,57 @@
+"""
+Unit tests for the supply cost curve.
+"""
+import pytest
+from schemas.power_grid_schema import PowerGridSchema
+from schemas.supply_curve_schema import SupplyCurveRequestSchema
+from services.plant_service import PlantService
+from services.prepared_fleet import PreparedFleet
+
+
+def plan_cost(grid, plan):
+    plants = {plant.name: plant for plant in grid.powerplants}
+    return sum(PlantService._get_unit_cost(plants[item["name"]], grid.fuels) * item["p"] for item in plan)
+
+
+class TestSupplyCurve:
+    """Tests for the supply_curve and supply_curve_plan methods."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("load", [20, 60, 100, 250.5, 500, 525])
+    def test_curve_matches_single_plans(self, multi_plant_power_grid, load):
+        """Cost and allocation of a level match a standalone solve of that load."""
+        fleet = PreparedFleet(multi_plant_power_grid.powerplants)
+        powerplants_greedy, curve = PlantService.supply_curve(fleet, multi_plant_power_grid.fuels, 600)
+        grid = PowerGridSchema(load=load, fuels=multi_plant_power_grid.fuels, powerplants=multi_plant_power_grid.powerplants)
+        expected = PlantService.simple_production_plan(grid, engine="numpy")
+
+        assert curve.is_reachable(load)
+        assert PlantService._get_plan(powerplants_greedy, curve.allocation(load), curve.granularity) == expected
+        assert curve.cost(load) == pytest.approx(plan_cost(grid, expected))
+
+    @pytest.mark.unit
+    def test_marginal_cost_is_unit_cost_of_marginal_plant(self, multi_plant_power_grid):
+        """Above the wind capacity the marginal cost is the gas unit cost."""
+        fleet = PreparedFleet(multi_plant_power_grid.powerplants)
+        _, curve = PlantService.supply_curve(fleet, multi_plant_power_grid.fuels, 600)
+        gas_cost = PlantService._get_unit_cost(multi_plant_power_grid.powerplants[0], multi_plant_power_grid.fuels)
+
+        assert curve.marginal_cost(0) is None
+        assert curve.marginal_cost(30) == pytest.approx(0.0)
+        assert curve.marginal_cost(300) == pytest.approx(gas_cost)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_unreachable_levels_are_skipped(self, basic_fuel, basic_gas_plant):
+        """Levels between 0 and pmin are not part of the curve."""
+        request = SupplyCurveRequestSchema(
+            fuels=basic_fuel, powerplants=[basic_gas_plant], step=50, plans_at=[40, 150]
+        )
+        result = PlantService.supply_curve_plan(request)
+
+        assert [point["load"] for point in result["points"]] == [0, 100, 150, 200, 250, 300, 350, 400, 450]
+        assert result["points"][1]["marginal_cost"] is None
+        assert result["plans"] == [
+            {"load": 40, "plan": None},
+            {"load": 150, "plan": [{"name": "gasfired1", "p": 150.0}]},
+        ]
@@ -0,0 +1,101 @@
+"""
+Unit tests for fuel scenario sweeps.
+"""
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import FuelSchema
+from schemas.power_plant_schema import PowerPlantSchema
+from services.plant_service import PlantService
+from services.prepared_fleet import PreparedFleet
+from services.sweep import merit_order_groups
+
+
+def fuel(gas, kerosine=50.8, co2=20, wind=60):
+    return FuelSchema(**{"gas(euro/MWh)": gas, "kerosine(euro/MWh)": kerosine, "co2(euro/ton)": co2, "wind(%)": wind})
+
+
+@pytest.fixture
+def sweep_fleet():
+    """Fixture providing a fleet whose merit order changes with the kerosine price."""
+    return PreparedFleet([
+        PowerPlantSchema(name="gas_big", type="gasfired", efficiency=0.53, pmin=100, pmax=460),
+        PowerPlantSchema(name="gas_small", type="gasfired", efficiency=0.37, pmin=40, pmax=210),
+        PowerPlantSchema(name="tj1", type="turbojet", efficiency=0.3, pmin=0, pmax=16),
+        PowerPlantSchema(name="wind_a", type="windturbine", efficiency=1, pmin=0, pmax=100),
+        PowerPlantSchema(name="wind_b", type="windturbine", efficiency=1, pmin=0, pmax=50),
+    ])
+
+
+class TestSweep:
+    """Tests for the vectorized unit costs and merit-order grouping."""
+
+    @pytest.mark.unit
+    def test_unit_cost_matrix_matches_unit_cost(self, sweep_fleet):
+        """Every cell is the unit cost of that plant under that scenario."""
+        fuels = [fuel(13.4), fuel(40.0, co2=5), fuel(8.0, kerosine=20.0, wind=0)]
+
+        costs = sweep_fleet.columns.unit_cost_matrix(fuels)
+
+        assert costs.shape == (3, 5)
+        assert costs.tolist() == [
+            [PlantService._get_unit_cost(powerplant, scenario) for powerplant in sweep_fleet.powerplants]
+            for scenario in fuels
+        ]
+
+    @pytest.mark.unit
+    def test_groups_share_the_merit_order(self, sweep_fleet):
+        """Scenarios are grouped by the merit order of their own unit costs."""
+        fuels = [fuel(13.4), fuel(13.4, kerosine=10.0), fuel(14.0), fuel(13.4, kerosine=10.0, wind=10)]
+
+        groups = merit_order_groups(sweep_fleet.columns, sweep_fleet.columns.unit_cost_matrix(fuels))
+
+        assert [indices for _, indices in groups] == [[0, 2], [1, 3]]
+        columns = sweep_fleet.columns
+        for order, indices in groups:
+            for index in indices:
+                assert order == columns.merit_order(columns.unit_costs(fuels[index])).tolist()
+
+
+class TestSweepProductionPlans:
+    """Tests for the solve of a group of scenarios with reused commitments."""
+
+    @pytest.mark.unit
+    def test_same_plans_as_single_solves(self, sweep_fleet):
+        """Each scenario costs what its own exact solve costs, failures included."""
+        fuels = [fuel(13.4), fuel(13.9, wind=20), fuel(13.4, kerosine=10.0), fuel(12.0, wind=0), fuel(13.4, wind=100)]
+        load = 330
+        costs = sweep_fleet.columns.unit_cost_matrix(fuels)
+        scenarios = [
+            (index, fuels[index], order, costs[index, order].tolist())
+            for order, indices in merit_order_groups(sweep_fleet.columns, costs)
+            for index in indices
+        ]
+
+        results = PlantService.sweep_production_plans(sweep_fleet, load, scenarios)
+
+        assert sorted(entry["index"] for entry in results) == list(range(len(fuels)))
+        by_name = {powerplant.name: powerplant for powerplant in sweep_fleet.powerplants}
+        plan_cost = lambda plan, scenario: sum(
+            PlantService._get_unit_cost(by_name[entry["name"]], scenario) * entry["p"] for entry in plan
+        )
+        for entry in results:
+            scenario = fuels[entry["index"]]
+            expected = PlantService.prepared_production_plan(sweep_fleet, load, scenario, "numpy")
+            assert entry["status_code"] == 200
+            assert plan_cost(entry["plan"], scenario) == pytest.approx(plan_cost(expected, scenario))
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_infeasible_scenario_does_not_fail_the_others(self, basic_gas_plant, basic_wind_plant):
+        """A wind level leaving the load unreachable only fails its own entry."""
+        fleet = PreparedFleet([basic_gas_plant, basic_wind_plant])
+        fuels = [fuel(13.4, wind=60), fuel(13.4, wind=0)]
+        costs = fleet.columns.unit_cost_matrix(fuels)
+        scenarios = [(index, fuels[index], order, costs[index, order].tolist())
+                     for order, indices in merit_order_groups(fleet.columns, costs) for index in indices]
+
+        results = PlantService.sweep_production_plans(fleet, 50, scenarios)
+
+        assert results[0]["status_code"] == 200
+        assert results[1]["status_code"] == 400
+        assert results[1]["exception_case"] == UnfeasibleException.__name__
@@ -0,0 +1,103 @@
+"""
+Unit tests for the warm start of the dense DP.
+"""
+import pytest
+from exceptions.unfeasible_exception import UnfeasibleException
+from schemas.power_grid_schema import PowerGridSchema
+from services import numpy_engine, warm_start
+from services.deadline import DeadlineExceeded
+from services.plant_service import PlantService
+
+
+LAYERS = [([(1, 30)], 0.0), ([(50, 100)], 20.0), ([(20, 40), (60, 80)], 45.0), ([(35, 35)], 25.0)]
+
+
+def capped(limit):
+    return [([(lo, min(hi, limit)) for lo, hi in intervals if lo <= limit], unit_cost) for intervals, unit_cost in LAYERS]
+
+
+def cost(alloc):
+    return sum(units * unit_cost for units, (_, unit_cost) in zip(alloc, LAYERS))
+
+
+@pytest.fixture(autouse=True)
+def empty_states():
+    """Every test starts without kept DP states."""
+    warm_start._states.clear()
+    yield
+    warm_start._states.clear()
+
+
+class TestWarmStart:
+    """Tests for the DP states kept per fleet and fuels."""
+
+    @pytest.mark.unit
+    def test_lower_loads_only_backtrack(self):
+        """Loads within the solved levels reuse the state and match a cold solve."""
+        built = []
+        layers_at = lambda limit: built.append(limit) or capped(limit)
+
+        for load in (150, 140, 95, 160):
+            assert warm_start.solve("fleet", layers_at, load) == numpy_engine.solve(capped(load), load)
+
+        assert built == [165]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("load", [171, 200, 245])
+    def test_higher_loads_extend_the_state(self, load):
+        """Loads above the solved levels extend every layer to the cost of a cold solve."""
+        warm_start.solve("fleet", capped, 60)
+        state = warm_start._states["fleet"]
+
+        alloc = warm_start.solve("fleet", capped, load)
+
+        assert state.limit == load + load // 10
+        assert cost(alloc) == pytest.approx(cost(numpy_engine.solve(capped(load), load)))
+        assert all(len(predecessor) == state.limit + 1 for predecessor in state.predecessors)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_deadline_leaves_the_state_unchanged(self):
+        """An extension stopped by the deadline keeps the levels already solved."""
+        warm_start.solve("fleet", capped, 100)
+
+        with pytest.raises(DeadlineExceeded):
+            warm_start.solve("fleet", capped, 240, deadline=0)
+
+        assert warm_start._states["fleet"].limit == 110
+        assert warm_start.solve("fleet", capped, 105) == numpy_engine.solve(capped(105), 105)
+
+    @pytest.mark.unit
+    @pytest.mark.edge_case
+    def test_unreachable_load(self):
+        """A load no layer combination serves fails like a cold solve."""
+        layers_at = lambda limit: [([(50, min(100, limit))], 20.0)] if limit >= 50 else [([], 20.0)]
+
+        with pytest.raises(UnfeasibleException):
+            warm_start.solve("fleet", layers_at, 40)
+
+    @pytest.mark.unit
+    def test_states_are_evicted_least_recently_used(self, monkeypatch):
+        """States beyond the memory budget are dropped, oldest first."""
+        warm_start.solve("a", capped, 100)
+        monkeypatch.setattr(warm_start, "WARM_STATE_BYTES", 2 * warm_start._states["a"].nbytes)
+        warm_start.solve("b", capped, 100)
+        warm_start.solve("a", capped, 90)
+        warm_start.solve("c", capped, 100)
+
+        assert list(warm_start._states) == ["a", "c"]
+
+    @pytest.mark.unit
+    def test_numpy_engine_requests_share_the_state(self, multi_plant_power_grid):
+        """Nearby loads of one grid reuse one state and get the plans of cold solves."""
+        plans = []
+        for load in (500, 497.5, 512, 530):
+            grid = PowerGridSchema(load=load, fuels=multi_plant_power_grid.fuels, powerplants=multi_plant_power_grid.powerplants)
+            plans.append(PlantService.simple_production_plan(grid, engine="numpy"))
+
+        assert len(warm_start._states) == 1
+        for load, plan in zip((500, 497.5, 512, 530), plans):
+            assert round(sum(entry["p"] for entry in plan), 1) == load
+        warm_start._states.clear()
+        grid = PowerGridSchema(load=512, fuels=multi_plant_power_grid.fuels, powerplants=multi_plant_power_grid.powerplants)
+        assert PlantService.simple_production_plan(grid, engine="numpy") == plans[2]